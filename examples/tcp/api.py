@@ -17,3 +17,12 @@ dispatcher.add_method(echo_with_long_name, name='echo')
 
 dispatcher['subtract'] = lambda a, b: a - b
 dispatcher['dict_to_list'] = dict_to_list
+
+
+@dispatcher.add_method(executor='process')
+def fibonacci(n):
+    """CPU-bound method, runs in the dispatcher process pool and does not hold server's GIL."""
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
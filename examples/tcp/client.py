@@ -1,18 +1,20 @@
-from proxy import Proxy, RequestError
+from jsonrpc.client import Client, RequestError
+from jsonrpc.utils import json_datetime_default, json_datetime_hook
 
 endpoint = ('127.0.0.1', 4000)
 
 
 def main():
-    proxy = Proxy(endpoint)
-    print(proxy.simple_add(first=17, second=39))
-    print(proxy.echo("Hello!"))
-    print(proxy.dict_to_list({1: 3, 'two': 'string', 3: [5, 'list', {'c': 0.3}]}))
+    with Client(endpoint, serialize_hook=json_datetime_default, deserialize_hook=json_datetime_hook) as client:
+        proxy = client.proxy
+        print(proxy.simple_add(first=17, second=39))
+        print(proxy.echo("Hello!"))
+        print(proxy.dict_to_list({1: 3, 'two': 'string', 3: [5, 'list', {'c': 0.3}]}))
 
-    try:
-        print(proxy.subtract(1, 2, 3))
-    except RequestError:
-        print("Got exception")
+        try:
+            print(proxy.subtract(1, 2, 3))
+        except RequestError:
+            print("Got exception")
 
 
 if __name__ == "__main__":
@@ -3,8 +3,10 @@ __version = (1, 8, 4)
 __version__ = version = '.'.join(map(str, __version))
 __project__ = PROJECT = __name__
 
-from .manager import JSONRPCResponseManager
+from .manager import JSONRPCResponseManager, AsyncJSONRPCResponseManager
 from .dispatcher import Dispatcher
+from .cache import CachePolicy
+from .response import RawJSON, RawJSONFile
 
 dispatcher = Dispatcher()
 
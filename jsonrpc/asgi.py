@@ -0,0 +1,169 @@
+""" ASGI application serving a dispatcher over HTTP.
+
+Usage::
+
+    from jsonrpc import dispatcher
+    from jsonrpc.asgi import make_app
+
+    app = make_app(dispatcher)  # run with any ASGI server
+
+Coroutine methods are awaited, batch members run concurrently, see
+:class:`jsonrpc.manager.AsyncJSONRPCResponseManager`. Request checks and
+responses are the same as in :mod:`jsonrpc.wsgi`, but request without
+Content-Length (chunked) is accepted, its size is checked while it is read.
+MessagePack requests and file-backed results are supported the same way too.
+"""
+import asyncio
+
+from jsonrpc.manager import AsyncJSONRPCResponseManager
+from jsonrpc.wsgi import (
+    DEFAULT_MAX_CONTENT_LENGTH, STATUSES, check_request, content_managers, error_headers, select_manager
+)
+
+
+def read_headers(scope):
+    """ Get request headers needed to handle it.
+
+    :param scope: ASGI connection scope
+    :type scope: dict
+    :return: Content-Length as bytes and Content-Type as str, None for missing ones
+    :rtype: tuple
+    """
+    content_length = content_type = None
+    for name, value in scope.get('headers', ()):
+        if name == b'content-length':
+            content_length = value
+        elif name == b'content-type':
+            content_type = value.decode('latin-1')
+    return content_length, content_type
+
+
+async def read_body(receive, max_content_length):
+    """ Read request body.
+
+    :param receive: ASGI receive callable
+    :type max_content_length: int
+    :return: Body or None if it is bigger than max_content_length
+    :rtype: None or bytes or bytearray
+    :raise ConnectionError: Client disconnected
+    """
+    body = b''
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise ConnectionError("Client disconnected")
+        chunk = message.get('body', b'')
+        if chunk:
+            if len(body) + len(chunk) > max_content_length:
+                return None
+            # single chunk is used as is, several ones are joined in place
+            if not body:
+                body = chunk
+            else:
+                if not isinstance(body, bytearray):
+                    body = bytearray(body)
+                body += chunk
+        if not message.get('more_body', False):
+            return body
+
+
+async def send_response(send, status, body, headers):
+    """ Send complete response.
+
+    :param send: ASGI send callable
+    :type status: int
+    :type body: bytes
+    :param headers: Headers as (name, value) str pairs
+    :type headers: list
+    """
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(name.lower().encode('ascii'), value.encode('ascii')) for name, value in headers],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_stream(send, response, content_type):
+    """ Send response with file-backed result chunk by chunk, file is read in executor.
+
+    :param send: ASGI send callable
+    :type response: jsonrpc.response.JSONRPCSingleResponse or jsonrpc.response.JSONRPCBatchResponse
+    :type content_type: str
+    """
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', content_type.encode('ascii')),
+            (b'content-length', str(response.json_size).encode('ascii')),
+        ],
+    })
+    loop = asyncio.get_running_loop()
+    chunks = response.iter_json_bytes()
+    while True:
+        chunk = await loop.run_in_executor(None, next, chunks, None)
+        if chunk is None:
+            break
+        await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def serve_lifespan(receive, send):
+    """ Acknowledge lifespan events, application has nothing to start or stop. """
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+def make_app(dispatcher, manager=None, max_content_length=DEFAULT_MAX_CONTENT_LENGTH):
+    """ Build ASGI application.
+
+    :type dispatcher: Dispatcher or dict
+    :param manager: Manager to handle requests with. By default it is AsyncJSONRPCResponseManager,
+        which runs plain (not coroutine) methods in the default executor of the event loop,
+        so a blocking method does not stall other requests.
+    :type manager: None or jsonrpc.manager.AsyncJSONRPCResponseManager
+    :param max_content_length: Maximum size of request body in bytes, bigger requests get 413
+    :type max_content_length: int
+    :rtype: callable
+    """
+    if manager is None:
+        manager = AsyncJSONRPCResponseManager(offload_sync=True)
+    managers = content_managers(manager)
+
+    async def application(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await serve_lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError("Unsupported connection type {0!r}".format(scope['type']))
+
+        content_length, content_type = read_headers(scope)
+        status, _ = check_request(scope['method'], content_length, max_content_length, length_required=False)
+        if status is None:
+            try:
+                body = await read_body(receive, max_content_length)
+            except ConnectionError:
+                return
+            if body is None:
+                status = 413
+        if status is not None:
+            text = STATUSES[status].encode('ascii')
+            return await send_response(send, status, text, error_headers(status, text))
+
+        request_manager = select_manager(managers, content_type, manager)
+        response = await request_manager.handle_async(body, dispatcher)
+        if response is None:
+            return await send_response(send, 204, b'', [])
+        if response.streamed:
+            return await send_stream(send, response, request_manager.codec.content_type)
+        data = response.json_bytes
+        await send_response(send, 200, data, [
+            ('Content-Type', request_manager.codec.content_type), ('Content-Length', str(len(data)))
+        ])
+
+    return application
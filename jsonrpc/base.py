@@ -1,15 +1,39 @@
-from functools import partial
-from json import loads, dumps
+from jsonrpc.codecs import get_codec
 
 
 class JSONSerializable:
     """ Common functionality for json serializable objects.
     Provides support for custom json serialization/deserialization hooks
     via serialize_hook — dumps(default=…) and deserialize_hook — loads(object_hook=…)
+    Encoding itself is done by codec, see :mod:`jsonrpc.codecs`.
+    Codec instances are shared between objects with the same configuration.
     """
 
-    def __init__(self, serialize_hook=None, deserialize_hook=None):
-        self.serialize = partial(dumps, default=serialize_hook)
-        self.deserialize = partial(loads, object_hook=deserialize_hook)
-        self.serialize_hook = serialize_hook
-        self.deserialize_hook = deserialize_hook
+    __slots__ = ('codec',)
+
+    def __init__(self, serialize_hook=None, deserialize_hook=None, codec=None):
+        """
+        :param codec: Codec instance or codec class. Hooks are ignored if instance is given.
+        :type codec: None or type or jsonrpc.codecs.JSONCodec
+        """
+        self.codec = get_codec(codec, default=serialize_hook, object_hook=deserialize_hook)
+
+    @property
+    def serialize(self):
+        return self.codec.encode
+
+    @property
+    def serialize_bytes(self):
+        return self.codec.encode_bytes
+
+    @property
+    def deserialize(self):
+        return self.codec.decode
+
+    @property
+    def serialize_hook(self):
+        return self.codec.default
+
+    @property
+    def deserialize_hook(self):
+        return self.codec.object_hook
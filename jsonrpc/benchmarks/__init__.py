@@ -0,0 +1 @@
+""" Benchmarks for request handling pipeline."""
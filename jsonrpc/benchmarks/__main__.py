@@ -0,0 +1,80 @@
+""" Run benchmarks of request handling pipeline.
+
+Usage:
+    python -m jsonrpc.benchmarks [-k PATTERN] [--min-time SECONDS] [--output FILE]
+    python -m jsonrpc.benchmarks --compare OLD.json NEW.json [--threshold 0.1]
+"""
+import argparse
+import fnmatch
+import json
+import sys
+
+from jsonrpc.benchmarks.cases import CASES
+from jsonrpc.benchmarks.runner import run, compare
+
+
+def format_time(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e3), ('us', 1e6)):
+        if seconds * scale >= 1:
+            return '{0:.2f}{1}'.format(seconds * scale, unit)
+    return '{0:.0f}ns'.format(seconds * 1e9)
+
+
+def print_result(name, result):
+    print('{0:20s} {1:>14,.1f} ops/s   p50 {2:>9s}   p99 {3:>9s}'.format(
+        name, result['ops'], format_time(result['p50']), format_time(result['p99'])
+    ))
+
+
+def print_comparison(rows):
+    print('{0:20s} {1:>14s} {2:>14s} {3:>8s}'.format('case', 'old ops/s', 'new ops/s', 'change'))
+    for name, old_ops, new_ops, change, regression in rows:
+        print('{0:20s} {1:>14,.1f} {2:>14,.1f} {3:>+7.1%}{4}'.format(
+            name, old_ops, new_ops, change, '  REGRESSION' if regression else ''
+        ))
+
+
+def parse_args(arguments=None):
+    parser = argparse.ArgumentParser(prog='python -m jsonrpc.benchmarks', description='JSON-RPC benchmarks')
+    parser.add_argument('-k', dest='patterns', action='append', help='run cases matching glob pattern')
+    parser.add_argument('--min-time', type=float, default=1.0, help='seconds to spend on every case')
+    parser.add_argument('-o', '--output', help='write results as JSON to file ("-" for stdout)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two result files')
+    parser.add_argument('--threshold', type=float, default=0.1, help='throughput drop reported as regression')
+    parser.add_argument('--list', action='store_true', help='list cases')
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None):
+    args = parse_args(arguments)
+
+    if args.list:
+        print('\n'.join(CASES))
+        return 0
+
+    if args.compare:
+        reports = []
+        for path in args.compare:
+            with open(path) as f:
+                reports.append(json.load(f))
+        rows = compare(reports[0], reports[1], threshold=args.threshold)
+        print_comparison(rows)
+        return 1 if any(row[-1] for row in rows) else 0
+
+    cases = {
+        name: case for name, case in CASES.items()
+        if not args.patterns or any(fnmatch.fnmatch(name, pattern) for pattern in args.patterns)
+    }
+    to_stdout = args.output == '-'
+    report = run(cases, min_time=args.min_time, callback=None if to_stdout else print_result)
+    if args.output:
+        if to_stdout:
+            json.dump(report, sys.stdout, indent=2)
+        else:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
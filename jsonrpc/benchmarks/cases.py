@@ -0,0 +1,227 @@
+""" Benchmark cases for request handling pipeline.
+
+Every case is a function, which prepares data and returns callable doing one operation.
+"""
+import json
+from datetime import datetime, date, time
+
+from jsonrpc.dispatcher import Dispatcher
+from jsonrpc.manager import JSONRPCResponseManager
+from jsonrpc.msgpack import MessagePackCodec
+from jsonrpc.response import RawJSON
+from jsonrpc.utils import json_datetime_default, json_datetime_hook
+
+CASES = {}
+
+
+def case(name):
+    """ Register benchmark case under name. """
+    def decorator(f):
+        CASES[name] = f
+        return f
+    return decorator
+
+
+def make_dispatcher():
+    """ Dispatcher with methods used by cases.
+    :rtype: Dispatcher
+    """
+    dispatcher = Dispatcher()
+    dispatcher['echo'] = lambda x: x
+    dispatcher['add'] = lambda a, b: a + b
+    dispatcher['notify'] = lambda *args: None
+
+    def error():
+        raise ValueError("error_explanation")
+
+    dispatcher['error'] = error
+    dispatcher['cached'] = lambda: json.loads(CACHED_BLOB)
+    dispatcher['cached_raw'] = lambda: RawJSON(CACHED_BLOB)
+    return dispatcher
+
+
+def make_lazy_dispatcher():
+    """ Dispatcher with methods getting params undecoded, in addition to common ones.
+    It is separate, so other cases measure usual decoding.
+    :rtype: Dispatcher
+    """
+    dispatcher = make_dispatcher()
+    dispatcher.add_method(lambda params: RawJSON(params.raw), name='echo', lazy_params=True)
+    return dispatcher
+
+
+# JSON text stored by methods, e.g. in cache
+CACHED_BLOB = json.dumps([{"id": i, "name": "item %d" % i, "values": [i, i / 2, None]} for i in range(1000)])
+
+
+def make_call(method, params, request_id=None):
+    data = {"jsonrpc": "2.0", "method": method, "params": params}
+    if request_id is not None:
+        data["id"] = request_id
+    return data
+
+
+def handle(payload, manager=None):
+    """ Operation: handle payload and serialize response.
+    :type payload: str
+    :rtype: callable
+    """
+    manager = manager or JSONRPCResponseManager()
+    dispatcher = make_dispatcher()
+
+    def run():
+        response = manager.handle(payload, dispatcher)
+        if response is not None:
+            response.json
+
+    return run
+
+
+@case('single')
+def single():
+    return handle(json.dumps(make_call("add", [1, 2], 1)))
+
+
+@case('notification')
+def notification():
+    return handle(json.dumps(make_call("notify", [1, 2])))
+
+
+def batch(size):
+    return handle(json.dumps([make_call("echo", [i], i) for i in range(size)]))
+
+
+@case('batch_10')
+def batch_10():
+    return batch(10)
+
+
+@case('batch_1k')
+def batch_1k():
+    return batch(1000)
+
+
+@case('batch_100k')
+def batch_100k():
+    return batch(100000)
+
+
+@case('parse_error')
+def parse_error():
+    return handle('{"jsonrpc": "2.0", "method": "foobar, "params": "bar", "baz]')
+
+
+@case('invalid_request')
+def invalid_request():
+    return handle('{"jsonrpc": "2.0", "method": 1, "params": "bar"}')
+
+
+def handle_bytes(payload, manager, dispatcher=None):
+    """ Operation: handle encoded payload, get encoded response.
+    :type payload: bytes
+    :rtype: callable
+    """
+    dispatcher = dispatcher or make_dispatcher()
+    return lambda: manager.handle_bytes(payload, dispatcher)
+
+
+@case('method_not_found')
+def method_not_found():
+    return handle(json.dumps(make_call("does_not_exist", [], 1)))
+
+
+@case('server_error')
+def server_error():
+    return handle(json.dumps(make_call("error", [], 1)))
+
+
+DATETIME_PAYLOAD = [
+    {"datetime": datetime(2014, 7, 1, 12, 30, 15, 100), "date": date(2014, 7, 1), "time": time(12, 30)},
+    {"name": "plain", "values": list(range(10)), "nested": {"a": 1, "b": [{"c": 2}]}},
+] * 20
+
+
+@case('datetime_encode')
+def datetime_encode():
+    manager = JSONRPCResponseManager(serialize_hook=json_datetime_default)
+    return lambda: manager.serialize(DATETIME_PAYLOAD)
+
+
+@case('datetime_decode')
+def datetime_decode():
+    manager = JSONRPCResponseManager(deserialize_hook=json_datetime_hook)
+    payload = json.dumps(DATETIME_PAYLOAD, default=json_datetime_default)
+    return lambda: manager.deserialize(payload)
+
+
+@case('datetime_call')
+def datetime_call():
+    manager = JSONRPCResponseManager(serialize_hook=json_datetime_default, deserialize_hook=json_datetime_hook)
+    payload = json.dumps(make_call("echo", [DATETIME_PAYLOAD], 1), default=json_datetime_default)
+    return handle(payload, manager)
+
+
+PLAIN_PAYLOAD = [
+    {"id": i, "name": "item", "tags": ["a", "b"], "price": {"amount": 10, "currency": "EUR"}, "meta": {}}
+    for i in range(100)
+]
+
+
+@case('plain_decode')
+def plain_decode():
+    manager = JSONRPCResponseManager(deserialize_hook=json_datetime_hook)
+    payload = json.dumps(PLAIN_PAYLOAD)
+    return lambda: manager.deserialize(payload)
+
+
+NUMERIC_PAYLOAD = [{"t": 1404217815 + i, "v": [i * 0.5, i, -i, i * 1000]} for i in range(100)]
+
+
+@case('numeric_json')
+def numeric_json():
+    manager = JSONRPCResponseManager()
+    return handle_bytes(manager.serialize_bytes(make_call("echo", [NUMERIC_PAYLOAD], 1)), manager)
+
+
+@case('numeric_msgpack')
+def numeric_msgpack():
+    manager = JSONRPCResponseManager(codec=MessagePackCodec)
+    return handle_bytes(manager.serialize_bytes(make_call("echo", [NUMERIC_PAYLOAD], 1)), manager)
+
+
+@case('cached_result')
+def cached_result():
+    return handle(json.dumps(make_call("cached", [], 1)))
+
+
+@case('cached_raw_result')
+def cached_raw_result():
+    return handle(json.dumps(make_call("cached_raw", [], 1)))
+
+
+LARGE_PARAMS = [json.loads(CACHED_BLOB)]
+
+
+@case('large_params')
+def large_params():
+    manager = JSONRPCResponseManager()
+    return handle_bytes(manager.serialize_bytes(make_call("echo", LARGE_PARAMS, 1)), manager)
+
+
+@case('large_params_lazy')
+def large_params_lazy():
+    manager = JSONRPCResponseManager()
+    return handle_bytes(manager.serialize_bytes(make_call("echo", LARGE_PARAMS, 1)), manager, make_lazy_dispatcher())
+
+
+@case('large_params_not_found')
+def large_params_not_found():
+    manager = JSONRPCResponseManager()
+    return handle_bytes(manager.serialize_bytes(make_call("does_not_exist", LARGE_PARAMS, 1)), manager)
+
+
+@case('large_params_not_found_lazy')
+def large_params_not_found_lazy():
+    manager = JSONRPCResponseManager()
+    payload = manager.serialize_bytes(make_call("does_not_exist", LARGE_PARAMS, 1))
+    return handle_bytes(payload, manager, make_lazy_dispatcher())
@@ -0,0 +1,90 @@
+""" Memory footprint of request handling.
+
+Measures allocations made by :class:`jsonrpc.manager.JSONRPCResponseManager`
+with tracemalloc: bytes and memory blocks kept alive per request/response pair
+and peak memory while handling a big batch.
+
+Usage: python -m jsonrpc.benchmarks.memory [--size N]
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+
+from jsonrpc.manager import JSONRPCResponseManager
+
+
+def make_batch(size):
+    """ Batch of calls: every third one fails with 'Method not found'.
+    :rtype: str
+    """
+    return json.dumps([
+        {"jsonrpc": "2.0", "method": "echo" if i % 3 else "does_not_exist", "params": [i], "id": i}
+        for i in range(size)
+    ])
+
+
+def measure_retained(size):
+    """ Memory kept alive by processed batch, per batch member.
+    :rtype: dict
+    """
+    manager = JSONRPCResponseManager()
+    dispatcher = {"echo": lambda x: x}
+    data = manager.deserialize(make_batch(size))
+    request = manager._parse(json.dumps(data))
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    response = request.process(dispatcher)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, 'filename')
+    size_diff = sum(stat.size_diff for stat in stats)
+    count_diff = sum(stat.count_diff for stat in stats)
+    assert len(response) == size
+    return {
+        "bytes_per_request": size_diff / size,
+        "blocks_per_request": count_diff / size,
+    }
+
+
+def measure_peak(size):
+    """ Peak memory while handling the whole batch, per batch member.
+    :rtype: dict
+    """
+    manager = JSONRPCResponseManager()
+    dispatcher = {"echo": lambda x: x}
+    payload = make_batch(size)
+
+    gc.collect()
+    tracemalloc.start()
+    response = manager.handle(payload, dispatcher)
+    output = response.json
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"peak_bytes_per_request": peak / size, "output_bytes": len(output)}
+
+
+def run(size):
+    """ Run all measurements.
+    :rtype: dict
+    """
+    result = {"size": size}
+    result.update(measure_retained(size))
+    result.update(measure_peak(size))
+    return result
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--size', type=int, default=10000, help='batch size')
+    args = parser.parse_args(arguments)
+    result = run(args.size)
+    print('batch of {size}: {bytes_per_request:.0f} bytes and {blocks_per_request:.1f} blocks retained per request, '
+          '{peak_bytes_per_request:.0f} bytes peak per request'.format(**result))
+
+
+if __name__ == '__main__':
+    main()
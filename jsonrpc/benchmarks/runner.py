@@ -0,0 +1,87 @@
+""" Benchmark runner and result comparison. """
+import platform
+import time
+
+from jsonrpc import version
+from jsonrpc.codecs import DefaultCodec
+
+
+def percentile(samples, fraction):
+    """ Percentile of sorted samples (nearest rank).
+    :type samples: list
+    :type fraction: float
+    """
+    index = min(len(samples) - 1, max(0, int(round(fraction * len(samples))) - 1))
+    return samples[index]
+
+
+def measure(operation, min_time=1.0, min_iterations=5, max_iterations=1000000, warmup=1):
+    """ Call operation repeatedly and time every call.
+
+    :param operation: Callable without arguments
+    :param min_time: Run at least that many seconds
+    :type min_time: float
+    :return: ops — operations per second, p50 and p99 — call latency in seconds
+    :rtype: dict
+    """
+    for _ in range(warmup):
+        operation()
+
+    clock = time.perf_counter
+    samples = []
+    total = 0.0
+    while (total < min_time or len(samples) < min_iterations) and len(samples) < max_iterations:
+        start = clock()
+        operation()
+        elapsed = clock() - start
+        samples.append(elapsed)
+        total += elapsed
+
+    samples.sort()
+    return {
+        'iterations': len(samples),
+        'ops': len(samples) / total if total else float('inf'),
+        'p50': percentile(samples, 0.5),
+        'p99': percentile(samples, 0.99),
+    }
+
+
+def run(cases, min_time=1.0, callback=None):
+    """ Run benchmark cases.
+
+    :param cases: Mapping name to case function
+    :type cases: dict
+    :param callback: Called with name and result after every case
+    :return: Report, suitable for JSON serialization
+    :rtype: dict
+    """
+    results = {}
+    for name, case in cases.items():
+        results[name] = measure(case(), min_time=min_time)
+        if callback is not None:
+            callback(name, results[name])
+    return {
+        'version': version,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'codec': DefaultCodec.name,
+        'results': results,
+    }
+
+
+def compare(old, new, threshold=0.1):
+    """ Compare two reports.
+
+    :param threshold: Relative throughput drop considered as regression
+    :type threshold: float
+    :return: Rows (name, old ops, new ops, change, is_regression) for cases present in both reports
+    :rtype: list
+    """
+    rows = []
+    for name, new_result in new['results'].items():
+        old_result = old['results'].get(name)
+        if old_result is None:
+            continue
+        change = new_result['ops'] / old_result['ops'] - 1
+        rows.append((name, old_result['ops'], new_result['ops'], change, change < -threshold))
+    return rows
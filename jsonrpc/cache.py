@@ -0,0 +1,113 @@
+""" Result cache for dispatcher methods. """
+import collections
+import json
+import threading
+import time
+
+MISSING = object()
+
+
+class CachePolicy:
+    """ Caching policy of a method.
+
+    :param ttl: Time in seconds cached result is valid. None means forever.
+    :type ttl: None or int or float
+    :param maxsize: Maximum number of cached results, least recently used are evicted first.
+        None means unlimited.
+    :type maxsize: None or int
+    """
+
+    def __init__(self, ttl=None, maxsize=128):
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl should be positive")
+        if maxsize is not None and maxsize <= 0:
+            raise ValueError("maxsize should be positive")
+        self.ttl = ttl
+        self.maxsize = maxsize
+
+    def __repr__(self):
+        return 'CachePolicy(ttl={0!r}, maxsize={1!r})'.format(self.ttl, self.maxsize)
+
+
+class MethodCache:
+    """ Thread-safe LRU cache with optional TTL for results of one method.
+    Results are keyed by canonical JSON encoding of call arguments.
+
+    :type policy: CachePolicy
+    :param clock: Monotonic time function
+    """
+
+    def __init__(self, policy, clock=time.monotonic):
+        self.policy = policy
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    @staticmethod
+    def make_key(args=(), kwargs=None):
+        """ Canonical representation of call arguments.
+        :type args: tuple or list
+        :type kwargs: None or dict
+        :rtype: str
+        """
+        return json.dumps([args, kwargs or {}], sort_keys=True, separators=(',', ':'), default=repr)
+
+    def get(self, key, default=MISSING):
+        """ Cached result or default, if there is no valid one.
+        :type key: str
+        """
+        with self._lock:
+            try:
+                expires, value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if expires is not None and expires <= self.clock():
+                del self._data[key]
+                self.evictions += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """ Store result.
+        :type key: str
+        """
+        expires = self.clock() + self.policy.ttl if self.policy.ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            if self.policy.maxsize is not None:
+                while len(self._data) > self.policy.maxsize:
+                    self._data.popitem(last=False)
+                    self.evictions += 1
+
+    def invalidate(self, *args, **kwargs):
+        """ Drop result of call with given arguments.
+        Without arguments drop all results.
+        """
+        with self._lock:
+            if args or kwargs:
+                self._data.pop(self.make_key(args, kwargs), None)
+            else:
+                self._data.clear()
+
+    def stats(self):
+        """ Counters snapshot.
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._data),
+            }
@@ -0,0 +1,400 @@
+""" JSON-RPC client for stream sockets.
+
+Client keeps a pool of persistent connections. Requests are written without waiting
+for responses to previous ones, every connection has a reader thread, which matches
+responses to requests by id and resolves their futures.
+
+Usage::
+
+    with Client(('127.0.0.1', 4000)) as client:
+        client.call('subtract', 42, 23)
+        future = client.submit('echo', 'hello')  # does not wait for response
+        client.proxy.billing.invoice.get(1)      # calls "billing.invoice.get"
+
+With batch_window set, calls made within the window are coalesced and sent
+as one batch request, every caller still gets its own result.
+"""
+import itertools
+import socket
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+from jsonrpc.base import JSONSerializable
+from jsonrpc.exceptions import JSONRPCException
+from jsonrpc.framing import DEFAULT_MAX_FRAME_SIZE, FrameDecoder, FrameError, get_framing, send_frame
+
+
+class RequestError(JSONRPCException):
+    """ Server responded with error.
+
+    :type code: int
+    :type message: str
+    :param data: Additional information about the error, if any
+    """
+
+    def __init__(self, code, message, data=None):
+        super().__init__('Error [{0}]: {1}'.format(code, message))
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+class Connection:
+    """ Single persistent connection with its table of requests waiting for response.
+
+    :param address: Server address, (host, port)
+    :type framing: jsonrpc.framing.Framing
+    :type codec: jsonrpc.codecs.JSONCodec
+    :param connect_timeout: Timeout of connection establishing in seconds
+    :type connect_timeout: None or float
+    :param max_frame_size: Maximum size of a single response in bytes
+    :type max_frame_size: int
+    """
+
+    def __init__(self, address, framing, codec, connect_timeout=None, max_frame_size=DEFAULT_MAX_FRAME_SIZE):
+        self.framing = framing
+        self.codec = codec
+        self.max_frame_size = max_frame_size
+        self.closed = False
+        self.pending = {}
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self.sock = socket.create_connection(address, timeout=connect_timeout)
+        self.sock.settimeout(None)
+        if self.sock.family in (socket.AF_INET, socket.AF_INET6):
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = threading.Thread(target=self._read, name='jsonrpc-client-reader', daemon=True)
+        self._reader.start()
+
+    def send(self, payload, futures=None):
+        """ Send encoded request or batch.
+
+        :type payload: bytes
+        :param futures: Mapping id of request to future to be resolved with its result.
+            Empty for notifications.
+        :type futures: None or dict
+        :raise ConnectionError:
+        """
+        with self._lock:
+            if self.closed:
+                raise ConnectionError("Connection is closed")
+            if futures:
+                self.pending.update(futures)
+        try:
+            with self._send_lock:
+                send_frame(self.sock, self.framing, payload)
+        except OSError as e:
+            self.close()
+            raise ConnectionError("Could not send request") from e
+
+    def forget(self, request_id):
+        """ Stop waiting for response, e.g. after timeout. """
+        with self._lock:
+            self.pending.pop(request_id, None)
+
+    def close(self):
+        """ Close socket, requests waiting for response fail with ConnectionError. """
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            pending, self.pending = self.pending, {}
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        for future in pending.values():
+            future.set_exception(ConnectionError("Connection closed before response was received"))
+
+    def _read(self):
+        decoder = FrameDecoder(self.framing, max_frame_size=self.max_frame_size)
+        try:
+            while decoder.recv_into(self.sock):
+                for frame in decoder:
+                    self._dispatch(self.codec.decode(frame))
+        except (OSError, ValueError, FrameError):
+            pass
+        finally:
+            self.close()
+
+    def _dispatch(self, data):
+        for response in data if isinstance(data, list) else (data,):
+            if not isinstance(response, dict):
+                continue
+            with self._lock:
+                future = self.pending.pop(response.get('id'), None)
+            if future is None:
+                # response to unknown request or error without id, e.g. parse error
+                continue
+            error = response.get('error')
+            if error is not None:
+                future.set_exception(RequestError(error.get('code'), error.get('message'), error.get('data')))
+            else:
+                future.set_result(response.get('result'))
+
+
+class Client(JSONSerializable):
+    """ Client with a pool of persistent connections.
+
+    :param address: Server address, (host, port)
+    :type address: tuple
+    :param framing: How messages are delimited, should be the same as server uses
+    :type framing: str or jsonrpc.framing.Framing
+    :param pool_size: Number of connections, requests are spread among them round-robin.
+        Connections are opened on first use and reopened if they are closed.
+    :type pool_size: int
+    :param timeout: Default time to wait for response in seconds, None means forever
+    :type timeout: None or float
+    :param connect_timeout: Timeout of connection establishing in seconds
+    :type connect_timeout: None or float
+    :param max_frame_size: Maximum size of a single response in bytes
+    :type max_frame_size: int
+    :param batch_window: Coalesce calls made within this many seconds into one batch request.
+        By default every call is sent at once.
+    :type batch_window: None or float
+    :param batch_size: Maximum number of calls in coalesced batch, full batch is sent at once.
+    :type batch_size: int
+    :param codec: Codec class or instance, e.g. :class:`jsonrpc.msgpack.MessagePackCodec`.
+        Binary codecs need binary framing ("length").
+    :type codec: None or type or jsonrpc.codecs.JSONCodec
+    """
+
+    def __init__(self, address, framing='nul', pool_size=1, timeout=None, connect_timeout=None,
+                 max_frame_size=DEFAULT_MAX_FRAME_SIZE, batch_window=None, batch_size=100,
+                 serialize_hook=None, deserialize_hook=None, codec=None):
+        super().__init__(serialize_hook=serialize_hook, deserialize_hook=deserialize_hook, codec=codec)
+        if pool_size <= 0:
+            raise ValueError("pool_size should be positive")
+        framing = get_framing(framing)
+        if self.codec.binary and not framing.binary:
+            raise ValueError("{0} framing could not carry {1} messages".format(framing.name, self.codec.name))
+        self._coalescer = None
+        if batch_window is not None:
+            self._coalescer = Coalescer(self, batch_window, batch_size)
+        self.address = address
+        self.framing = framing
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_frame_size = max_frame_size
+        self._connections = [None] * pool_size
+        self._round_robin = itertools.count()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def proxy(self):
+        """ Call methods as attributes: client.proxy.subtract(42, 23).
+        :rtype: Proxy
+        """
+        return Proxy(self)
+
+    def submit(self, method, *args, **kwargs):
+        """ Send request without waiting for response.
+
+        :type method: str
+        :return: Future resolved with the result or failed with :class:`RequestError`
+        :rtype: concurrent.futures.Future
+        """
+        return self._send(method, args, kwargs, next(self._ids))
+
+    def call(self, method, *args, **kwargs):
+        """ Call method and wait for its result.
+
+        :type method: str
+        :raise RequestError: Server responded with error
+        :raise concurrent.futures.TimeoutError: No response in :attr:`timeout` seconds
+        """
+        request_id = next(self._ids)
+        future = self._send(method, args, kwargs, request_id)
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            self._forget(request_id)
+            raise
+
+    def notify(self, method, *args, **kwargs):
+        """ Send notification, server does not respond to it.
+        :type method: str
+        """
+        self._send(method, args, kwargs, None)
+
+    def flush(self):
+        """ Send coalesced calls without waiting for the end of batch window. """
+        if self._coalescer is not None:
+            self._coalescer.flush()
+
+    def close(self):
+        """ Send coalesced calls and close all connections. """
+        if self._coalescer is not None:
+            self._coalescer.close()
+        with self._lock:
+            connections, self._connections = self._connections, [None] * len(self._connections)
+        for connection in connections:
+            if connection is not None:
+                connection.close()
+
+    def _send(self, method, args, kwargs, request_id):
+        if args and kwargs:
+            raise ValueError("Pass either positional or keyword params, not both")
+        request = {'jsonrpc': '2.0', 'method': method}
+        if args or kwargs:
+            request['params'] = list(args) or kwargs
+        future = None
+        if request_id is not None:
+            request['id'] = request_id
+            future = Future()
+        if self._coalescer is not None:
+            self._coalescer.add(request, request_id, future)
+        else:
+            self._get_connection().send(self.serialize_bytes(request), {request_id: future} if future else None)
+        return future
+
+    def _send_batch(self, items):
+        """ Send requests coalesced by :class:`Coalescer`.
+        :type items: list of (request, id, future)
+        """
+        futures = {request_id: future for _, request_id, future in items if future is not None}
+        requests = [request for request, _, _ in items]
+        payload = self.serialize_bytes(requests if len(requests) > 1 else requests[0])
+        try:
+            self._get_connection().send(payload, futures)
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+
+    def _forget(self, request_id):
+        if self._coalescer is not None:
+            self._coalescer.discard(request_id)
+        for connection in self._connections:
+            if connection is not None:
+                connection.forget(request_id)
+
+    def _get_connection(self):
+        index = next(self._round_robin) % len(self._connections)
+        connection = self._connections[index]
+        if connection is None or connection.closed:
+            with self._lock:
+                connection = self._connections[index]
+                if connection is None or connection.closed:
+                    connection = self._connections[index] = Connection(
+                        self.address, self.framing, self.codec, self.connect_timeout, self.max_frame_size
+                    )
+        return connection
+
+
+class Coalescer:
+    """ Collects calls of the client and sends them as batches.
+    Batch is sent when it is full or batch window since its first call is over.
+
+    :type client: Client
+    :param window: Time in seconds to wait for more calls
+    :type window: float
+    :param size: Maximum number of calls in batch
+    :type size: int
+    """
+
+    def __init__(self, client, window, size):
+        if window <= 0:
+            raise ValueError("batch_window should be positive")
+        if size <= 0:
+            raise ValueError("batch_size should be positive")
+        self.client = client
+        self.window = window
+        self.size = size
+        self._items = []
+        self._deadline = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='jsonrpc-client-coalescer', daemon=True)
+        self._thread.start()
+
+    def add(self, request, request_id, future):
+        """ Queue request.
+
+        :type request: dict
+        :param request_id: None for notification
+        :type future: None or concurrent.futures.Future
+        """
+        with self._condition:
+            if self._closed:
+                raise ConnectionError("Client is closed")
+            self._items.append((request, request_id, future))
+            if len(self._items) >= self.size:
+                items = self._take()
+            else:
+                if len(self._items) == 1:
+                    self._deadline = time.monotonic() + self.window
+                    self._condition.notify()
+                return
+        self.client._send_batch(items)
+
+    def discard(self, request_id):
+        """ Drop queued request, e.g. after timeout. """
+        with self._condition:
+            self._items = [item for item in self._items if item[1] != request_id]
+
+    def flush(self):
+        """ Send queued requests at once. """
+        with self._condition:
+            items = self._take()
+        if items:
+            self.client._send_batch(items)
+
+    def close(self):
+        """ Send queued requests and stop. """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        self.flush()
+
+    def _take(self):
+        items, self._items = self._items, []
+        self._deadline = None
+        return items
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._items and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                remaining = self._deadline - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                items = self._take()
+            self.client._send_batch(items)
+
+
+class Proxy:
+    """ Attribute access to remote methods. Nested attributes make dotted names.
+
+    :type client: Client
+    :param name: Method name or namespace prefix
+    :type name: None or str
+    """
+
+    def __init__(self, client, name=None):
+        self._client = client
+        self._name = name
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return Proxy(self._client, name if self._name is None else self._name + '.' + name)
+
+    def __call__(self, *args, **kwargs):
+        if self._name is None:
+            raise TypeError("Method name is not specified")
+        return self._client.call(self._name, *args, **kwargs)
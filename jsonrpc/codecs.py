@@ -0,0 +1,268 @@
+""" JSON codecs.
+
+Codec encodes python objects to JSON string and decodes them back.
+Every codec supports the same hooks as stdlib json module:
+default — dumps(default=…) and object_hook — loads(object_hook=…).
+Backends without native hook support get it through an adapter.
+
+Fast backends (orjson, rapidjson, ujson) are detected automatically,
+:data:`DefaultCodec` is the fastest importable one.
+"""
+import collections
+import json
+import re
+import threading
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import rapidjson
+except ImportError:  # pragma: no cover
+    rapidjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
+# integer above 64 bits has at least 19 digits
+_LONG_NUMBER = re.compile(rb'[0-9]{19}')
+_LONG_NUMBER_TEXT = re.compile(r'[0-9]{19}')
+
+
+def apply_object_hook(obj, object_hook):
+    """ Apply object_hook to every dict in decoded object, innermost first,
+    the same way json.loads(object_hook=…) does.
+
+    :type object_hook: callable
+    :return: Decoded object with hook applied
+    """
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            if isinstance(value, (dict, list)):
+                obj[key] = apply_object_hook(value, object_hook)
+        return object_hook(obj)
+    if isinstance(obj, list):
+        for index, value in enumerate(obj):
+            if isinstance(value, (dict, list)):
+                obj[index] = apply_object_hook(value, object_hook)
+    return obj
+
+
+class JSONCodec:
+    """ Base class for JSON codecs.
+
+    :param default: Function that gets called for objects that can't otherwise be serialized.
+    :type default: None or callable
+    :param object_hook: Function that will be called with the result of any object literal decoded.
+    :type object_hook: None or callable
+    """
+
+    name = None
+    #: Whether encoding is binary, rather than JSON text
+    binary = False
+    #: MIME type of encoded messages
+    content_type = 'application/json'
+
+    def __init__(self, default=None, object_hook=None):
+        self.default = default
+        self.object_hook = object_hook
+
+    def __repr__(self):
+        return '{0}(default={1!r}, object_hook={2!r})'.format(
+            self.__class__.__name__, self.default, self.object_hook
+        )
+
+    @classmethod
+    def is_available(cls):
+        """ Whether backend library is importable.
+        :rtype: bool
+        """
+        return True
+
+    def encode(self, obj):
+        """ Serialize obj to JSON string.
+        :rtype: str
+        :raise TypeError: obj is not serializable
+        """
+        raise NotImplementedError
+
+    def encode_bytes(self, obj):
+        """ Serialize obj to UTF-8 encoded JSON.
+        Non-ASCII characters are written as is, not as escape sequences.
+        :rtype: bytes
+        :raise TypeError: obj is not serializable
+        """
+        return self.encode(obj).encode('utf-8')
+
+    def decode(self, data):
+        """ Deserialize JSON document.
+        :type data: str or bytes
+        :raise ValueError: data is not a valid JSON document
+        """
+        raise NotImplementedError
+
+
+class StdlibJSONCodec(JSONCodec):
+    """ Codec based on json module from standard library. """
+
+    name = 'json'
+
+    def encode(self, obj):
+        return json.dumps(obj, default=self.default)
+
+    def encode_bytes(self, obj):
+        try:
+            return json.dumps(obj, default=self.default, ensure_ascii=False).encode('utf-8')
+        except UnicodeEncodeError:
+            # lone surrogates can be sent only as escape sequences
+            return json.dumps(obj, default=self.default).encode('utf-8')
+
+    def decode(self, data):
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data, object_hook=self.object_hook)
+
+
+class OrjsonCodec(JSONCodec):
+    """ Codec based on orjson library.
+
+    Datetime and dataclass objects are passed to default hook, like stdlib does,
+    non-string dict keys are converted to strings. Objects orjson rejects, but stdlib
+    encodes, e.g. integers above 64 bits and namedtuples, are encoded with stdlib json.
+
+    Unlike stdlib, NaN and Infinity are encoded as null: they are not valid JSON,
+    so stdlib output with them could not be read by most parsers.
+
+    Documents orjson could not decode exactly are decoded with stdlib json: ones with
+    NaN or Infinity, which orjson rejects, and ones with 19 or more digits in a row,
+    which could be integers above 64 bits, orjson reads them as floats.
+    """
+
+    name = 'orjson'
+    option = 0
+
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    @classmethod
+    def is_available(cls):
+        return orjson is not None
+
+    def encode(self, obj):
+        return self.encode_bytes(obj).decode('utf-8')
+
+    def encode_bytes(self, obj):
+        try:
+            return orjson.dumps(obj, default=self.default, option=self.option)
+        except TypeError:
+            return StdlibJSONCodec.encode_bytes(self, obj)
+
+    def decode(self, data):
+        pattern = _LONG_NUMBER_TEXT if isinstance(data, str) else _LONG_NUMBER
+        if pattern.search(data) is None:
+            try:
+                obj = orjson.loads(data)
+            except ValueError:
+                pass
+            else:
+                if self.object_hook is not None:
+                    obj = apply_object_hook(obj, self.object_hook)
+                return obj
+        return StdlibJSONCodec.decode(self, data)
+
+
+class RapidjsonCodec(JSONCodec):
+    """ Codec based on python-rapidjson library. """
+
+    name = 'rapidjson'
+
+    @classmethod
+    def is_available(cls):
+        return rapidjson is not None
+
+    def encode(self, obj):
+        return rapidjson.dumps(obj, default=self.default, mapping_mode=rapidjson.MM_COERCE_KEYS_TO_STRINGS)
+
+    def encode_bytes(self, obj):
+        return rapidjson.dumps(
+            obj, default=self.default, mapping_mode=rapidjson.MM_COERCE_KEYS_TO_STRINGS, ensure_ascii=False
+        ).encode('utf-8')
+
+    def decode(self, data):
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return rapidjson.loads(data, object_hook=self.object_hook)
+
+
+class UjsonCodec(JSONCodec):
+    """ Codec based on ujson library. """
+
+    name = 'ujson'
+
+    @classmethod
+    def is_available(cls):
+        return ujson is not None
+
+    def encode(self, obj):
+        return ujson.dumps(obj, default=self.default, escape_forward_slashes=False)
+
+    def encode_bytes(self, obj):
+        return ujson.dumps(obj, default=self.default, escape_forward_slashes=False, ensure_ascii=False).encode('utf-8')
+
+    def decode(self, data):
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        obj = ujson.loads(data)
+        if self.object_hook is not None:
+            obj = apply_object_hook(obj, self.object_hook)
+        return obj
+
+
+CODECS = (OrjsonCodec, RapidjsonCodec, UjsonCodec, StdlibJSONCodec)
+
+
+def detect_codec_class(codecs=CODECS):
+    """ First available codec class, in order of preference.
+    :rtype: type
+    """
+    for codec_class in codecs:
+        if codec_class.is_available():
+            return codec_class
+    return StdlibJSONCodec
+
+
+DefaultCodec = detect_codec_class()
+
+
+# Codec instances by (codec class, default, object_hook), least recently used first.
+# Hooks could be closures or bound methods created per manager, so cache is bounded.
+_codec_cache = collections.OrderedDict()
+_codec_cache_lock = threading.Lock()
+_CODEC_CACHE_LIMIT = 128
+
+
+def get_codec(codec=None, default=None, object_hook=None):
+    """ Get codec instance.
+    Instances are cached, so every call with the same arguments returns the same codec,
+    unless it was evicted: only 128 most recently used instances are kept.
+
+    :param codec: Codec instance (returned as is), codec class or None for :data:`DefaultCodec`
+    :type codec: None or type or JSONCodec
+    :rtype: JSONCodec
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+    key = (codec or DefaultCodec, default, object_hook)
+    with _codec_cache_lock:
+        instance = _codec_cache.get(key)
+        if instance is not None:
+            _codec_cache.move_to_end(key)
+            return instance
+        instance = _codec_cache[key] = key[0](default=default, object_hook=object_hook)
+        if len(_codec_cache) > _CODEC_CACHE_LIMIT:
+            _codec_cache.popitem(last=False)
+        return instance
@@ -1,55 +1,371 @@
-import collections
+import collections.abc
+import inspect
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
 
+from jsonrpc.cache import MethodCache
 
-class Dispatcher(collections.MutableMapping):
+
+class ParamsBinder:
+    """
+    Precompiled check of call arguments against callable signature.
+    It answers whether method(*args, **kwargs) would bind without calling the method.
+    """
+
+    __slots__ = ('max_positional', 'var_positional', 'var_keyword', 'keywords', 'required')
+
+    def __init__(self, signature):
+        """
+        :type signature: inspect.Signature
+        """
+        self.max_positional = 0
+        self.var_positional = False
+        self.var_keyword = False
+        # name -> position of parameter, keyword-only ones are after all positional
+        self.keywords = {}
+        # (position, name or None for positional-only) of parameters without default
+        self.required = []
+
+        position = 0
+        for parameter in signature.parameters.values():
+            kind = parameter.kind
+            if kind == parameter.VAR_POSITIONAL:
+                self.var_positional = True
+                continue
+            if kind == parameter.VAR_KEYWORD:
+                self.var_keyword = True
+                continue
+
+            if kind == parameter.KEYWORD_ONLY:
+                index = float('inf')
+            else:
+                index = position
+                position += 1
+            if kind != parameter.POSITIONAL_ONLY:
+                self.keywords[parameter.name] = index
+            if parameter.default is parameter.empty:
+                self.required.append((index, parameter.name if kind != parameter.POSITIONAL_ONLY else None))
+        self.max_positional = position
+
+    @classmethod
+    def from_callable(cls, f):
+        """
+        Build binder for callable.
+
+        :rtype: ParamsBinder or None if signature can not be inspected
+        """
+        try:
+            signature = inspect.signature(f)
+        except (TypeError, ValueError):
+            return None
+        return cls(signature)
+
+    def accepts(self, args, kwargs):
+        """
+        :type args: tuple
+        :type kwargs: dict
+        :rtype: bool
+        """
+        count = len(args)
+        if count > self.max_positional and not self.var_positional:
+            return False
+        for key in kwargs:
+            index = self.keywords.get(key)
+            if index is None:
+                if not self.var_keyword:
+                    return False
+            elif index < count:
+                return False
+        for index, name in self.required:
+            if index >= count and (name is None or name not in kwargs):
+                return False
+        return True
+
+
+class Dispatcher(collections.abc.MutableMapping):
     """
     Method dispatcher.
     Dictionary-like object which holds map method_name to method.
+    Signature of every method is inspected once, when it is added,
+    so calls with mismatched params are rejected without calling the method.
+
+    Other dispatchers could be mounted under a prefix: dispatcher.mount("billing", billing)
+    makes method "invoice.get" of billing available as "billing.invoice.get".
+    All names, including the mounted ones, are kept in one flat lookup table,
+    which is updated whenever any of the dispatchers changes,
+    so resolving a method is a single dict lookup regardless of nesting depth.
+    Own methods take precedence over mounted ones with the same full name.
     """
 
-    def __init__(self, prototype=None):
+    SEPARATOR = '.'
+
+    def __init__(self, prototype=None, process_workers=None):
         """
         Build method dispatcher.
 
         :param prototype: Initial method mapping.
         :type prototype: None or object or dict
+        :param process_workers: Size of the process pool for methods added with executor="process".
+            Defaults to the number of CPUs.
+        :type process_workers: None or int
         """
         self.method_map = {}
+        self.method_options = {}
+        self.mounts = {}
+        # full name -> (method, options, owner dispatcher, name in owner)
+        self._table = {}
+        self._parents = []
+        # full names of methods with lazy params, here and in mounted dispatchers
+        self._lazy_params = set()
+        self.process_workers = process_workers
+        self._process_pool = None
+        self._process_pool_lock = threading.Lock()
 
         if prototype is not None:
             self.build_method_map(prototype)
 
     def __getitem__(self, key):
-        return self.method_map[key]
+        return self._table[key][0]
 
     def __setitem__(self, key, value):
         self.method_map[key] = value
+        binder = ParamsBinder.from_callable(value)
+        if binder is None:
+            self.method_options.pop(key, None)
+        else:
+            self.method_options[key] = {'binder': binder}
+        self._refresh(key)
 
     def __delitem__(self, key):
-        del self.method_map[key]
+        if key in self.method_map:
+            del self.method_map[key]
+            self.method_options.pop(key, None)
+            self._refresh(key)
+        else:
+            # method of mounted dispatcher, remove it there
+            _, _, owner, name = self._table[key]
+            del owner[name]
 
     def __len__(self):
-        return len(self.method_map)
+        return len(self._table)
 
     def __iter__(self):
-        return iter(self.method_map)
+        return iter(self._table)
 
     def __repr__(self):
         return repr(self.method_map)
 
-    def add_method(self, f, name=None):
+    def add_method(self, f=None, name=None, executor=None, cache=None, lazy_params=False):
         """
         Add a method to the dispatcher.
         When used as a decorator keep callable object unmodified.
+        Could be used as a decorator with arguments too: @dispatcher.add_method(executor="process")
 
         :param f: Callable to be added.
         :param name: Name to register
+        :param executor: Where to run the method. "process" runs it in the process pool
+            managed by dispatcher (use it for CPU-bound methods, callable and its arguments
+            must be picklable), an Executor instance runs it there.
+            By default method is called in place.
+        :param cache: Cache results of the method according to policy.
+            Use it for read-only methods, cached results are returned for calls with equal params.
+        :param lazy_params: Pass params to the method undecoded, as a single
+            :class:`jsonrpc.lazy.LazyParams` argument. Use it for methods with large params,
+            which forward or store them as is. Could not be combined with cache.
         :type f: callable
         :type name: None or str
+        :type executor: None or str or concurrent.futures.Executor
+        :type cache: None or jsonrpc.cache.CachePolicy
+        :type lazy_params: bool
         """
-        self.method_map[name or f.__name__] = f
+        if f is None:
+            return partial(self.add_method, name=name, executor=executor, cache=cache, lazy_params=lazy_params)
+
+        if executor is not None and executor != 'process' and not isinstance(executor, Executor):
+            raise ValueError('executor should be "process" or Executor instance, not {0!r}'.format(executor))
+        if lazy_params and cache is not None:
+            raise ValueError('lazy_params could not be combined with cache')
+
+        options = {}
+        if executor is not None:
+            options['executor'] = executor
+        if cache is not None:
+            options['cache'] = MethodCache(cache)
+        if lazy_params:
+            options['lazy_params'] = True
+
+        name = name or f.__name__
+        self[name] = f
+        if options:
+            self.method_options.setdefault(name, {}).update(options)
+            self._refresh(name)
         return f
 
+    def mount(self, prefix, dispatcher):
+        """
+        Make methods of another dispatcher available under prefix.
+        Later changes of the mounted dispatcher are visible immediately.
+
+        :param prefix: Namespace, methods are available as prefix.name
+        :type prefix: str
+        :type dispatcher: Dispatcher
+        :raise ValueError: Prefix is already used or mounting would create a cycle
+        """
+        if not prefix:
+            raise ValueError('prefix should not be empty')
+        if prefix in self.mounts:
+            raise ValueError('prefix {0!r} is already mounted'.format(prefix))
+        # dispatchers are mappings, == compares their contents, so identity is checked explicitly
+        if dispatcher is self or any(mounted is self for mounted in dispatcher._iter_mounted()):
+            raise ValueError('dispatcher could not be mounted into itself')
+
+        self.mounts[prefix] = dispatcher
+        dispatcher._parents.append((self, prefix))
+        for name in list(dispatcher._table):
+            self._refresh(prefix + self.SEPARATOR + name)
+
+    def unmount(self, prefix):
+        """
+        Remove dispatcher mounted under prefix.
+
+        :type prefix: str
+        :return: Removed dispatcher
+        :rtype: Dispatcher
+        :raise KeyError: Nothing is mounted under prefix
+        """
+        dispatcher = self.mounts.pop(prefix)
+        index = next(
+            index for index, (parent, name) in enumerate(dispatcher._parents) if parent is self and name == prefix
+        )
+        del dispatcher._parents[index]
+        for name in list(dispatcher._table):
+            self._refresh(prefix + self.SEPARATOR + name)
+        return dispatcher
+
+    def get_options(self, name):
+        """
+        Options the method was added with, including its mounted namespace.
+
+        :type name: str
+        :rtype: None or dict
+        """
+        entry = self._table.get(name)
+        return entry[1] if entry is not None else None
+
+    def _iter_mounted(self):
+        for dispatcher in self.mounts.values():
+            yield dispatcher
+            yield from dispatcher._iter_mounted()
+
+    def _resolve(self, name):
+        """ Find method by walking mounted dispatchers, used to update lookup table. """
+        if name in self.method_map:
+            return self.method_map[name], self.method_options.get(name), self, name
+        for prefix, dispatcher in self.mounts.items():
+            head = prefix + self.SEPARATOR
+            if name.startswith(head):
+                entry = dispatcher._resolve(name[len(head):])
+                if entry is not None:
+                    return entry
+        return None
+
+    def _refresh(self, name):
+        """ Update lookup table entry of the name here and in all dispatchers this one is mounted to. """
+        entry = self._resolve(name)
+        if entry is None:
+            self._table.pop(name, None)
+        else:
+            self._table[name] = entry
+        if entry is not None and entry[1] is not None and entry[1].get('lazy_params'):
+            self._lazy_params.add(name)
+        else:
+            self._lazy_params.discard(name)
+        for parent, prefix in self._parents:
+            parent._refresh(prefix + self.SEPARATOR + name)
+
+    @property
+    def has_lazy_params(self):
+        """
+        Whether any method, including mounted ones, was added with lazy_params.
+        Requests are decoded with :func:`jsonrpc.lazy.decode_request` then.
+
+        :rtype: bool
+        """
+        return bool(self._lazy_params)
+
+    def get_executor(self, name):
+        """
+        Executor the method should be run in, or None if it should be called in place.
+
+        :type name: str
+        :rtype: None or concurrent.futures.Executor
+        """
+        entry = self._table.get(name)
+        if entry is None or entry[1] is None:
+            return None
+        executor = entry[1].get('executor')
+        if executor == 'process':
+            # pool of the dispatcher the method was added to
+            return entry[2].process_pool
+        return executor
+
+    def get_cache(self, name):
+        """
+        Result cache of the method, or None if it is not cached.
+
+        :type name: str
+        :rtype: None or jsonrpc.cache.MethodCache
+        """
+        options = self.get_options(name)
+        return options.get('cache') if options is not None else None
+
+    def invalidate(self, name, *args, **kwargs):
+        """
+        Drop cached result of the method call with given params.
+        Without params all cached results of the method are dropped.
+
+        :type name: str
+        """
+        cache = self.get_cache(name)
+        if cache is not None:
+            cache.invalidate(*args, **kwargs)
+
+    def cache_stats(self):
+        """
+        Hit, miss and eviction counters of cached methods.
+
+        :return: Mapping method name to its counters
+        :rtype: dict
+        """
+        return {
+            name: options['cache'].stats()
+            for name, (_, options, _, _) in self._table.items()
+            if options is not None and 'cache' in options
+        }
+
+    @property
+    def process_pool(self):
+        """ Process pool for CPU-bound methods, created on first use.
+        :rtype: concurrent.futures.ProcessPoolExecutor
+        """
+        if self._process_pool is None:
+            with self._process_pool_lock:
+                if self._process_pool is None:
+                    self._process_pool = ProcessPoolExecutor(max_workers=self.process_workers)
+        return self._process_pool
+
+    def shutdown(self, wait=True):
+        """ Shutdown the process pools of this and mounted dispatchers, if they were started.
+        :type wait: bool
+        """
+        with self._process_pool_lock:
+            pool, self._process_pool = self._process_pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+        for dispatcher in self.mounts.values():
+            dispatcher.shutdown(wait=wait)
+
     def build_method_map(self, prototype):
         """
         Add prototype methods to the dispatcher.
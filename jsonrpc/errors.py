@@ -8,6 +8,8 @@ class JSONRPCParseError(JSONRPCError):
     An error occurred on the server while parsing the JSON text.
     """
 
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         super().__init__(-32700, "Parse error", **kwargs)
 
@@ -18,6 +20,8 @@ class JSONRPCInvalidRequest(JSONRPCError):
     The JSON sent is not a valid Request object.
     """
 
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         super().__init__(-32600, "Invalid Request", **kwargs)
 
@@ -28,6 +32,8 @@ class JSONRPCMethodNotFound(JSONRPCError):
     The method does not exist / is not available.
     """
 
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         super().__init__(-32601, "Method not found", **kwargs)
 
@@ -38,6 +44,8 @@ class JSONRPCInvalidParams(JSONRPCError):
     Invalid method parameter(s).
     """
 
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         super().__init__(-32602, "Invalid params", **kwargs)
 
@@ -48,6 +56,8 @@ class JSONRPCInternalError(JSONRPCError):
     Internal JSON-RPC error.
     """
 
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         super().__init__(-32603, "Internal error", **kwargs)
 
@@ -58,5 +68,7 @@ class JSONRPCServerError(JSONRPCError):
     Reserved for implementation-defined server-errors.
     """
 
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         super().__init__(-32000, "Server error", **kwargs)
@@ -0,0 +1,309 @@
+""" Message framing for stream transports.
+
+JSON-RPC messages sent over a stream socket have to be delimited somehow:
+
+* "nul" — message is followed by NUL byte,
+* "newline" — message is followed by line feed (JSON lines),
+* "length" — message is preceded by its length, 4-byte big-endian unsigned integer.
+
+Encoded JSON never contains raw NUL or line feed characters, so delimiters are safe.
+Binary encodings (:mod:`jsonrpc.msgpack`) could contain any bytes, only "length" carries them.
+
+Asyncio transports read frames with :meth:`Framing.read_frame`, blocking sockets
+use :class:`FrameDecoder` and :func:`send_frame`.
+"""
+import asyncio
+import struct
+
+from jsonrpc.exceptions import JSONRPCException
+
+#: Default limit of single message size in bytes
+DEFAULT_MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+
+class FrameError(JSONRPCException):
+    """ Stream is broken: frame is too big or connection closed in the middle of a frame. """
+    pass
+
+
+class Framing:
+    """ Base class for framing methods. """
+
+    name = None
+    #: Whether messages could contain any bytes, e.g. be encoded with binary codec
+    binary = False
+
+    def frame(self, payload):
+        """ Buffers to be written for message, in order.
+        Payload is not copied, so buffers could be written with writelines() or sendmsg().
+
+        :type payload: bytes
+        :rtype: tuple of bytes
+        """
+        raise NotImplementedError
+
+    def frame_stream(self, chunks, size):
+        """ Buffers to be written for message given chunk by chunk.
+
+        :type chunks: iterator of bytes
+        :param size: Size of message in bytes
+        :type size: int
+        :rtype: iterator of bytes
+        """
+        raise NotImplementedError
+
+    def find_frame(self, buffer, start, end, scanned=0):
+        """ Locate the first complete message in buffer[start:end].
+
+        :type buffer: bytearray
+        :type start: int
+        :type end: int
+        :param scanned: buffer[start:scanned] was searched already and holds no complete frame,
+            so slowly received long message is not searched again from its start
+        :type scanned: int
+        :return: (message start, message end, start of the next frame) or None if frame is incomplete
+        :rtype: None or tuple
+        """
+        raise NotImplementedError
+
+    def pending_size(self, buffer, start, end):
+        """ Size of message of incomplete frame in buffer[start:end], as far as it is known.
+        :rtype: int
+        """
+        return end - start
+
+    async def read_frame(self, reader, max_size=DEFAULT_MAX_FRAME_SIZE):
+        """ Read single message.
+
+        :type reader: asyncio.StreamReader
+        :type max_size: int
+        :return: Message without framing or None if connection is closed between frames
+        :rtype: None or bytes or memoryview
+        :raise FrameError:
+        """
+        raise NotImplementedError
+
+
+class DelimiterFraming(Framing):
+    """ Messages are followed by delimiter byte.
+
+    Stream reader should be created with limit greater than max_size,
+    e.g. asyncio.start_server(…, limit=max_size + 1).
+    """
+
+    delimiter = None
+
+    def frame(self, payload):
+        return payload, self.delimiter
+
+    def frame_stream(self, chunks, size):
+        yield from chunks
+        yield self.delimiter
+
+    def find_frame(self, buffer, start, end, scanned=0):
+        position = buffer.find(self.delimiter, max(start, scanned), end)
+        if position < 0:
+            return None
+        return start, position, position + 1
+
+    async def read_frame(self, reader, max_size=DEFAULT_MAX_FRAME_SIZE):
+        try:
+            data = await reader.readuntil(self.delimiter)
+        except asyncio.IncompleteReadError as e:
+            if e.partial.strip():
+                raise FrameError("Connection closed in the middle of a frame")
+            return None
+        except asyncio.LimitOverrunError:
+            raise FrameError("Frame is too big")
+        if len(data) - 1 > max_size:
+            raise FrameError("Frame is too big")
+        return memoryview(data)[:-1]
+
+
+class NulFraming(DelimiterFraming):
+    """ Messages are followed by NUL byte. """
+
+    name = 'nul'
+    delimiter = b'\x00'
+
+
+class NewlineFraming(DelimiterFraming):
+    """ Messages are followed by line feed. """
+
+    name = 'newline'
+    delimiter = b'\n'
+
+
+class LengthPrefixedFraming(Framing):
+    """ Messages are preceded by their length in bytes. """
+
+    name = 'length'
+    binary = True
+    header = struct.Struct('!I')
+
+    def frame(self, payload):
+        return self.header.pack(len(payload)), payload
+
+    def frame_stream(self, chunks, size):
+        yield self.header.pack(size)
+        yield from chunks
+
+    def find_frame(self, buffer, start, end, scanned=0):
+        if end - start < self.header.size:
+            return None
+        length, = self.header.unpack_from(buffer, start)
+        payload_start = start + self.header.size
+        if end - payload_start < length:
+            return None
+        return payload_start, payload_start + length, payload_start + length
+
+    def pending_size(self, buffer, start, end):
+        if end - start < self.header.size:
+            return 0
+        return self.header.unpack_from(buffer, start)[0]
+
+    async def read_frame(self, reader, max_size=DEFAULT_MAX_FRAME_SIZE):
+        try:
+            header = await reader.readexactly(self.header.size)
+        except asyncio.IncompleteReadError as e:
+            if e.partial:
+                raise FrameError("Connection closed in the middle of a frame")
+            return None
+        length, = self.header.unpack(header)
+        if length > max_size:
+            raise FrameError("Frame is too big")
+        try:
+            return await reader.readexactly(length)
+        except asyncio.IncompleteReadError:
+            raise FrameError("Connection closed in the middle of a frame")
+
+
+FRAMINGS = {framing.name: framing for framing in (NulFraming, NewlineFraming, LengthPrefixedFraming)}
+
+
+def get_framing(framing):
+    """ Get framing instance.
+
+    :param framing: Framing instance (returned as is) or one of names: "nul", "newline", "length"
+    :type framing: str or Framing
+    :rtype: Framing
+    :raise ValueError: Unknown framing name
+    """
+    if isinstance(framing, Framing):
+        return framing
+    try:
+        return FRAMINGS[framing]()
+    except KeyError:
+        raise ValueError("framing should be one of {0}, not {1!r}".format(sorted(FRAMINGS), framing))
+
+
+class FrameDecoder:
+    """ Splits data read from blocking socket into messages.
+
+    Data is received straight into preallocated buffer with recv_into(),
+    any number of frames per read is supported. Messages are returned as memoryview
+    slices of the buffer, without copying, so they are valid only until the next
+    :meth:`recv_into` or :meth:`feed` call — decode them before reading more.
+
+    Usage::
+
+        decoder = FrameDecoder('nul')
+        while decoder.recv_into(sock):
+            for message in decoder:
+                handle(message)
+
+    :param framing: How messages are delimited
+    :type framing: str or Framing
+    :param max_frame_size: Maximum size of a single message in bytes
+    :type max_frame_size: int
+    :param buffer_size: Initial size of buffer, it grows up to the frame size if needed
+    :type buffer_size: int
+    """
+
+    def __init__(self, framing='nul', max_frame_size=DEFAULT_MAX_FRAME_SIZE, buffer_size=64 * 1024):
+        self.framing = get_framing(framing)
+        self.max_frame_size = max_frame_size
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+        # end of data searched for frame already
+        self._scanned = 0
+
+    def __len__(self):
+        """ Number of received bytes not consumed yet. """
+        return self._end - self._start
+
+    def __iter__(self):
+        """ Complete messages received so far.
+        :rtype: iterator of memoryview
+        :raise FrameError: Frame is too big
+        """
+        while True:
+            found = self.framing.find_frame(self._buffer, self._start, self._end, self._scanned)
+            if found is None:
+                self._scanned = self._end
+                break
+            payload_start, payload_end, self._start = found
+            if payload_end - payload_start > self.max_frame_size:
+                raise FrameError("Frame is too big")
+            yield self._view[payload_start:payload_end]
+        if self.framing.pending_size(self._buffer, self._start, self._end) > self.max_frame_size:
+            raise FrameError("Frame is too big")
+
+    def recv_into(self, sock):
+        """ Receive data from socket.
+
+        :type sock: socket.socket
+        :return: Number of bytes received, 0 means connection is closed
+        :rtype: int
+        """
+        self._reserve(1)
+        received = sock.recv_into(self._view[self._end:])
+        self._end += received
+        return received
+
+    def feed(self, data):
+        """ Add data received some other way.
+        :type data: bytes or bytearray or memoryview
+        """
+        self._reserve(len(data))
+        self._view[self._end:self._end + len(data)] = data
+        self._end += len(data)
+
+    def _reserve(self, size):
+        """ Make room for size more bytes after received data. """
+        if len(self._buffer) - self._end >= size:
+            return
+        pending = self._end - self._start
+        if pending <= len(self._buffer) // 2 and len(self._buffer) - pending >= size:
+            # move incomplete frame to the beginning of the buffer
+            self._view[:pending] = self._view[self._start:self._end]
+        else:
+            buffer = bytearray(max(len(self._buffer) * 2, pending + size))
+            buffer[:pending] = self._view[self._start:self._end]
+            self._buffer, self._view = buffer, memoryview(buffer)
+        self._scanned = max(self._scanned - self._start, 0)
+        self._start, self._end = 0, pending
+
+
+def send_frame(sock, framing, payload):
+    """ Send message to blocking socket.
+    Framing and payload are gathered by sendmsg(), without concatenation.
+
+    :type sock: socket.socket
+    :type framing: Framing
+    :type payload: bytes
+    """
+    buffers = framing.frame(payload)
+    if not hasattr(sock, 'sendmsg'):  # pragma: no cover
+        sock.sendall(b''.join(buffers))
+        return
+    sent = sock.sendmsg(buffers)
+    for buffer in buffers:
+        # partial send, e.g. interrupted by signal
+        if sent >= len(buffer):
+            sent -= len(buffer)
+            continue
+        sock.sendall(memoryview(buffer)[sent:])
+        sent = 0
@@ -0,0 +1,282 @@
+""" Lazy decoding of request params.
+
+Methods added with ``lazy_params=True`` get params as a single :class:`LazyParams`
+argument, which is decoded only when it is accessed. Envelope of the request
+(``jsonrpc``, ``method`` and ``id``) is decoded first, so unknown methods are
+rejected without decoding params at all, and methods which only forward, store
+or measure params do not build python objects for them.
+
+Usage::
+
+    @dispatcher.add_method(lazy_params=True)
+    def store(params):
+        storage.append(params.raw)
+        return params.size
+
+Params are not decoded to be found: members before them are parsed from the
+beginning of the request, members after them from the end, params are the text
+in between. Every member of a valid request, except params, is a scalar. Only
+strings and brackets of params are matched to check that the text is a single
+array or object, which is much cheaper than decoding it. Requests of other layouts, batches and
+requests shorter than :attr:`jsonrpc.manager.JSONRPCResponseManager.lazy_params_min_size` are
+decoded as usual, lazy methods get params wrapped with :meth:`LazyParams.from_value` then.
+"""
+import re
+
+from jsonrpc.cache import MISSING
+from jsonrpc.exceptions import JSONRPCParseException
+
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+_SCALAR = re.compile(rb'[^ \t\n\r,:\[\]{}"]+')
+_STRING_OR_BRACKET = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]', re.S)
+
+_WHITESPACE_BYTES = frozenset(b' \t\n\r')
+_DELIMITERS = frozenset(b' \t\n\r,:[]{}"')
+_QUOTE, _BACKSLASH, _COMMA, _COLON = ord('"'), ord('\\'), ord(','), ord(':')
+_OPENING, _CLOSING = frozenset(b'[{'), frozenset(b']}')
+_PAIRS = {ord('['): ord(']'), ord('{'): ord('}')}
+_PARAMS_KEY = b'"params"'
+
+
+class LazyParams:
+    """ Params of request, decoded on first access.
+
+    :param raw: JSON text of params, array or object
+    :type raw: bytes
+    :param codec: Codec to decode params with
+    :type codec: jsonrpc.codecs.JSONCodec
+    """
+
+    __slots__ = ('_raw', '_codec', '_value')
+
+    def __init__(self, raw, codec):
+        self._raw = raw
+        self._codec = codec
+        self._value = MISSING
+
+    def __repr__(self):
+        return '{0}(<{1} bytes>)'.format(self.__class__.__name__, self.size)
+
+    def __reduce__(self):
+        # pickled as JSON text, e.g. for methods run in process pool
+        raw = self._raw if self._raw is not None else self.raw
+        return self.__class__, (raw, self._codec)
+
+    @classmethod
+    def from_value(cls, value, codec):
+        """ Params which are decoded already, e.g. of batch members.
+        JSON text is encoded on access.
+
+        :type value: list or dict
+        :type codec: jsonrpc.codecs.JSONCodec
+        :rtype: LazyParams
+        """
+        params = cls(None, codec)
+        params._value = value
+        return params
+
+    @property
+    def size(self):
+        """ Size of params JSON text, known without decoding.
+        :rtype: int
+        """
+        if self._raw is None:
+            return len(self.raw)
+        return len(self._raw)
+
+    @property
+    def value(self):
+        """ Decoded params.
+        :rtype: list or dict
+        :raise JSONRPCParseException: Params are not valid JSON
+        """
+        if self._value is MISSING:
+            try:
+                self._value = self._codec.decode(self._raw)
+            except (TypeError, ValueError):
+                raise JSONRPCParseException("Cannot deserialize params!")
+        return self._value
+
+    @property
+    def raw(self):
+        """ JSON text of params, e.g. to store it or return it as is with RawJSON(params.raw).
+        Params are validated on the first access, so they are decoded once anyway,
+        but encoding them back is saved.
+
+        :rtype: bytes
+        :raise JSONRPCParseException: Params are not valid JSON
+        """
+        if self._raw is None:
+            self._raw = self._codec.encode_bytes(self._value)
+        else:
+            self.value
+        return self._raw
+
+
+def split_params(data):
+    """ Split single request into envelope and params, without looking into params.
+
+    :type data: bytes
+    :return: JSON object with all members of request except params and JSON text of params;
+        None, if data is not an object with array or object params and scalar other members
+    :rtype: None or tuple
+    """
+    match_whitespace = _WHITESPACE.match
+    pos = match_whitespace(data).end()
+    if data[pos:pos + 1] != b'{':
+        return None
+    members = []
+    pos = match_whitespace(data, pos + 1).end()
+    while True:
+        key = _STRING.match(data, pos)
+        if key is None:
+            return None
+        colon = match_whitespace(data, key.end()).end()
+        if data[colon:colon + 1] != b':':
+            return None
+        value = match_whitespace(data, colon + 1).end()
+        if key.group() == _PARAMS_KEY:
+            break
+        match = (_STRING if data[value:value + 1] == b'"' else _SCALAR).match(data, value)
+        if match is None:
+            return None
+        members.append(data[pos:match.end()])
+        pos = match_whitespace(data, match.end()).end()
+        if data[pos:pos + 1] != b',':
+            return None
+        pos = match_whitespace(data, pos + 1).end()
+
+    if value >= len(data) or data[value] not in _OPENING:
+        return None
+    tail = _split_tail(data, value)
+    if tail is None:
+        return None
+    end, trailing = tail
+    members.extend(trailing)
+    return b'{' + b','.join(members) + b'}', data[value:end]
+
+
+def _split_tail(data, start):
+    """ Parse scalar members from the end of the object back to the container starting at data[start].
+    :return: (end of the container, raw members in original order) or None
+    """
+    pos = _skip_whitespace_back(data, len(data), start)
+    if pos <= start or data[pos - 1] != ord('}'):
+        return None
+    pos = _skip_whitespace_back(data, pos - 1, start)
+    members = []
+    while pos > start:
+        if data[pos - 1] in _CLOSING:
+            # bracket could close non-scalar member after params, e.g. "id": [2]
+            if not _is_container(data, start, pos):
+                return None
+            members.reverse()
+            return pos, members
+        end = pos
+        pos = _value_start_back(data, pos, start)
+        if pos is None:
+            return None
+        pos = _skip_whitespace_back(data, pos, start)
+        if pos <= start or data[pos - 1] != _COLON:
+            return None
+        pos = _skip_whitespace_back(data, pos - 1, start)
+        if pos <= start or data[pos - 1] != _QUOTE:
+            return None
+        pos = _string_start_back(data, pos, start)
+        if pos is None:
+            return None
+        members.append(data[pos:end])
+        pos = _skip_whitespace_back(data, pos, start)
+        if pos <= start or data[pos - 1] != _COMMA:
+            return None
+        pos = _skip_whitespace_back(data, pos - 1, start)
+    return None
+
+
+def _is_container(data, start, end):
+    """ Whether data[start:end] is a single array or object: bracket at data[start] is closed at data[end - 1].
+    Strings are skipped and brackets are counted, values are not parsed.
+    """
+    if _PAIRS[data[start]] != data[end - 1]:
+        return False
+    depth = 0
+    for match in _STRING_OR_BRACKET.finditer(data, start, end):
+        char = data[match.start()]
+        if char in _OPENING:
+            depth += 1
+        elif char in _CLOSING:
+            depth -= 1
+            if not depth:
+                return match.end() == end
+    return False
+
+
+def _skip_whitespace_back(data, pos, start):
+    while pos > start and data[pos - 1] in _WHITESPACE_BYTES:
+        pos -= 1
+    return pos
+
+
+def _value_start_back(data, end, start):
+    """ Start of scalar value ending at data[end - 1], None if there is no such value """
+    if data[end - 1] == _QUOTE:
+        return _string_start_back(data, end, start)
+    pos = end
+    while pos > start and data[pos - 1] not in _DELIMITERS:
+        pos -= 1
+    return pos if pos < end else None
+
+
+def _string_start_back(data, end, start):
+    """ Opening quote of string whose closing quote is data[end - 1].
+    Quote is escaped if it is preceded by an odd number of backslashes.
+    """
+    pos = end - 1
+    while True:
+        pos = data.rfind(b'"', start + 1, pos)
+        if pos < 0:
+            return None
+        backslashes = 0
+        while data[pos - 1 - backslashes] == _BACKSLASH:
+            backslashes += 1
+        if not backslashes % 2:
+            return pos
+
+
+def decode_request(data, dispatcher, codec):
+    """ Decode single request, params of lazy methods are left as :class:`LazyParams`.
+    Params of unknown methods are not decoded at all, they are dropped.
+
+    :type data: str or bytes or bytearray or memoryview
+    :type dispatcher: jsonrpc.dispatcher.Dispatcher
+    :type codec: jsonrpc.codecs.JSONCodec
+    :return: Request data or None, if request should be decoded as usual
+    :rtype: None or dict
+    :raise ValueError: Request is not valid JSON
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    elif not isinstance(data, bytes):
+        data = bytes(data)
+    parts = split_params(data)
+    if parts is None:
+        return None
+    envelope, params = parts
+    request = codec.decode(envelope)
+    if not isinstance(request, dict):
+        return None
+    method = request.get('method')
+    if not isinstance(method, str):
+        request['params'] = codec.decode(params)
+        return request
+    try:
+        dispatcher[method]
+    except KeyError:
+        return request
+    options = dispatcher.get_options(method)
+    if options is not None and options.get('lazy_params'):
+        request['params'] = LazyParams(params, codec)
+    else:
+        request['params'] = codec.decode(params)
+    return request
@@ -1,12 +1,57 @@
+import copy
+import itertools
+
 from jsonrpc.errors import JSONRPCInvalidRequest, JSONRPCParseError
 from jsonrpc.exceptions import JSONRPCInvalidRequestException, JSONRPCParseException
 from jsonrpc.request import JSONRPCSingleRequest, JSONRPCBatchRequest
-from jsonrpc.response import JSONRPCSingleResponse
+from jsonrpc.response import JSONRPCSingleResponse, JSONRPCBatchResponse
+from jsonrpc.streaming import BatchStream, DEFAULT_CHUNK_SIZE, iter_chunks
 from jsonrpc.base import JSONSerializable
+from jsonrpc.codecs import get_codec
+from jsonrpc.lazy import decode_request
 
 
 class JSONRPCResponseManager(JSONSerializable):
-    """ JSON-RPC response manager. """
+    """ JSON-RPC response manager.
+
+    :param executor: Executor for batch members, e.g. concurrent.futures.ThreadPoolExecutor.
+        If omitted, batch members are processed one after another.
+    :type executor: None or concurrent.futures.Executor
+    :param max_batch_workers: Maximum number of members of one batch running at once.
+    :type max_batch_workers: None or int
+    :param codec: JSON codec class or instance, used for requests and responses.
+        The fastest available one is used by default, see :mod:`jsonrpc.codecs`.
+    :type codec: None or type or jsonrpc.codecs.JSONCodec
+    :param stats: Collector of per-method call statistics. Disabled by default.
+    :type stats: None or jsonrpc.stats.StatsCollector
+    :param notifications: Queue notifications are executed from in background,
+        so responses do not wait for them. By default notifications are processed in place.
+    :type notifications: None or jsonrpc.notifications.NotificationQueue
+    """
+
+    #: Requests to methods added with lazy_params are split into envelope and params
+    #: only if they are at least that long, smaller ones are faster to decode whole.
+    lazy_params_min_size = 4096
+
+    def __init__(self, serialize_hook=None, deserialize_hook=None, executor=None, max_batch_workers=None,
+                 codec=None, stats=None, notifications=None):
+        super().__init__(serialize_hook=serialize_hook, deserialize_hook=deserialize_hook, codec=codec)
+        self.executor = executor
+        self.stats = stats
+        self.max_batch_workers = max_batch_workers
+        self.notifications = notifications
+
+    def with_codec(self, codec):
+        """ Manager with the same settings and hooks, but another codec,
+        e.g. for clients speaking MessagePack, see :mod:`jsonrpc.msgpack`.
+
+        :param codec: Codec class or instance
+        :type codec: type or jsonrpc.codecs.JSONCodec
+        :rtype: JSONRPCResponseManager
+        """
+        manager = copy.copy(self)
+        manager.codec = get_codec(codec, default=self.serialize_hook, object_hook=self.deserialize_hook)
+        return manager
 
     def handle(self, request_string, dispatcher):
         """
@@ -14,24 +59,160 @@ class JSONRPCResponseManager(JSONSerializable):
         Given dispatcher it handles request (both single and batch) and handles errors.
         Request could be handled in parallel, it is server responsibility.
 
-        :param request_string: JSON string.
+        :param request_string: JSON string or UTF-8 encoded JSON.
             Will be converted into JSONRPCSingleRequest or JSONRPCBatchRequest
-        :type request_string: str
+        :type request_string: str or bytes or bytearray or memoryview
         :type dispatcher: Dispatcher or dict
         :rtype: JSONRPCSingleResponse or JSONRPCBatchResponse
         """
 
         try:
-            data = self.deserialize(request_string)
-            if isinstance(data, list):
-                request = JSONRPCBatchRequest(data, serialize_hook=self.serialize_hook)
-            elif isinstance(data, dict):
-                request = JSONRPCSingleRequest(data, serialize_hook=self.serialize_hook)
+            request = self._parse(request_string, dispatcher)
+        except (TypeError, ValueError, JSONRPCParseException):
+            return JSONRPCParseError(codec=self.codec).as_response()
+        except JSONRPCInvalidRequestException:
+            return JSONRPCInvalidRequest(codec=self.codec).as_response()
+        else:
+            if isinstance(request, JSONRPCBatchRequest):
+                return request.process(
+                    dispatcher, executor=self.executor, max_workers=self.max_batch_workers, stats=self.stats,
+                    notifications=self.notifications
+                )
+            if self.notifications is not None and request.is_notification:
+                self.notifications.submit(request, dispatcher, self.stats)
+                return None
+            return request.process(dispatcher, stats=self.stats)
+
+    def handle_bytes(self, request_bytes, dispatcher):
+        """
+        Handle request like :meth:`handle` does, but return encoded response.
+        Suitable for transports that work with bytes, no intermediate str objects are made.
+
+        :type request_bytes: bytes or bytearray or memoryview
+        :type dispatcher: Dispatcher or dict
+        :return: UTF-8 encoded response or None if there is nothing to send back
+        :rtype: bytes or None
+        """
+        response = self.handle(request_bytes, dispatcher)
+        if response is not None:
+            return response.json_bytes
+
+    def handle_stream(self, source, dispatcher, chunk_size=DEFAULT_CHUNK_SIZE, max_element_size=None):
+        """
+        Handle request read from stream.
+        Batch is parsed element by element: lazy batch response is returned as soon as
+        the first element is read, requests are processed while response is iterated
+        (e.g. with JSONRPCBatchResponse.iter_json()). Invalid elements get their own
+        JSONRPCInvalidRequest responses. Non-batch requests are read whole and passed to :meth:`handle`.
+        Batch response is empty, if all elements are notifications: it is serialized to empty
+        string and len() of it is 0, nothing should be sent back then.
+
+        :param source: File-like object with read() method or iterable of byte chunks
+        :type dispatcher: Dispatcher or dict
+        :param chunk_size: Size of chunks to read from file-like source
+        :type chunk_size: int
+        :param max_element_size: Maximum size of a single batch element in bytes
+        :type max_element_size: None or int
+        :rtype: JSONRPCSingleResponse or JSONRPCBatchResponse
+        """
+        if self.codec.binary:
+            # binary batch could not be split before it is decoded
+            return self.handle(b''.join(iter_chunks(source, chunk_size)), dispatcher)
+        stream = BatchStream(source, codec=self.codec, chunk_size=chunk_size, max_element_size=max_element_size)
+        try:
+            is_batch = stream.detect()
+        except JSONRPCParseException:
+            return JSONRPCParseError(codec=self.codec).as_response()
+        if not is_batch:
+            return self.handle(stream.read_body(), dispatcher)
+
+        items = iter(stream)
+        first = next(items, None)
+        if first is None:
+            return JSONRPCInvalidRequest(codec=self.codec).as_response()
+        return JSONRPCBatchResponse(
+            self._process_stream(itertools.chain([first], items), dispatcher),
+            codec=self.codec
+        )
+
+    def _process_stream(self, items, dispatcher):
+        for item in items:
+            if not isinstance(item, JSONRPCSingleRequest):
+                yield item
+            elif self.notifications is not None and item.is_notification:
+                self.notifications.submit(item, dispatcher, self.stats)
             else:
-                raise JSONRPCInvalidRequestException
+                response = item.process(dispatcher, stats=self.stats)
+                if response is not None:
+                    yield response
+
+    def _parse(self, request_string, dispatcher=None):
+        """ Build request object from string.
+        Envelope of large request is decoded before params, if dispatcher has methods with lazy params.
+
+        :type request_string: str or bytes or bytearray or memoryview
+        :type dispatcher: None or Dispatcher or dict
+        :rtype: JSONRPCSingleRequest or JSONRPCBatchRequest
+        :raise JSONRPCInvalidRequestException:
+        """
+        lazy = not self.codec.binary and getattr(dispatcher, 'has_lazy_params', False)
+        if lazy and len(request_string) >= self.lazy_params_min_size:
+            data = decode_request(request_string, dispatcher, self.codec)
+            if data is not None:
+                return JSONRPCSingleRequest(data, codec=self.codec)
+        data = self.deserialize(request_string)
+        if isinstance(data, list):
+            return JSONRPCBatchRequest(data, codec=self.codec)
+        elif isinstance(data, dict):
+            return JSONRPCSingleRequest(data, codec=self.codec)
+        else:
+            raise JSONRPCInvalidRequestException
+
+
+class AsyncJSONRPCResponseManager(JSONRPCResponseManager):
+    """ JSON-RPC response manager for asyncio based servers.
+
+    Coroutine methods are awaited and members of a batch are executed concurrently.
+    Plain functions are called as is, so they should not block the event loop,
+    unless offload_sync is set. Notifications queue is used only by synchronous handlers.
+
+    :param offload_sync: Run plain (not coroutine) functions in the default executor of the event loop,
+        so a slow or blocking method does not stall other requests.
+    :type offload_sync: bool
+    """
+
+    def __init__(self, *args, offload_sync=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.offload_sync = offload_sync
+
+    async def handle_async(self, request_string, dispatcher):
+        """
+        Asynchronous counterpart of :meth:`handle`.
+
+        :param request_string: JSON string or UTF-8 encoded JSON.
+            Will be converted into JSONRPCSingleRequest or JSONRPCBatchRequest
+        :type request_string: str or bytes or bytearray or memoryview
+        :type dispatcher: Dispatcher or dict
+        :rtype: JSONRPCSingleResponse or JSONRPCBatchResponse
+        """
+
+        try:
+            request = self._parse(request_string, dispatcher)
         except (TypeError, ValueError, JSONRPCParseException):
-            return JSONRPCParseError().as_response()
+            return JSONRPCParseError(codec=self.codec).as_response()
         except JSONRPCInvalidRequestException:
-            return JSONRPCInvalidRequest().as_response()
+            return JSONRPCInvalidRequest(codec=self.codec).as_response()
         else:
-            return request.process(dispatcher)
+            return await request.process_async(dispatcher, stats=self.stats, offload_sync=self.offload_sync)
+
+    async def handle_bytes_async(self, request_bytes, dispatcher):
+        """
+        Asynchronous counterpart of :meth:`handle_bytes`.
+
+        :type request_bytes: bytes or bytearray or memoryview
+        :type dispatcher: Dispatcher or dict
+        :rtype: bytes or None
+        """
+        response = await self.handle_async(request_bytes, dispatcher)
+        if response is not None:
+            return response.json_bytes
@@ -0,0 +1,344 @@
+""" MessagePack codec.
+
+Binary encoding of the same JSON-RPC messages, see https://msgpack.org.
+It is more compact than JSON, especially for numbers, and carries bytes
+natively instead of base64. Implementation is pure python, no dependencies.
+
+Only types JSON has are supported, plus bytes (bin family). Extension types
+are not. Other objects are passed to default hook, like JSON codecs do.
+
+Usage::
+
+    manager = JSONRPCResponseManager(codec=MessagePackCodec)
+    client = Client(address, framing='length', codec=MessagePackCodec)
+
+HTTP applications (:mod:`jsonrpc.wsgi`, :mod:`jsonrpc.asgi`) choose it by
+Content-Type: application/msgpack, TCP server recognizes it in length
+prefixed frames, see :func:`is_msgpack`.
+"""
+import struct
+
+from jsonrpc.codecs import JSONCodec
+
+CONTENT_TYPE = 'application/msgpack'
+
+_B = struct.Struct('>B').pack
+_BB = struct.Struct('>BB').pack
+_BH = struct.Struct('>BH').pack
+_BI = struct.Struct('>BI').pack
+_BQ = struct.Struct('>BQ').pack
+_Bb = struct.Struct('>Bb').pack
+_Bh = struct.Struct('>Bh').pack
+_Bi = struct.Struct('>Bi').pack
+_Bq = struct.Struct('>Bq').pack
+_Bf = struct.Struct('>Bf').pack
+_Bd = struct.Struct('>Bd').pack
+
+_u8 = struct.Struct('>B').unpack_from
+_u16 = struct.Struct('>H').unpack_from
+_u32 = struct.Struct('>I').unpack_from
+_u64 = struct.Struct('>Q').unpack_from
+_i8 = struct.Struct('>b').unpack_from
+_i16 = struct.Struct('>h').unpack_from
+_i32 = struct.Struct('>i').unpack_from
+_i64 = struct.Struct('>q').unpack_from
+_f32 = struct.Struct('>f').unpack_from
+_f64 = struct.Struct('>d').unpack_from
+
+# First bytes of map and array, JSON text never starts with them
+_CONTAINER_MARKERS = frozenset(range(0x80, 0xa0)) | {0xdc, 0xdd, 0xde, 0xdf}
+
+
+def is_msgpack(data):
+    """ Whether message is MessagePack encoded rather than JSON.
+    JSON-RPC message is an object or array, MessagePack ones start with bytes never found in JSON text.
+
+    :type data: bytes or bytearray or memoryview
+    :rtype: bool
+    """
+    return len(data) > 0 and data[0] in _CONTAINER_MARKERS
+
+
+def _header(buffer, size, fix, fix_limit, code):
+    """ Append header of str, array or map: fix format if it fits, then 16 and 32 bit ones. """
+    if size < fix_limit:
+        buffer += _B(fix | size)
+    elif size < 0x10000:
+        buffer += _BH(code, size)
+    elif size < 0x100000000:
+        buffer += _BI(code + 1, size)
+    else:
+        raise ValueError("Object is too big for MessagePack")
+
+
+def _pack_int(obj, buffer):
+    if 0 <= obj < 0x80:
+        buffer.append(obj)
+    elif -32 <= obj < 0:
+        buffer.append(obj & 0xff)
+    elif obj >= 0:
+        if obj < 0x100:
+            buffer += _BB(0xcc, obj)
+        elif obj < 0x10000:
+            buffer += _BH(0xcd, obj)
+        elif obj < 0x100000000:
+            buffer += _BI(0xce, obj)
+        elif obj < 0x10000000000000000:
+            buffer += _BQ(0xcf, obj)
+        else:
+            raise TypeError("Integer {0} is too big for MessagePack".format(obj))
+    elif obj >= -0x80:
+        buffer += _Bb(0xd0, obj)
+    elif obj >= -0x8000:
+        buffer += _Bh(0xd1, obj)
+    elif obj >= -0x80000000:
+        buffer += _Bi(0xd2, obj)
+    elif obj >= -0x8000000000000000:
+        buffer += _Bq(0xd3, obj)
+    else:
+        raise TypeError("Integer {0} is too small for MessagePack".format(obj))
+
+
+def _pack_float(obj, buffer):
+    # float 32 is enough for many values, e.g. 0.5 or 1e10, it is used when no precision is lost
+    try:
+        data = _Bf(0xca, obj)
+    except OverflowError:
+        data = None
+    if data is not None and _f32(data, 1)[0] == obj:
+        buffer += data
+    else:
+        buffer += _Bd(0xcb, obj)
+
+
+def _pack_str(obj, buffer):
+    data = obj.encode('utf-8')
+    size = len(data)
+    if size < 32:
+        buffer.append(0xa0 | size)
+    elif size < 0x100:
+        buffer += _BB(0xd9, size)
+    else:
+        _header(buffer, size, 0xa0, 32, 0xda)
+    buffer += data
+
+
+def _pack_bin(obj, buffer):
+    size = len(obj)
+    if size < 0x100:
+        buffer += _BB(0xc4, size)
+    elif size < 0x10000:
+        buffer += _BH(0xc5, size)
+    elif size < 0x100000000:
+        buffer += _BI(0xc6, size)
+    else:
+        raise ValueError("Object is too big for MessagePack")
+    buffer += obj
+
+
+def _pack(obj, buffer, default):
+    cls = obj.__class__
+    if cls is str:
+        _pack_str(obj, buffer)
+    elif cls is int:
+        _pack_int(obj, buffer)
+    elif cls is dict:
+        _header(buffer, len(obj), 0x80, 16, 0xde)
+        for key, value in obj.items():
+            _pack(key, buffer, default)
+            _pack(value, buffer, default)
+    elif cls is list or cls is tuple:
+        _header(buffer, len(obj), 0x90, 16, 0xdc)
+        for value in obj:
+            if value.__class__ is int and 0 <= value < 0x80:
+                buffer.append(value)
+            else:
+                _pack(value, buffer, default)
+    elif cls is float:
+        _pack_float(obj, buffer)
+    elif obj is None:
+        buffer.append(0xc0)
+    elif obj is True:
+        buffer.append(0xc3)
+    elif obj is False:
+        buffer.append(0xc2)
+    elif cls is bytes or cls is bytearray:
+        _pack_bin(obj, buffer)
+    elif cls is memoryview:
+        _pack_bin(obj.cast('B'), buffer)
+    else:
+        _pack_other(obj, buffer, default)
+
+
+def _pack_other(obj, buffer, default):
+    """ Subclasses of builtin types are encoded as their bases, like json module does,
+    other objects are passed to default hook.
+    """
+    if isinstance(obj, str):
+        _pack_str(str(obj), buffer)
+    elif isinstance(obj, int):
+        _pack_int(int(obj), buffer)
+    elif isinstance(obj, float):
+        _pack_float(float(obj), buffer)
+    elif isinstance(obj, dict):
+        _pack(dict(obj), buffer, default)
+    elif isinstance(obj, (list, tuple)):
+        _pack(list(obj), buffer, default)
+    elif default is not None:
+        _pack(default(obj), buffer, default)
+    else:
+        raise TypeError("Object of type {0} is not MessagePack serializable".format(obj.__class__.__name__))
+
+
+def packb(obj, default=None):
+    """ Serialize obj to MessagePack.
+
+    :param default: Function called for objects that can't otherwise be serialized
+    :type default: None or callable
+    :rtype: bytes
+    :raise TypeError: obj is not serializable
+    """
+    buffer = bytearray()
+    _pack(obj, buffer, default)
+    return bytes(buffer)
+
+
+# Fixed size types: (struct unpacker, size) by type code
+_SCALARS = {
+    0xca: (_f32, 4), 0xcb: (_f64, 8),
+    0xcc: (_u8, 1), 0xcd: (_u16, 2), 0xce: (_u32, 4), 0xcf: (_u64, 8),
+    0xd0: (_i8, 1), 0xd1: (_i16, 2), 0xd2: (_i32, 4), 0xd3: (_i64, 8),
+}
+# Types with length header: (kind, struct unpacker of length, its size) by type code
+_SIZED = {
+    0xc4: ('bin', _u8, 1), 0xc5: ('bin', _u16, 2), 0xc6: ('bin', _u32, 4),
+    0xd9: ('str', _u8, 1), 0xda: ('str', _u16, 2), 0xdb: ('str', _u32, 4),
+    0xdc: ('array', _u16, 2), 0xdd: ('array', _u32, 4),
+    0xde: ('map', _u16, 2), 0xdf: ('map', _u32, 4),
+}
+_CONSTANTS = {0xc0: None, 0xc2: False, 0xc3: True}
+
+
+def _unpack(data, pos, object_hook):
+    """ Decode object starting at data[pos].
+    :return: (object, position after it)
+    """
+    code = data[pos]
+    pos += 1
+    if code < 0x80:
+        return code, pos
+    if code >= 0xe0:
+        return code - 0x100, pos
+    if code >= 0xa0 and code < 0xc0:
+        kind, size = 'str', code & 0x1f
+    elif code < 0x90:
+        kind, size = 'map', code & 0x0f
+    elif code < 0xa0:
+        kind, size = 'array', code & 0x0f
+    elif code in _SCALARS:
+        unpack, size = _SCALARS[code]
+        return unpack(data, pos)[0], pos + size
+    elif code in _CONSTANTS:
+        return _CONSTANTS[code], pos
+    elif code in _SIZED:
+        kind, unpack, header_size = _SIZED[code]
+        size = unpack(data, pos)[0]
+        pos += header_size
+    else:
+        raise ValueError("Unsupported MessagePack type 0x{0:02x}".format(code))
+
+    if kind == 'array':
+        return _unpack_array(data, pos, size, object_hook)
+    if kind == 'map':
+        return _unpack_map(data, pos, size, object_hook)
+    end = pos + size
+    if end > len(data):
+        raise ValueError("Unexpected end of MessagePack data")
+    if kind == 'str':
+        return data[pos:end].decode('utf-8'), end
+    return data[pos:end], end
+
+
+def _unpack_array(data, pos, size, object_hook):
+    items = []
+    append = items.append
+    for _ in range(size):
+        # numbers are decoded in place, they are the most common items
+        code = data[pos]
+        if code < 0x80:
+            append(code)
+            pos += 1
+        elif code == 0xca:
+            append(_f32(data, pos + 1)[0])
+            pos += 5
+        elif code == 0xcb:
+            append(_f64(data, pos + 1)[0])
+            pos += 9
+        else:
+            item, pos = _unpack(data, pos, object_hook)
+            append(item)
+    return items, pos
+
+
+def _unpack_map(data, pos, size, object_hook):
+    obj = {}
+    for _ in range(size):
+        code = data[pos]
+        if 0xa0 <= code < 0xc0:
+            # short str key
+            end = pos + 1 + (code & 0x1f)
+            if end > len(data):
+                raise ValueError("Unexpected end of MessagePack data")
+            key = data[pos + 1:end].decode('utf-8')
+            pos = end
+        else:
+            key, pos = _unpack(data, pos, object_hook)
+        code = data[pos]
+        if code < 0x80:
+            obj[key] = code
+            pos += 1
+        else:
+            obj[key], pos = _unpack(data, pos, object_hook)
+    if object_hook is not None:
+        return object_hook(obj), pos
+    return obj, pos
+
+
+def unpackb(data, object_hook=None):
+    """ Deserialize MessagePack document.
+
+    :type data: bytes or bytearray or memoryview
+    :param object_hook: Function called with every decoded map
+    :type object_hook: None or callable
+    :raise ValueError: data is not a valid MessagePack document
+    """
+    if isinstance(data, str):
+        raise ValueError("MessagePack data should be bytes, not str")
+    data = bytes(data)
+    try:
+        obj, pos = _unpack(data, 0, object_hook)
+    except (IndexError, struct.error, UnicodeDecodeError, RecursionError, TypeError) as e:
+        # TypeError is raised for unhashable map keys
+        raise ValueError("Invalid MessagePack data: {0}".format(e))
+    if pos != len(data):
+        raise ValueError("Extra data after MessagePack document")
+    return obj
+
+
+class MessagePackCodec(JSONCodec):
+    """ Codec encoding messages to MessagePack. Both encode() and encode_bytes() return bytes,
+    so do ``json`` properties of requests and responses encoded with it.
+    """
+
+    name = 'msgpack'
+    binary = True
+    content_type = CONTENT_TYPE
+
+    def encode(self, obj):
+        return packb(obj, self.default)
+
+    def encode_bytes(self, obj):
+        return packb(obj, self.default)
+
+    def decode(self, data):
+        return unpackb(data, self.object_hook)
@@ -0,0 +1,144 @@
+""" Background execution of notifications.
+
+Notifications (requests without id) never get a response, so there is no reason
+for the caller to wait for them. Pass :class:`NotificationQueue` to
+JSONRPCResponseManager(notifications=…) and notifications are put into a bounded
+queue served by worker threads, response is returned without waiting for them.
+"""
+import collections
+import threading
+
+#: Overflow policies of full queue
+BLOCK = 'block'
+DROP_OLDEST = 'drop_oldest'
+REJECT = 'reject'
+
+
+class NotificationQueue:
+    """ Bounded queue of notifications served by a pool of worker threads.
+
+    :param workers: Number of worker threads.
+    :type workers: int
+    :param maxsize: Maximum number of waiting notifications. None means unlimited.
+    :type maxsize: None or int
+    :param overflow: What to do with a new notification if queue is full:
+        "block" — wait for a free slot, "drop_oldest" — discard the oldest waiting
+        notification, "reject" — discard the new one.
+    :type overflow: str
+    """
+
+    OVERFLOW_POLICIES = (BLOCK, DROP_OLDEST, REJECT)
+
+    def __init__(self, workers=1, maxsize=1024, overflow=BLOCK):
+        if workers <= 0:
+            raise ValueError("workers should be positive")
+        if maxsize is not None and maxsize <= 0:
+            raise ValueError("maxsize should be positive")
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError("overflow should be one of {0}, not {1!r}".format(self.OVERFLOW_POLICIES, overflow))
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.queued = 0
+        self.dropped = 0
+        self.failed = 0
+        self._items = collections.deque()
+        self._unfinished = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._all_done = threading.Condition(self._lock)
+        self._threads = [
+            threading.Thread(target=self._work, name='jsonrpc-notifications-{0}'.format(index), daemon=True)
+            for index in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def __len__(self):
+        return len(self._items)
+
+    def submit(self, request, dispatcher, stats=None):
+        """ Put notification into the queue.
+
+        :type request: jsonrpc.request.JSONRPCSingleRequest
+        :type dispatcher: Dispatcher or dict
+        :type stats: None or jsonrpc.stats.StatsCollector
+        :return: False if notification was rejected because queue is full
+        :rtype: bool
+        :raise RuntimeError: Queue is closed
+        """
+        with self._lock:
+            if self.maxsize is not None and len(self._items) >= self.maxsize and not self._closed:
+                if self.overflow == REJECT:
+                    self.dropped += 1
+                    return False
+                elif self.overflow == DROP_OLDEST:
+                    self._items.popleft()
+                    self._unfinished -= 1
+                    self.dropped += 1
+                else:
+                    while len(self._items) >= self.maxsize and not self._closed:
+                        self._not_full.wait()
+            if self._closed:
+                raise RuntimeError("notification queue is closed")
+            self._items.append((request, dispatcher, stats))
+            self._unfinished += 1
+            self.queued += 1
+            self._not_empty.notify()
+            return True
+
+    def join(self, timeout=None):
+        """ Wait until all queued notifications are processed.
+
+        :type timeout: None or float
+        :return: False if timeout expired
+        :rtype: bool
+        """
+        with self._lock:
+            return self._all_done.wait_for(lambda: not self._unfinished, timeout)
+
+    def close(self, wait=True):
+        """ Stop accepting notifications. Already queued ones are still processed.
+
+        :param wait: Wait for worker threads to finish
+        :type wait: bool
+        """
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def stats(self):
+        """ Counters snapshot.
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                'queued': self.queued,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'pending': len(self._items),
+            }
+
+    def _work(self):
+        while True:
+            with self._lock:
+                while not self._items and not self._closed:
+                    self._not_empty.wait()
+                if not self._items:
+                    return
+                request, dispatcher, stats = self._items.popleft()
+                self._not_full.notify()
+
+            response = request.execute(dispatcher, stats=stats)
+
+            with self._lock:
+                if response is None or response.error is not None:
+                    self.failed += 1
+                self._unfinished -= 1
+                if not self._unfinished:
+                    self._all_done.notify_all()
@@ -1,8 +1,17 @@
 """ JSON-RPC request wrappers """
+import asyncio
+import collections
+import inspect
+from functools import partial
+from time import perf_counter
+
 from jsonrpc.base import JSONSerializable
+from jsonrpc.cache import MISSING
 from jsonrpc.response import JSONRPCBatchResponse, JSONRPCSingleResponse
 from jsonrpc.exceptions import JSONRPCParseException, JSONRPCMultipleRequestException, JSONRPCInvalidRequestException
-from jsonrpc.errors import JSONRPCMethodNotFound, JSONRPCInvalidParams, JSONRPCServerError
+from jsonrpc.errors import JSONRPCMethodNotFound, JSONRPCInvalidParams, JSONRPCParseError, JSONRPCServerError
+from jsonrpc.lazy import LazyParams
+from jsonrpc.stats import UNKNOWN_METHOD
 
 
 class JSONRPCBaseRequest(JSONSerializable):
@@ -13,12 +22,12 @@ class JSONRPCBaseRequest(JSONSerializable):
     :type _valid_flag: bool
     """
 
-    _data = None
-    _valid_flag = False
+    __slots__ = ('_data', '_valid_flag')
 
-    def __init__(self, request, serialize_hook=None, deserialize_hook=None):
+    def __init__(self, request, serialize_hook=None, deserialize_hook=None, codec=None):
         """ Initialize request and validate input data"""
-        super().__init__(serialize_hook=serialize_hook, deserialize_hook=deserialize_hook)
+        super().__init__(serialize_hook=serialize_hook, deserialize_hook=deserialize_hook, codec=codec)
+        self._valid_flag = False
         self._data = self._validate(request)
 
     def __iter__(self):
@@ -31,19 +40,20 @@ class JSONRPCBaseRequest(JSONSerializable):
 class JSONRPCSingleRequest(JSONRPCBaseRequest):
     """ Main object wrapper for JSON-RPC request """
 
-    result = None
-    _data = {}
-    _notification_flag = None
+    __slots__ = ('_notification_flag',)
 
     REQUIRED_FIELDS = {"jsonrpc", "method"}
     POSSIBLE_FIELDS = {"jsonrpc", "method", "params", "id"}
 
     @property
     def args(self):
-        """ Request args
+        """ Request args, lazy params are passed as a single argument
         :rtype: tuple
         """
-        return tuple(self.params) if isinstance(self.params, (list, tuple)) else ()
+        params = self.params
+        if isinstance(params, (list, tuple)):
+            return tuple(params)
+        return (params,) if isinstance(params, LazyParams) else ()
 
     @property
     def kwargs(self):
@@ -89,7 +99,7 @@ class JSONRPCSingleRequest(JSONRPCBaseRequest):
     @property
     def params(self):
         """ Request params
-        :rtype: tuple or dict or None
+        :rtype: tuple or dict or jsonrpc.lazy.LazyParams or None
         """
         return self._data.get('params')
 
@@ -115,34 +125,161 @@ class JSONRPCSingleRequest(JSONRPCBaseRequest):
         """
         self._notification_flag = bool(value)
 
-    def process(self, dispatcher):
+    def process(self, dispatcher, stats=None):
         """ Process request with method taken from dispatcher registry
         :type dispatcher: Dispatcher
+        :param stats: Collector of call statistics
+        :type stats: None or jsonrpc.stats.StatsCollector
         :rtype: JSONRPCSingleResponse or None
         """
+        output = self.execute(dispatcher, stats=stats)
+        if not self.is_notification:
+            return output
+
+    def execute(self, dispatcher, stats=None):
+        """ Process request like :meth:`process` does, but return response for notifications too.
+        :type dispatcher: Dispatcher
+        :type stats: None or jsonrpc.stats.StatsCollector
+        :rtype: JSONRPCSingleResponse
+        """
+        if stats is not None:
+            start = perf_counter()
         output = None
+        name = self.method
         try:
             method = dispatcher[self.method]
         except KeyError:
-            output = JSONRPCMethodNotFound().as_response()
+            name = UNKNOWN_METHOD
+            output = JSONRPCMethodNotFound(codec=self.codec).as_response(request=self)
         else:
-            try:
-                result = method(*self.args, **self.kwargs)
-            except TypeError:
-                output = JSONRPCInvalidParams().as_response()
-            except Exception as e:
-                data = {'type': e.__class__.__name__, 'message': str(e)}
-                output = JSONRPCServerError(data=data).as_response()
+            options = self._get_options(dispatcher)
+            if options is not None and options.get('lazy_params'):
+                self._wrap_params()
+            binder = options.get('binder') if options is not None else None
+            if binder is not None and not binder.accepts(self.args, self.kwargs):
+                output = JSONRPCInvalidParams(codec=self.codec).as_response(request=self)
             else:
-                output = JSONRPCSingleResponse(
-                    result,
-                    request=self,
-                    serialize_hook=self.serialize_hook,
-                    deserialize_hook=self.deserialize_hook
-                )
+                try:
+                    result = self._call(method, dispatcher, options)
+                except Exception as e:
+                    output = self._exception_response(e, params_checked=binder is not None)
+                else:
+                    output = self._result_response(result)
         finally:
-            if not self.is_notification:
-                return output
+            if stats is not None:
+                stats.record(name, perf_counter() - start, output is None or output.error is not None,
+                             self.is_notification)
+            return output
+
+    async def process_async(self, dispatcher, stats=None, offload_sync=False):
+        """ Process request, awaiting the method if it returns an awaitable.
+        Error mapping is the same as in :meth:`process`.
+        :type dispatcher: Dispatcher
+        :type stats: None or jsonrpc.stats.StatsCollector
+        :param offload_sync: Run plain (not coroutine) functions in the default executor
+            of the event loop, so blocking methods do not stall it
+        :type offload_sync: bool
+        :rtype: JSONRPCSingleResponse or None
+        """
+        if stats is not None:
+            start = perf_counter()
+        name = self.method
+        try:
+            method = dispatcher[self.method]
+        except KeyError:
+            name = UNKNOWN_METHOD
+            output = JSONRPCMethodNotFound(codec=self.codec).as_response(request=self)
+        else:
+            options = self._get_options(dispatcher)
+            if options is not None and options.get('lazy_params'):
+                self._wrap_params()
+            binder = options.get('binder') if options is not None else None
+            if binder is not None and not binder.accepts(self.args, self.kwargs):
+                output = JSONRPCInvalidParams(codec=self.codec).as_response(request=self)
+            else:
+                try:
+                    result = await self._call_async(method, dispatcher, options, offload_sync)
+                except Exception as e:
+                    output = self._exception_response(e, params_checked=binder is not None)
+                else:
+                    output = self._result_response(result)
+        if stats is not None:
+            stats.record(name, perf_counter() - start, output.error is not None, self.is_notification)
+        if not self.is_notification:
+            return output
+
+    def _call(self, method, dispatcher, options):
+        if options is None:
+            return method(*self.args, **self.kwargs)
+
+        cache = options.get('cache')
+        if cache is not None:
+            key = cache.make_key(self.args, self.kwargs)
+            result = cache.get(key)
+            if result is not MISSING:
+                return result
+
+        executor = options.get('executor')
+        if executor is None:
+            result = method(*self.args, **self.kwargs)
+        else:
+            executor = dispatcher.get_executor(self.method)
+            result = executor.submit(method, *self.args, **self.kwargs).result()
+
+        if cache is not None:
+            cache.set(key, result)
+        return result
+
+    async def _call_async(self, method, dispatcher, options, offload_sync=False):
+        options = options or {}
+
+        cache = options.get('cache')
+        if cache is not None:
+            key = cache.make_key(self.args, self.kwargs)
+            result = cache.get(key)
+            if result is not MISSING:
+                return result
+
+        executor = options.get('executor')
+        if executor is not None:
+            executor = dispatcher.get_executor(self.method)
+            result = asyncio.wrap_future(executor.submit(method, *self.args, **self.kwargs))
+        elif offload_sync and not inspect.iscoroutinefunction(method):
+            result = asyncio.get_running_loop().run_in_executor(None, partial(method, *self.args, **self.kwargs))
+        else:
+            result = method(*self.args, **self.kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+            # callable run in executor could return awaitable, e.g. partial of coroutine function
+            if inspect.isawaitable(result):
+                result = await result
+
+        if cache is not None:
+            cache.set(key, result)
+        return result
+
+    def _wrap_params(self):
+        """ Pass params decoded already, e.g. in batch, to lazy method the same way as undecoded ones. """
+        params = self.params
+        if params is not None and not isinstance(params, LazyParams):
+            self._data['params'] = LazyParams.from_value(params, self.codec)
+
+    def _get_options(self, dispatcher):
+        get_options = getattr(dispatcher, 'get_options', None)
+        return get_options(self.method) if get_options is not None else None
+
+    def _result_response(self, result):
+        return JSONRPCSingleResponse(result, request=self, codec=self.codec)
+
+    def _exception_response(self, e, params_checked=False):
+        # without signature check TypeError most likely means mismatched params
+        if isinstance(e, TypeError) and not params_checked:
+            return JSONRPCInvalidParams(codec=self.codec).as_response(request=self)
+        if isinstance(e, JSONRPCParseException):
+            # lazy params turned out to be invalid JSON
+            return JSONRPCParseError(codec=self.codec).as_response(request=self)
+        data = {'type': e.__class__.__name__, 'message': str(e)}
+        return JSONRPCServerError(data=data, codec=self.codec).as_response(request=self)
 
     def _parse(self, string):
         try:
@@ -197,7 +334,7 @@ class JSONRPCSingleRequest(JSONRPCBaseRequest):
         if 'id' in data and not isinstance(data['id'], (str, int)):
             raise JSONRPCInvalidRequestException('"id" must be string or integer, not {0}'.format(type(data['id'])))
 
-        if 'params' in data and not isinstance(data['params'], (tuple, list, dict)):
+        if 'params' in data and not isinstance(data['params'], (tuple, list, dict, LazyParams)):
             raise JSONRPCInvalidRequestException(
                 '"params" should be tuple, list or dict, not {0}'
                 .format(type(data['params']))
@@ -211,7 +348,7 @@ class JSONRPCSingleRequest(JSONRPCBaseRequest):
 class JSONRPCBatchRequest(JSONRPCBaseRequest):
     """ Batch list of JSON-RPC 2.0 Request """
 
-    _data = []
+    __slots__ = ()
 
     def __iter__(self):
         return iter(self._data)
@@ -226,10 +363,66 @@ class JSONRPCBatchRequest(JSONRPCBaseRequest):
     def json(self):
         return self.serialize([request.data for request in self])
 
-    def process(self, dispatcher):
-        responses = list(filter(None, [request.process(dispatcher) for request in self]))
+    def process(self, dispatcher, executor=None, max_workers=None, lazy=False, stats=None, notifications=None):
+        """ Process all requests of the batch.
+        By default requests are processed one after another. If executor is given,
+        requests are submitted to it and at most max_workers of them are in flight at once.
+        Responses keep the order of requests, notifications are dropped.
+        If notifications queue is given, notifications are put there instead of being processed in place.
+        :type dispatcher: Dispatcher
+        :type executor: concurrent.futures.Executor
+        :type max_workers: None or int
+        :param lazy: Return lazy batch response at once, requests are processed
+            while response is iterated or serialized with JSONRPCBatchResponse.iter_json().
+            It is empty, if all requests are notifications: serialized to empty string and len() is 0.
+        :type lazy: bool
+        :type stats: None or jsonrpc.stats.StatsCollector
+        :type notifications: None or jsonrpc.notifications.NotificationQueue
+        :rtype: JSONRPCBatchResponse or None
+        """
+        requests = self if notifications is None else self._enqueue_notifications(dispatcher, notifications, stats)
+        if executor is None:
+            responses = (request.process(dispatcher, stats=stats) for request in requests)
+        else:
+            responses = self._process_in_executor(requests, dispatcher, executor, max_workers, stats)
+        if lazy:
+            return JSONRPCBatchResponse(filter(None, responses), codec=self.codec)
+        responses = list(filter(None, responses))
+        if responses:
+            return JSONRPCBatchResponse(responses, codec=self.codec)
+
+    async def process_async(self, dispatcher, stats=None, offload_sync=False):
+        """ Process all requests of the batch concurrently.
+        Responses keep the order of requests, notifications are dropped.
+        :type dispatcher: Dispatcher
+        :type stats: None or jsonrpc.stats.StatsCollector
+        :param offload_sync: See :meth:`JSONRPCSingleRequest.process_async`
+        :type offload_sync: bool
+        :rtype: JSONRPCBatchResponse or None
+        """
+        responses = await asyncio.gather(*[
+            request.process_async(dispatcher, stats=stats, offload_sync=offload_sync) for request in self
+        ])
+        responses = list(filter(None, responses))
         if responses:
-            return JSONRPCBatchResponse(responses, serialize_hook=self.serialize_hook)
+            return JSONRPCBatchResponse(responses, codec=self.codec)
+
+    def _enqueue_notifications(self, dispatcher, notifications, stats):
+        for request in self:
+            if request.is_notification:
+                notifications.submit(request, dispatcher, stats)
+            else:
+                yield request
+
+    def _process_in_executor(self, requests, dispatcher, executor, max_workers, stats):
+        window = max_workers or len(self)
+        pending = collections.deque()
+        for request in requests:
+            if len(pending) >= window:
+                yield pending.popleft().result()
+            pending.append(executor.submit(request.process, dispatcher, stats=stats))
+        while pending:
+            yield pending.popleft().result()
 
     def _validate(self, raw_data):
         self._valid_flag = False
@@ -240,7 +433,7 @@ class JSONRPCBatchRequest(JSONRPCBaseRequest):
         if isinstance(raw_data, (list, tuple, JSONRPCSingleRequest)):
             for item in raw_data:
                 if isinstance(item, dict):
-                    data.append(JSONRPCSingleRequest(item))
+                    data.append(JSONRPCSingleRequest(item, codec=self.codec))
                 elif isinstance(item, JSONRPCSingleRequest):
                     data.append(item)
                 else:
@@ -251,7 +444,7 @@ class JSONRPCBatchRequest(JSONRPCBaseRequest):
         elif isinstance(raw_data, str):
             raw_data = self.deserialize(raw_data)
             if isinstance(raw_data, list):
-                data = [JSONRPCSingleRequest(item) for item in data]
+                data = [JSONRPCSingleRequest(item, codec=self.codec) for item in data]
         else:
             raise JSONRPCInvalidRequestException(
                 "Requests must be list, tuple, JSONRPCSingleRequest or str, not {0}"
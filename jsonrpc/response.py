@@ -1,7 +1,92 @@
 ﻿""" JSON-RPC response wrappers """
+import collections.abc
+import io
+import json
+import os
+
 from jsonrpc.base import JSONSerializable
 from jsonrpc.exceptions import JSONRPCException
 
+# Envelope of single response is encoded once, only id and result are encoded per response
+_HEAD = b'{"jsonrpc":"2.0","id":'
+_RESULT = b',"result":'
+_ERROR = b',"error":'
+_TAIL = b'}'
+
+# Encoded error objects without data, by (codec, code, message)
+_errors = {}
+_ERRORS_LIMIT = 256
+
+
+class RawJSON:
+    """ Result that is already encoded, e.g. cached or received from upstream service.
+
+    Method returns it instead of decoded data, it is spliced into response as is,
+    without decoding and encoding again. Data is not validated.
+
+    :param data: JSON text
+    :type data: bytes or bytearray or str
+    """
+
+    __slots__ = ('_data',)
+
+    def __init__(self, data):
+        self._data = data.encode('utf-8') if isinstance(data, str) else bytes(data)
+
+    def __repr__(self):
+        return '{0}({1!r})'.format(self.__class__.__name__, self._data)
+
+    @property
+    def data(self):
+        """ :rtype: bytes """
+        return self._data
+
+    @property
+    def size(self):
+        """ Size of data in bytes
+        :rtype: int
+        """
+        return len(self._data)
+
+    def iter_chunks(self):
+        """ :rtype: iterator of bytes """
+        yield self._data
+
+
+class RawJSONFile(RawJSON):
+    """ Result encoded in file. Transports stream it chunk by chunk, without loading
+    the whole file in memory, see :attr:`JSONRPCSingleResponse.streamed`.
+    File is read when response is sent, so it should not change until then.
+
+    :param path: Path of file with JSON text
+    :type path: str
+    :param chunk_size: Size of chunks to read in bytes
+    :type chunk_size: int
+    """
+
+    __slots__ = ('path', 'chunk_size')
+
+    def __init__(self, path, chunk_size=64 * 1024):
+        self.path = path
+        self.chunk_size = chunk_size
+
+    def __repr__(self):
+        return '{0}({1!r})'.format(self.__class__.__name__, self.path)
+
+    @property
+    def data(self):
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    @property
+    def size(self):
+        return os.path.getsize(self.path)
+
+    def iter_chunks(self):
+        with open(self.path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.chunk_size), b''):
+                yield chunk
+
 
 class JSONRPCError(JSONSerializable):
     """ Error for JSON-RPC communication.
@@ -13,7 +98,9 @@ class JSONRPCError(JSONSerializable):
     url: http://xmlrpc-epi.sourceforge.net/specs/rfc.fault_codes.php
     """
 
-    def __init__(self, code, message, data=None, serialize_hook=None, deserialize_hook=None):
+    __slots__ = ('_container',)
+
+    def __init__(self, code, message, data=None, serialize_hook=None, deserialize_hook=None, codec=None):
         """
         When a rpc call encounters an error, the Response Object MUST contain the
         error member with a value that is a Object with the following members in __init__
@@ -30,7 +117,7 @@ class JSONRPCError(JSONSerializable):
         :type data: None or int or str or dict or list
         """
 
-        super().__init__(serialize_hook=serialize_hook, deserialize_hook=deserialize_hook)
+        super().__init__(serialize_hook=serialize_hook, deserialize_hook=deserialize_hook, codec=codec)
         self._container = {}
         if not isinstance(code, int):
             raise ValueError("Error code should be integer")
@@ -61,17 +148,31 @@ class JSONRPCError(JSONSerializable):
     def json(self):
         return self.serialize(self._container)
 
-    def as_response(self):
-        return JSONRPCSingleResponse(payload=self._container, error=True)
+    @property
+    def json_bytes(self):
+        return self.serialize_bytes(self._container)
+
+    def as_response(self, request=None):
+        """
+        :param request: Request the error is response to, its id is sent back.
+            None if request could not be parsed.
+        :type request: None or JSONRPCSingleRequest
+        :rtype: JSONRPCSingleResponse
+        """
+        return JSONRPCSingleResponse(payload=self._container, request=request, error=True, codec=self.codec)
 
 
 class JSONRPCSingleResponse(JSONSerializable):
-    """ JSON-RPC response object to JSONRPCRequest. """
-    _error_flag = None
-    _payload = None
-    _request = None
+    """ JSON-RPC response object to JSONRPCRequest.
 
-    def __init__(self, payload, request=None, error=None, serialize_hook=None, deserialize_hook=None):
+    Response is serialized once, encoded result is spliced into the pre-encoded
+    envelope and the output is cached, so repeated access to :attr:`json_bytes` is free.
+    :class:`RawJSON` result is spliced as is.
+    """
+
+    __slots__ = ('_error_flag', '_payload', '_request', '_encoded')
+
+    def __init__(self, payload, request=None, error=None, serialize_hook=None, deserialize_hook=None, codec=None):
         """
         :param request: Bound request for response
         :type request: JSONRPCSingleRequest
@@ -79,7 +180,7 @@ class JSONRPCSingleResponse(JSONSerializable):
         :param error: Error Flag
         :type error: bool
         """
-        super().__init__(serialize_hook=serialize_hook, deserialize_hook=deserialize_hook)
+        super().__init__(serialize_hook=serialize_hook, deserialize_hook=deserialize_hook, codec=codec)
         if not error:
             if request is None:
                 raise ValueError("Can't create non-error Response object without request object!")
@@ -96,6 +197,7 @@ class JSONRPCSingleResponse(JSONSerializable):
         self._request = request
         self._payload = payload
         self._error_flag = error
+        self._encoded = None
 
     def __iter__(self):
         yield self
@@ -110,61 +212,258 @@ class JSONRPCSingleResponse(JSONSerializable):
 
     @property
     def id(self):
-        return self._request.id if not self._error_flag else None
+        return self._request.id if self._request is not None else None
 
     @property
     def container(self):
+        """ Response as dict, :class:`RawJSON` result is decoded. """
         data = {"jsonrpc": "2.0", "id": self.id}
         if self._error_flag:
             data["error"] = self.error
+        elif isinstance(self._payload, RawJSON):
+            data["result"] = json.loads(self._payload.data)
         else:
             data["result"] = self.result
         return data
 
     @property
     def json(self):
-        return self.serialize(self.container)
+        """ Serialized response as str, bytes if codec is binary (e.g. MessagePack)
+        :rtype: str or bytes
+        """
+        if self.codec.binary:
+            return self.json_bytes
+        return self.json_bytes.decode('utf-8')
+
+    @property
+    def json_bytes(self):
+        """ Serialized response as UTF-8 encoded bytes
+        :rtype: bytes
+        """
+        if self._encoded is None:
+            self._encoded = self._encode_error() if self._error_flag else self._encode_result()
+        return self._encoded
+
+    @property
+    def streamed(self):
+        """ Whether result is file-backed, such response should be sent with
+        :meth:`iter_json_bytes` rather than :attr:`json_bytes`, which reads the whole file.
+        :rtype: bool
+        """
+        return isinstance(self._payload, RawJSONFile) and not self._error_flag and not self.codec.binary
+
+    @property
+    def json_size(self):
+        """ Size of serialized response in bytes, file-backed result is not read.
+        :rtype: int
+        """
+        if self.streamed:
+            return len(self._encode_head()) + self._payload.size + len(_TAIL)
+        return len(self.json_bytes)
+
+    def iter_json_bytes(self):
+        """ Serialized response chunk by chunk: file-backed result is read in chunks,
+        other responses are yielded whole.
+        :rtype: iterator of bytes
+        """
+        if self.streamed:
+            yield self._encode_head()
+            yield from self._payload.iter_chunks()
+            yield _TAIL
+        else:
+            yield self.json_bytes
+
+    def _encode_id(self):
+        request_id = self.id
+        if request_id is None:
+            return b'null'
+        elif type(request_id) is int:
+            return str(request_id).encode('ascii')
+        return self.codec.encode_bytes(request_id)
+
+    def _encode_head(self):
+        return b''.join((_HEAD, self._encode_id(), _RESULT))
+
+    def _encode_result(self):
+        payload = self._payload
+        if self.codec.binary:
+            return self.codec.encode_bytes(self.container)
+        result = payload.data if isinstance(payload, RawJSON) else self.codec.encode_bytes(payload)
+        return b''.join((_HEAD, self._encode_id(), _RESULT, result, _TAIL))
+
+    def _encode_error(self):
+        if self.codec.binary:
+            return self.codec.encode_bytes(self.container)
+        payload = self._payload
+        if len(payload) != 2:
+            error = self.codec.encode_bytes(payload)
+        else:
+            key = (self.codec, payload['code'], payload['message'])
+            error = _errors.get(key)
+            if error is None:
+                error = self.codec.encode_bytes(payload)
+                if len(_errors) < _ERRORS_LIMIT:
+                    _errors[key] = error
+        return b''.join((_HEAD, self._encode_id(), _ERROR, error, _TAIL))
 
 
 class JSONRPCBatchResponse(JSONSerializable):
-    _data = []
+    """ Batch list of JSON-RPC 2.0 responses.
+
+    Could be built from an iterator (e.g. generator) of responses. Such batch is lazy:
+    items are taken from iterator on demand, so :meth:`iter_json` and :meth:`write_to`
+    emit every response as soon as it is produced.
+
+    Lazy batch is empty, if every request of the batch was a notification.
+    JSON-RPC 2.0 forbids to answer with an empty array, so empty batch serializes
+    to empty string (bytes) everywhere and nothing should be sent back, check it with len().
+
+    Like every response, batch encoded with binary codec returns bytes from :attr:`json` too.
+    """
+
+    __slots__ = ('_data', '_valid_flag', '_pending')
+
+    SEPARATOR = ', '
+
+    def __init__(self, response, serialize_hook=None, deserialize_hook=None, codec=None):
+        super().__init__(serialize_hook=serialize_hook, deserialize_hook=deserialize_hook, codec=codec)
+        self._pending = None
+        if isinstance(response, collections.abc.Iterator):
+            self._valid_flag = True
+            self._data = []
+            self._pending = response
+        else:
+            self._data = self._validate(response)
 
     def __iter__(self):
-        return iter(self._data)
+        if self._pending is None:
+            return iter(self._data)
+        return self._iter_pending()
 
     def __len__(self):
-        return len(self._data)
+        return len(self._load())
 
     def __getitem__(self, item):
-        return self._data.__getitem__(item)
+        return self._load().__getitem__(item)
 
     @property
     def json(self):
+        if not self._load():
+            return b'' if self.codec.binary else ''
+        if self._has_raw():
+            return self.json_bytes.decode('utf-8')
         return self.serialize([response.container for response in self])
 
-    def __init__(self, response, serialize_hook=None):
-        super().__init__(serialize_hook=serialize_hook)
-        self._data = self._validate(response)
+    @property
+    def json_bytes(self):
+        if not self._load():
+            return b''
+        if self._has_raw():
+            return b'[' + b','.join(response.json_bytes for response in self) + b']'
+        return self.serialize_bytes([response.container for response in self])
+
+    @property
+    def streamed(self):
+        """ Whether some result is file-backed, see :attr:`JSONRPCSingleResponse.streamed`.
+        :rtype: bool
+        """
+        return any(response.streamed for response in self)
+
+    @property
+    def json_size(self):
+        """ Size of batch serialized with :meth:`iter_json_bytes` in bytes.
+        :rtype: int
+        """
+        responses = self._load()
+        if not responses:
+            return 0
+        return sum(response.json_size for response in responses) + len(self.SEPARATOR) * (len(responses) - 1) + 2
+
+    def iter_json(self):
+        """ Serialize batch incrementally.
+        Yields opening bracket, serialized responses, separators and closing bracket.
+        Nothing is yielded for empty lazy batch.
+        :rtype: iterator of str
+        """
+        opened = False
+        for response in self:
+            yield self.SEPARATOR if opened else '['
+            opened = True
+            yield response.json
+        if opened:
+            yield ']'
+
+    def iter_json_bytes(self):
+        """ Same as :meth:`iter_json`, but yields UTF-8 encoded chunks.
+        Batch encoded with binary codec is yielded as a single chunk.
+        :rtype: iterator of bytes
+        """
+        if self.codec.binary:
+            if self._load():
+                yield self.json_bytes
+            return
+        separator = self.SEPARATOR.encode('utf-8')
+        opened = False
+        for response in self:
+            yield separator if opened else b'['
+            opened = True
+            yield from response.iter_json_bytes()
+        if opened:
+            yield b']'
+
+    def write_to(self, fileobj):
+        """ Write serialized batch to file-like object chunk by chunk.
+        Text files get str chunks, binary files and sockets' files get bytes.
+        :return: Number of written characters or bytes
+        :rtype: int
+        """
+        chunks = self.iter_json() if isinstance(fileobj, io.TextIOBase) else self.iter_json_bytes()
+        written = 0
+        for chunk in chunks:
+            fileobj.write(chunk)
+            written += len(chunk)
+        return written
+
+    def _has_raw(self):
+        return not self.codec.binary and any(isinstance(response.result, RawJSON) for response in self._load())
+
+    def _iter_pending(self):
+        yield from self._data
+        while self._pending is not None:
+            try:
+                item = next(self._pending)
+            except StopIteration:
+                self._pending = None
+            else:
+                self._data.append(self._validate_item(item))
+                yield item
+
+    def _load(self):
+        if self._pending is not None:
+            for _ in self._iter_pending():
+                pass
+        return self._data
 
     def _validate(self, raw_data):
         self._valid_flag = False
-        data = []
         if not raw_data:
             raise JSONRPCException("Empty batch response data!")
 
         if isinstance(raw_data, (list, tuple, JSONRPCSingleResponse)):
-            for item in raw_data:
-                if isinstance(item, JSONRPCSingleResponse):
-                    data.append(item)
-                else:
-                    raise TypeError(
-                        "Response item must be JSONRPCSingleResponse instance, not {0}"
-                        .format(type(raw_data))
-                    )
+            data = [self._validate_item(item) for item in raw_data]
         else:
             raise TypeError(
-                "Responses must be list, tuple or JSONRPCSingleResponse, not {0}"
+                "Responses must be list, tuple, iterator or JSONRPCSingleResponse, not {0}"
                 .format(type(raw_data))
             )
         self._valid_flag = True
         return data
+
+    @staticmethod
+    def _validate_item(item):
+        if not isinstance(item, JSONRPCSingleResponse):
+            raise TypeError(
+                "Response item must be JSONRPCSingleResponse instance, not {0}"
+                .format(type(item))
+            )
+        return item
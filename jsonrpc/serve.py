@@ -0,0 +1,203 @@
+""" Prefork multi-process TCP server.
+
+Dispatcher is imported once, then worker processes are forked, every one runs
+its own :class:`jsonrpc.transports.tcp.TCPServer`. Workers bind the same port with
+SO_REUSEPORT, so the kernel spreads connections among them; where it is not
+available, they share one listening socket. Dead workers are restarted.
+
+Usage::
+
+    python -m jsonrpc.serve myapp.api:dispatcher --port 4000 --workers 8
+
+Dispatcher should not start its process pool before forking: workers start their own.
+"""
+import argparse
+import asyncio
+import gc
+import importlib
+import os
+import signal
+import socket
+import sys
+import time
+
+from jsonrpc.framing import FRAMINGS
+from jsonrpc.transports.tcp import TCPServer
+
+#: Worker living shorter than this many seconds is restarted with a delay, to avoid fork loop
+MIN_WORKER_LIFETIME = 1.0
+
+
+def load_dispatcher(target):
+    """ Import dispatcher by its path.
+
+    :param target: "package.module:attribute"
+    :type target: str
+    :rtype: Dispatcher or dict
+    :raise ValueError: Target is malformed
+    """
+    module_name, _, attribute = target.partition(':')
+    if not module_name or not attribute:
+        raise ValueError("target should be 'module:attribute', not {0!r}".format(target))
+    obj = importlib.import_module(module_name)
+    for name in attribute.split('.'):
+        obj = getattr(obj, name)
+    return obj
+
+
+class PreforkServer:
+    """ Supervisor of worker processes.
+
+    :type dispatcher: Dispatcher or dict
+    :type host: str
+    :param port: Port to listen, 0 means any free one (see :attr:`address` after :meth:`bind`)
+    :type port: int
+    :param workers: Number of worker processes, CPU count by default
+    :type workers: None or int
+    :param reuse_port: Every worker binds its own socket with SO_REUSEPORT
+        instead of sharing one, if supported by platform.
+    :type reuse_port: bool
+    :param server_kwargs: Passed to :class:`jsonrpc.transports.tcp.TCPServer`, e.g. framing
+    """
+
+    def __init__(self, dispatcher, host='127.0.0.1', port=4000, workers=None, reuse_port=True, **server_kwargs):
+        if workers is not None and workers <= 0:
+            raise ValueError("workers should be positive")
+        self.dispatcher = dispatcher
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.reuse_port = reuse_port and hasattr(socket, 'SO_REUSEPORT')
+        self.server_kwargs = server_kwargs
+        self.address = None
+        self.pids = {}
+        self._socket = None
+        self._stopping = False
+
+    def bind(self):
+        """ Bind the port in supervisor, so errors are reported before forking and port 0 is resolved. """
+        self._socket = self._make_socket(self.port)
+        if not self.reuse_port:
+            self._socket.listen(socket.SOMAXCONN)
+        self.address = self._socket.getsockname()
+
+    def run(self):
+        """ Fork workers and supervise them until SIGTERM or SIGINT. """
+        if self._socket is None:
+            self.bind()
+        previous = {sig: signal.signal(sig, self._stop) for sig in (signal.SIGTERM, signal.SIGINT)}
+        # objects allocated so far are never collected, so their pages stay shared with workers
+        gc.collect()
+        gc.freeze()
+        try:
+            for _ in range(self.workers):
+                self._spawn()
+            while self.pids:
+                try:
+                    pid, _ = os.wait()
+                except ChildProcessError:
+                    break
+                except InterruptedError:  # pragma: no cover
+                    continue
+                started = self.pids.pop(pid, None)
+                if started is None or self._stopping:
+                    continue
+                if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                    time.sleep(MIN_WORKER_LIFETIME)
+                if not self._stopping:
+                    self._spawn()
+        finally:
+            gc.unfreeze()
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+            self._socket.close()
+            self._socket = None
+
+    def stop(self):
+        """ Terminate workers, :meth:`run` returns when all of them exit. """
+        self._stopping = True
+        for pid in list(self.pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _stop(self, signum, frame):
+        self.stop()
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid:
+            self.pids[pid] = time.monotonic()
+            return
+        status = 0
+        try:
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(sig, signal.SIG_DFL)
+            asyncio.run(self._serve())
+        except BaseException:
+            status = 1
+        finally:
+            os._exit(status)
+
+    async def _serve(self):
+        if self.reuse_port:
+            sock = self._make_socket(self.address[1])
+            sock.listen(socket.SOMAXCONN)
+        else:
+            sock = self._socket
+        server = TCPServer(self.dispatcher, **self.server_kwargs)
+        listener = await server.start(None, None, sock=sock)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, listener.close)
+        async with listener:
+            try:
+                await listener.serve_forever()
+            except asyncio.CancelledError:
+                pass
+
+    def _make_socket(self, port):
+        family = socket.AF_INET6 if ':' in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.reuse_port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((self.host, port))
+        return sock
+
+
+def serve(dispatcher, host='127.0.0.1', port=4000, workers=None, **kwargs):
+    """ Run prefork server until SIGTERM or SIGINT.
+
+    :param dispatcher: Dispatcher or its path "module:attribute"
+    :type dispatcher: Dispatcher or dict or str
+    :param kwargs: Passed to :class:`PreforkServer`
+    """
+    if isinstance(dispatcher, str):
+        dispatcher = load_dispatcher(dispatcher)
+    PreforkServer(dispatcher, host, port, workers, **kwargs).run()
+
+
+def parse_args(arguments=None):
+    parser = argparse.ArgumentParser(prog='python -m jsonrpc.serve', description=__doc__.split('\n')[0])
+    parser.add_argument('target', help='dispatcher to serve, module:attribute')
+    parser.add_argument('-H', '--host', default='127.0.0.1', help='server host')
+    parser.add_argument('-P', '--port', type=int, default=4000, help='server port')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('-F', '--framing', choices=sorted(FRAMINGS), default='nul', help='message framing')
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None):
+    args = parse_args(arguments)
+    sys.path.insert(0, os.getcwd())
+    server = PreforkServer(load_dispatcher(args.target), args.host, args.port, args.workers, framing=args.framing)
+    server.bind()
+    host, port = server.address[:2]
+    print('Serving {0} on {1}:{2} with {3} workers'.format(args.target, host, port, server.workers), flush=True)
+    server.run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+""" Request processing statistics.
+
+Counters of calls, errors and notifications and latency histogram for every method.
+Pass :class:`StatsCollector` to JSONRPCResponseManager(stats=…) to enable it.
+"""
+import bisect
+import threading
+
+#: Upper bounds of latency histogram buckets in seconds: 1us, 2us, 4us … ~134s
+BUCKETS = tuple(1e-6 * 2 ** power for power in range(28))
+
+#: Name under which calls of methods absent in dispatcher are counted
+UNKNOWN_METHOD = '<unknown>'
+
+
+class Histogram:
+    """ Latency histogram with fixed log-spaced buckets.
+
+    :param buckets: Sorted upper bounds of buckets, the last implicit one is +Inf.
+    :type buckets: tuple
+    """
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, fraction):
+        """ Upper bound of bucket containing given percentile.
+        :type fraction: float
+        :rtype: float or None
+        """
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def snapshot(self):
+        """ :rtype: dict """
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'p50': self.percentile(0.5),
+            'p99': self.percentile(0.99),
+            'buckets': list(zip(self.buckets + (float('inf'),), self.counts)),
+        }
+
+
+class MethodStats:
+    """ Counters and latency histogram of one method. """
+
+    __slots__ = ('calls', 'errors', 'notifications', 'latency')
+
+    def __init__(self, buckets=BUCKETS):
+        self.calls = 0
+        self.errors = 0
+        self.notifications = 0
+        self.latency = Histogram(buckets)
+
+    def snapshot(self):
+        """ :rtype: dict """
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'notifications': self.notifications,
+            'latency': self.latency.snapshot(),
+        }
+
+
+class StatsCollector:
+    """ Thread-safe collection of per-method statistics.
+
+    :param buckets: Upper bounds of latency histogram buckets in seconds
+    :type buckets: tuple
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self._methods = {}
+        self._lock = threading.Lock()
+
+    def record(self, method, elapsed, error=False, notification=False):
+        """ Account single processed call.
+
+        :param method: Method name
+        :type method: str
+        :param elapsed: Call duration in seconds
+        :type elapsed: float
+        :param error: Call finished with error response
+        :type error: bool
+        :param notification: Call is a notification
+        :type notification: bool
+        """
+        with self._lock:
+            stats = self._methods.get(method)
+            if stats is None:
+                stats = self._methods[method] = MethodStats(self.buckets)
+            stats.calls += 1
+            if error:
+                stats.errors += 1
+            if notification:
+                stats.notifications += 1
+            stats.latency.observe(elapsed)
+
+    def reset(self):
+        """ Drop all collected data. """
+        with self._lock:
+            self._methods = {}
+
+    def stats(self):
+        """ Snapshot of collected data.
+
+        :return: Mapping method name to its counters and latency histogram
+        :rtype: dict
+        """
+        with self._lock:
+            return {method: stats.snapshot() for method, stats in self._methods.items()}
+
+    def render_prometheus(self, prefix='jsonrpc'):
+        """ Render collected data in Prometheus text exposition format.
+
+        :param prefix: Metric name prefix
+        :type prefix: str
+        :rtype: str
+        """
+        snapshot = self.stats()
+        lines = []
+        for name, field, help_text in (
+            ('calls_total', 'calls', 'Number of processed calls.'),
+            ('errors_total', 'errors', 'Number of calls finished with error.'),
+            ('notifications_total', 'notifications', 'Number of processed notifications.'),
+        ):
+            lines.append('# HELP {0}_{1} {2}'.format(prefix, name, help_text))
+            lines.append('# TYPE {0}_{1} counter'.format(prefix, name))
+            for method, stats in sorted(snapshot.items()):
+                lines.append('{0}_{1}{{method="{2}"}} {3}'.format(prefix, name, _escape(method), stats[field]))
+
+        metric = '{0}_call_duration_seconds'.format(prefix)
+        lines.append('# HELP {0} Duration of calls in seconds.'.format(metric))
+        lines.append('# TYPE {0} histogram'.format(metric))
+        for method, stats in sorted(snapshot.items()):
+            label = _escape(method)
+            cumulative = 0
+            for bound, count in stats['latency']['buckets']:
+                cumulative += count
+                lines.append('{0}_bucket{{method="{1}",le="{2}"}} {3}'.format(
+                    metric, label, '+Inf' if bound == float('inf') else repr(bound), cumulative
+                ))
+            lines.append('{0}_sum{{method="{1}"}} {2!r}'.format(metric, label, stats['latency']['sum']))
+            lines.append('{0}_count{{method="{1}"}} {2}'.format(metric, label, stats['latency']['count']))
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,253 @@
+""" Incremental parsing of batch requests.
+
+Batch request body is split into top-level array elements while it is being read,
+every element is decoded and validated on its own. So processing of the first
+requests could start before the whole body is received and the body is never
+materialized as one big list.
+"""
+import re
+from functools import partial
+
+from jsonrpc.codecs import get_codec
+from jsonrpc.errors import JSONRPCInvalidRequest, JSONRPCParseError
+from jsonrpc.exceptions import JSONRPCParseException, JSONRPCInvalidRequestException
+from jsonrpc.request import JSONRPCSingleRequest
+
+_STRUCTURE = re.compile(rb'["\[\]{},]')
+_STRING_SPECIAL = re.compile(rb'["\\]')
+_WHITESPACE = b' \t\n\r'
+
+_QUOTE, _BACKSLASH, _COMMA = ord('"'), ord('\\'), ord(',')
+_OPENING, _CLOSING = frozenset(b'[{'), frozenset(b']}')
+
+
+class BatchReader:
+    """ Push parser, which splits JSON array into its elements.
+
+    Feed it with chunks of raw body, it returns raw elements (bytes) as soon as they
+    are complete. Elements are not decoded, so reader works with any JSON codec.
+
+    :param max_element_size: Maximum size of a single element in bytes.
+    :type max_element_size: None or int
+    """
+
+    def __init__(self, max_element_size=None):
+        self.max_element_size = max_element_size
+        self.is_batch = None
+        self.finished = False
+        self.count = 0
+        self._buffer = bytearray()
+        self._pos = 0
+        self._start = 0
+        self._depth = 0
+        self._in_string = False
+
+    def feed(self, data):
+        """ Add chunk of body.
+
+        :type data: bytes or bytearray or memoryview
+        :return: Complete elements found so far
+        :rtype: list of bytes
+        :raise JSONRPCParseException: Body is not a valid array or element is too big
+        """
+        if self.finished:
+            if bytes(data).strip(_WHITESPACE):
+                raise JSONRPCParseException("Extra data after the end of batch")
+            return []
+        self._buffer += data
+        if self.is_batch is None and not self._detect():
+            return []
+        if not self.is_batch:
+            return []
+        elements = self._scan()
+        if self.max_element_size is not None and len(self._buffer) - self._start > self.max_element_size:
+            raise JSONRPCParseException("Batch element is too big")
+        return elements
+
+    def close(self):
+        """ Mark end of body.
+        :raise JSONRPCParseException: Array is not closed
+        """
+        if self.is_batch and not self.finished:
+            raise JSONRPCParseException("Unexpected end of batch")
+
+    @property
+    def buffer(self):
+        """ Raw data received, if body is not a batch (reader does not consume it).
+        :rtype: bytearray
+        """
+        return self._buffer
+
+    def _detect(self):
+        stripped = self._buffer.lstrip(_WHITESPACE)
+        if not stripped:
+            return False
+        self.is_batch = stripped[0] == ord('[')
+        if self.is_batch:
+            self._pos = len(self._buffer) - len(stripped) + 1
+            self._start = self._pos
+            self._depth = 1
+        return True
+
+    def _scan(self):
+        buffer, pos, depth = self._buffer, self._pos, self._depth
+        elements = []
+        while True:
+            if self._in_string:
+                pos = self._scan_string(buffer, pos)
+                if self._in_string:
+                    break
+                continue
+
+            match = _STRUCTURE.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+            char, pos = buffer[match.start()], match.end()
+            if char == _QUOTE:
+                self._in_string = True
+            elif char in _OPENING:
+                depth += 1
+            elif char in _CLOSING:
+                depth -= 1
+                if depth == 0:
+                    element = self._element(buffer, match.start())
+                    # "[]" is an empty batch, but "[1, ]" has an empty (invalid) element
+                    if element or self.count + len(elements):
+                        elements.append(element)
+                    self.finished = True
+                    if buffer[pos:].strip(_WHITESPACE):
+                        raise JSONRPCParseException("Extra data after the end of batch")
+                    break
+            elif char == _COMMA and depth == 1:
+                elements.append(self._element(buffer, match.start()))
+                self._start = pos
+
+        # drop consumed data, so buffer holds only the incomplete element
+        if self._start:
+            del buffer[:self._start]
+            pos -= self._start
+            self._start = 0
+        self._pos, self._depth = pos, depth
+        self.count += len(elements)
+        return elements
+
+    def _element(self, buffer, end):
+        """ Raw element from the start of current one to end, size limit is checked for it.
+        :rtype: bytes
+        :raise JSONRPCParseException: Element is too big
+        """
+        element = bytes(buffer[self._start:end]).strip(_WHITESPACE)
+        if self.max_element_size is not None and len(element) > self.max_element_size:
+            raise JSONRPCParseException("Batch element is too big")
+        return element
+
+    def _scan_string(self, buffer, pos):
+        """ Skip the rest of string, which is being scanned.
+        :return: Position after the string or, if it is not complete yet, where to resume scanning
+        """
+        while True:
+            match = _STRING_SPECIAL.search(buffer, pos)
+            if match is None:
+                return len(buffer)
+            if buffer[match.start()] == _QUOTE:
+                self._in_string = False
+                return match.end()
+            if match.end() >= len(buffer):
+                # escape sequence is split between chunks
+                return match.start()
+            pos = match.end() + 1
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def iter_chunks(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """ Read source chunk by chunk.
+
+    :param source: File-like object with read() method or iterable of chunks.
+        Text chunks are encoded to UTF-8.
+    :rtype: iterator of bytes
+    """
+    read = getattr(source, 'read', None)
+    chunks = source if read is None else iter(partial(read, chunk_size), b'')
+    for chunk in chunks:
+        if not chunk:
+            if read is None:
+                continue
+            break
+        yield chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+
+class BatchStream:
+    """ Batch request read from stream.
+
+    Iterate over it to get requests one by one: :class:`JSONRPCSingleRequest`
+    for every valid element and error :class:`JSONRPCSingleResponse` for every invalid one.
+    If the body turns out to be broken (not closed, extra data, too big element),
+    JSONRPCParseError response is the last item.
+
+    :param source: File-like object with read() method or iterable of chunks
+    :param codec: Codec for elements
+    :type codec: None or type or jsonrpc.codecs.JSONCodec
+    :type chunk_size: int
+    :type max_element_size: None or int
+    """
+
+    def __init__(self, source, codec=None, chunk_size=DEFAULT_CHUNK_SIZE, max_element_size=None):
+        self.codec = get_codec(codec)
+        self.reader = BatchReader(max_element_size=max_element_size)
+        self._chunks = iter_chunks(source, chunk_size)
+        self._elements = []
+
+    def detect(self):
+        """ Read source until its type is known.
+
+        :return: True if body is an array, False otherwise (including empty body)
+        :rtype: bool
+        :raise JSONRPCParseException:
+        """
+        while self.reader.is_batch is None:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return False
+            self._elements.extend(self.reader.feed(chunk))
+        return self.reader.is_batch
+
+    def read_body(self):
+        """ Read the rest of non-batch body.
+        :return: Whole body
+        :rtype: bytes
+        """
+        buffer = self.reader.buffer
+        for chunk in self._chunks:
+            buffer += chunk
+        return bytes(buffer)
+
+    def __iter__(self):
+        try:
+            if not self.detect():
+                return
+            while True:
+                for element in self._elements:
+                    yield self._build(element)
+                self._elements = []
+                chunk = next(self._chunks, None)
+                if chunk is None:
+                    break
+                self._elements = self.reader.feed(chunk)
+            self.reader.close()
+        except JSONRPCParseException:
+            yield JSONRPCParseError(codec=self.codec).as_response()
+
+    def _build(self, element):
+        try:
+            data = self.codec.decode(element)
+        except (TypeError, ValueError):
+            data = None
+        if isinstance(data, dict):
+            try:
+                return JSONRPCSingleRequest(data, codec=self.codec)
+            except JSONRPCInvalidRequestException:
+                pass
+        return JSONRPCInvalidRequest(codec=self.codec).as_response()
@@ -0,0 +1,98 @@
+""" Test ASGI application."""
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from jsonrpc.asgi import make_app
+from jsonrpc.msgpack import packb, unpackb
+from jsonrpc.response import RawJSONFile
+
+
+class TestASGIApplication(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        async def sleep_echo(x):
+            await asyncio.sleep(0)
+            return x
+
+        fd, path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b'[' + b','.join(b'1' for _ in range(500)) + b']')
+        self.addCleanup(os.remove, path)
+        self.app = make_app({"sleep_echo": sleep_echo, "file": lambda: RawJSONFile(path, chunk_size=100),
+                             "thread": threading.get_ident}, max_content_length=100)
+
+    async def request(self, chunks, method='POST', headers=None):
+        messages = [
+            {'type': 'http.request', 'body': chunk, 'more_body': index < len(chunks) - 1}
+            for index, chunk in enumerate(chunks)
+        ]
+        sent = []
+
+        async def receive():
+            return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'method': method, 'path': '/', 'headers': headers or []}
+        await self.app(scope, receive, send)
+        self.sent = sent
+        if not sent:
+            return None, {}, None
+        return sent[0]['status'], dict(sent[0]['headers']), b''.join(message['body'] for message in sent[1:])
+
+    async def test_coroutine_method(self):
+        body = b'{"jsonrpc": "2.0", "method": "sleep_echo", "params": [1], "id": 1}'
+        status, headers, response = await self.request([body[:10], body[10:]])
+        self.assertEqual(status, 200)
+        self.assertEqual(headers[b'content-type'], b'application/json')
+        self.assertEqual(headers[b'content-length'], str(len(response)).encode())
+        self.assertEqual(json.loads(response)['result'], 1)
+
+    async def test_sync_method_offloaded(self):
+        status, _, response = await self.request([b'{"jsonrpc": "2.0", "method": "thread", "id": 1}'])
+        self.assertEqual(status, 200)
+        self.assertNotEqual(json.loads(response)['result'], threading.get_ident())
+
+    async def test_msgpack(self):
+        body = packb({"jsonrpc": "2.0", "method": "sleep_echo", "params": [[1.5]], "id": 1})
+        status, headers, response = await self.request([body], headers=[(b'content-type', b'application/msgpack')])
+        self.assertEqual(headers[b'content-type'], b'application/msgpack')
+        self.assertEqual(unpackb(response)['result'], [1.5])
+
+    async def test_streamed_file(self):
+        status, headers, response = await self.request([b'{"jsonrpc": "2.0", "method": "file", "id": 1}'])
+        self.assertGreater(len(self.sent), 10)
+        self.assertEqual(headers[b'content-length'], str(len(response)).encode())
+        self.assertEqual(json.loads(response)['result'], [1] * 500)
+
+    async def test_notification(self):
+        status, headers, response = await self.request([b'{"jsonrpc": "2.0", "method": "sleep_echo", "params": [1]}'])
+        self.assertEqual(status, 204)
+        self.assertEqual(response, b'')
+
+    async def test_rejected_requests(self):
+        self.assertEqual((await self.request([b''], method='GET'))[0], 405)
+        self.assertEqual((await self.request([b'x' * 60, b'x' * 60]))[0], 413)
+        self.assertEqual((await self.request([b'{}'], headers=[(b'content-length', b'101')]))[0], 413)
+
+    async def test_disconnect(self):
+        status, _, _ = await self.request([])
+        self.assertIsNone(status)
+
+    async def test_lifespan(self):
+        messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        await self.app({'type': 'lifespan'}, receive, send)
+        self.assertEqual(sent, ['lifespan.startup.complete', 'lifespan.shutdown.complete'])
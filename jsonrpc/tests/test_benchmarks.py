@@ -0,0 +1,62 @@
+""" Test benchmark suite."""
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from jsonrpc.benchmarks import __main__ as cli
+from jsonrpc.benchmarks.cases import CASES
+from jsonrpc.benchmarks.runner import measure, compare, percentile, run
+
+
+class TestRunner(unittest.TestCase):
+
+    def test_percentile(self):
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 0.5), 50)
+        self.assertEqual(percentile(samples, 0.99), 99)
+        self.assertEqual(percentile([1], 0.99), 1)
+
+    def test_measure(self):
+        calls = []
+        result = measure(lambda: calls.append(1), min_time=0, min_iterations=10, warmup=2)
+        self.assertEqual(result['iterations'], 10)
+        self.assertEqual(len(calls), 12)
+        self.assertLessEqual(result['p50'], result['p99'])
+        self.assertGreater(result['ops'], 0)
+
+    def test_cases(self):
+        for name, case in CASES.items():
+            if name != 'batch_100k':
+                with self.subTest(case=name):
+                    case()()
+
+    def test_compare(self):
+        old = {'results': {'a': {'ops': 100}, 'b': {'ops': 100}, 'c': {'ops': 1}}}
+        new = {'results': {'a': {'ops': 95}, 'b': {'ops': 50}, 'd': {'ops': 1}}}
+        rows = compare(old, new, threshold=0.1)
+        self.assertEqual([(row[0], row[-1]) for row in rows], [('a', False), ('b', True)])
+        self.assertAlmostEqual(rows[1][3], -0.5)
+
+
+class TestCommandLine(unittest.TestCase):
+
+    def test_run_and_compare(self):
+        with tempfile.TemporaryDirectory() as directory:
+            old, new = os.path.join(directory, 'old.json'), os.path.join(directory, 'new.json')
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                self.assertEqual(cli.main(['-k', 'single', '-k', '*_error', '--min-time', '0', '-o', old]), 0)
+            self.assertIn('single', output.getvalue())
+            with open(old) as f:
+                report = json.load(f)
+            self.assertEqual(set(report['results']), {'single', 'parse_error', 'server_error'})
+
+            report['results']['single']['ops'] *= 100
+            with open(new, 'w') as f:
+                json.dump(report, f)
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(cli.main(['--compare', old, new]), 0)
+                self.assertEqual(cli.main(['--compare', new, old]), 1)
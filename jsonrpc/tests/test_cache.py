@@ -0,0 +1,152 @@
+""" Test method result cache."""
+import threading
+import unittest
+from datetime import date
+
+from mock import MagicMock
+
+from jsonrpc.cache import CachePolicy, MethodCache, MISSING
+from jsonrpc.dispatcher import Dispatcher
+from jsonrpc.manager import JSONRPCResponseManager
+from jsonrpc.request import JSONRPCSingleRequest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMethodCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_policy_validation(self):
+        with self.assertRaises(ValueError):
+            CachePolicy(ttl=0)
+        with self.assertRaises(ValueError):
+            CachePolicy(maxsize=0)
+
+    def test_make_key(self):
+        self.assertEqual(MethodCache.make_key((), {"b": 1, "a": 2}), MethodCache.make_key([], {"a": 2, "b": 1}))
+        self.assertNotEqual(MethodCache.make_key((1,)), MethodCache.make_key((), {"x": 1}))
+        self.assertNotEqual(MethodCache.make_key((1,)), MethodCache.make_key(("1",)))
+        self.assertNotEqual(MethodCache.make_key((date(2014, 1, 1),)), MethodCache.make_key((date(2014, 1, 2),)))
+
+    def test_get_set(self):
+        cache = MethodCache(CachePolicy())
+        self.assertIs(cache.get("a"), MISSING)
+        cache.set("a", None)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "evictions": 0, "size": 1})
+
+    def test_lru_eviction(self):
+        cache = MethodCache(CachePolicy(maxsize=2))
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIs(cache.get("b"), MISSING)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(len(cache), 2)
+
+    def test_ttl(self):
+        cache = MethodCache(CachePolicy(ttl=10), clock=self.clock)
+        cache.set("a", 1)
+        self.clock.now = 9.9
+        self.assertEqual(cache.get("a"), 1)
+        self.clock.now = 10
+        self.assertIs(cache.get("a"), MISSING)
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "evictions": 1, "size": 0})
+
+    def test_invalidate(self):
+        cache = MethodCache(CachePolicy())
+        cache.set(cache.make_key((1,)), 1)
+        cache.set(cache.make_key((), {"x": 2}), 2)
+        cache.invalidate(1)
+        self.assertIs(cache.get(cache.make_key((1,))), MISSING)
+        self.assertEqual(cache.get(cache.make_key((), {"x": 2})), 2)
+        cache.invalidate()
+        self.assertEqual(len(cache), 0)
+
+    def test_threads(self):
+        cache = MethodCache(CachePolicy(maxsize=10))
+
+        def work(offset):
+            for i in range(1000):
+                cache.set(i % 20 + offset, i)
+                cache.get(i % 20)
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(cache), 10)
+        stats = cache.stats()
+        self.assertEqual(stats["hits"] + stats["misses"], 4000)
+
+
+class TestDispatcherCache(unittest.TestCase):
+
+    def setUp(self):
+        self.method = MagicMock(return_value=42)
+        self.dispatcher = Dispatcher()
+        self.dispatcher.add_method(self.method, name="answer", cache=CachePolicy(maxsize=10))
+        self.manager = JSONRPCResponseManager()
+
+    def call(self, *args, **kwargs):
+        request = JSONRPCSingleRequest({"jsonrpc": "2.0", "method": "answer", "params": args or kwargs, "id": 1})
+        return self.manager.handle(request.json, self.dispatcher)
+
+    def test_result_is_cached(self):
+        self.assertEqual(self.call(1).result, 42)
+        self.assertEqual(self.call(1).result, 42)
+        self.call(x=1)
+        self.assertEqual(self.method.call_count, 2)
+        self.assertEqual(self.dispatcher.cache_stats(), {"answer": {"hits": 1, "misses": 2, "evictions": 0, "size": 2}})
+
+    def test_errors_are_not_cached(self):
+        self.method.side_effect = ValueError
+        self.assertEqual(self.call(1).error["code"], -32000)
+        self.assertEqual(self.call(1).error["code"], -32000)
+        self.assertEqual(self.method.call_count, 2)
+
+    def test_invalidate(self):
+        self.call(1)
+        self.call(2)
+        self.dispatcher.invalidate("answer", 1)
+        self.call(1)
+        self.call(2)
+        self.assertEqual(self.method.call_count, 3)
+        self.dispatcher.invalidate("answer")
+        self.call(2)
+        self.assertEqual(self.method.call_count, 4)
+        self.dispatcher.invalidate("does_not_exist")
+
+    def test_replace_method_drops_cache(self):
+        self.dispatcher["answer"] = self.method
+        self.assertIsNone(self.dispatcher.get_cache("answer"))
+        self.assertEqual(self.dispatcher.cache_stats(), {})
+
+
+class TestDispatcherCacheAsync(unittest.IsolatedAsyncioTestCase):
+
+    async def test_coroutine_result_is_cached(self):
+        calls = []
+
+        async def answer(x):
+            calls.append(x)
+            return x
+
+        dispatcher = Dispatcher()
+        dispatcher.add_method(answer, cache=CachePolicy())
+        request = JSONRPCSingleRequest({"jsonrpc": "2.0", "method": "answer", "params": [1], "id": 1})
+        self.assertEqual((await request.process_async(dispatcher)).result, 1)
+        self.assertEqual((await request.process_async(dispatcher)).result, 1)
+        self.assertEqual(calls, [1])
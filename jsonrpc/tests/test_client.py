@@ -0,0 +1,206 @@
+""" Test connection-pooled client."""
+import asyncio
+import threading
+import unittest
+from concurrent.futures import TimeoutError
+
+from jsonrpc.client import Client, RequestError
+from jsonrpc.dispatcher import Dispatcher
+from jsonrpc.framing import LengthPrefixedFraming
+from jsonrpc.manager import AsyncJSONRPCResponseManager
+from jsonrpc.msgpack import MessagePackCodec
+from jsonrpc.transports.tcp import TCPServer
+
+
+class ServerThread(threading.Thread):
+    """ TCP server running in its own event loop. """
+
+    def __init__(self, dispatcher, **kwargs):
+        super().__init__(daemon=True)
+        self.server = TCPServer(dispatcher, **kwargs)
+        self.loop = asyncio.new_event_loop()
+        self.started = threading.Event()
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        self.listener = self.loop.run_until_complete(self.server.start('127.0.0.1', 0))
+        self.address = self.listener.sockets[0].getsockname()
+        self.started.set()
+        self.loop.run_forever()
+
+    def __enter__(self):
+        self.start()
+        self.started.wait(5)
+        return self
+
+    def __exit__(self, *exc_info):
+        asyncio.run_coroutine_threadsafe(self.stop(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.join(5)
+        self.loop.close()
+
+    async def stop(self):
+        self.listener.close()
+        await self.listener.wait_closed()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def make_dispatcher():
+    async def sleep_echo(x, delay):
+        await asyncio.sleep(delay)
+        return x
+
+    billing = Dispatcher()
+    billing['get'] = lambda invoice: {'invoice': invoice}
+    dispatcher = Dispatcher()
+    dispatcher['subtract'] = lambda a, b: a - b
+    dispatcher['sleep_echo'] = sleep_echo
+    dispatcher['echo'] = lambda x: x
+    dispatcher.mount('billing', billing)
+    return dispatcher
+
+
+class TestClient(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ServerThread(make_dispatcher()).__enter__()
+        self.addCleanup(self.server.__exit__)
+
+    def client(self, **kwargs):
+        client = Client(self.server.address, **kwargs)
+        self.addCleanup(client.close)
+        return client
+
+    def test_call(self):
+        client = self.client()
+        self.assertEqual(client.call('subtract', 42, 23), 19)
+        self.assertEqual(client.call('subtract', b=42, a=23), -19)
+        self.assertEqual(len(self.server.server.connections), 1)
+
+    def test_proxy(self):
+        proxy = self.client().proxy
+        self.assertEqual(proxy.subtract(3, 1), 2)
+        self.assertEqual(proxy.billing.get(7), {'invoice': 7})
+
+    def test_error(self):
+        client = self.client()
+        with self.assertRaises(RequestError) as context:
+            client.call('does_not_exist')
+        self.assertEqual(context.exception.code, -32601)
+        with self.assertRaises(ValueError):
+            client.call('subtract', 1, b=2)
+
+    def test_pipelining(self):
+        client = self.client()
+        slow = client.submit('sleep_echo', 'slow', 0.2)
+        fast = client.submit('sleep_echo', 'fast', 0)
+        self.assertEqual(fast.result(5), 'fast')
+        self.assertFalse(slow.done())
+        self.assertEqual(slow.result(5), 'slow')
+
+    def test_pool(self):
+        client = self.client(pool_size=3)
+        futures = [client.submit('subtract', i, 1) for i in range(6)]
+        self.assertEqual([future.result(5) for future in futures], [i - 1 for i in range(6)])
+        self.assertEqual(len(self.server.server.connections), 3)
+
+    def test_timeout(self):
+        client = self.client(timeout=0.05)
+        with self.assertRaises(TimeoutError):
+            client.call('sleep_echo', 1, 1)
+        connection = client._connections[0]
+        self.assertEqual(connection.pending, {})
+
+    def test_reconnect(self):
+        client = self.client()
+        future = client.submit('sleep_echo', 1, 1)
+        client._connections[0].close()
+        with self.assertRaises(ConnectionError):
+            future.result(5)
+        self.assertEqual(client.call('subtract', 2, 1), 1)
+
+    def test_notify(self):
+        client = self.client()
+        client.notify('subtract', 2, 1)
+        self.assertEqual(client.call('subtract', 2, 1), 1)
+
+
+class TestClientFraming(unittest.TestCase):
+
+    def test_length_prefixed(self):
+        with ServerThread(make_dispatcher(), framing=LengthPrefixedFraming()) as server:
+            with Client(server.address, framing='length') as client:
+                self.assertEqual(client.call('subtract', 5, 3), 2)
+
+    def test_msgpack(self):
+        with ServerThread(make_dispatcher(), framing=LengthPrefixedFraming()) as server:
+            with Client(server.address, framing='length', codec=MessagePackCodec) as binary, \
+                    Client(server.address, framing='length') as text:
+                self.assertEqual(binary.call('echo', b'\x00\xff'), b'\x00\xff')
+                self.assertEqual(text.call('subtract', 5, 3), 2)
+                with self.assertRaises(RequestError):
+                    binary.call('missing')
+        with self.assertRaises(ValueError):
+            Client(('127.0.0.1', 0), framing='nul', codec=MessagePackCodec)
+
+
+class CountingManager(AsyncJSONRPCResponseManager):
+    def __init__(self):
+        super().__init__()
+        self.frames = []
+
+    async def handle_async(self, request_string, dispatcher):
+        self.frames.append(bytes(request_string))
+        return await super().handle_async(request_string, dispatcher)
+
+
+class TestClientCoalescing(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = CountingManager()
+        self.server = ServerThread(make_dispatcher(), manager=self.manager).__enter__()
+        self.addCleanup(self.server.__exit__)
+
+    def client(self, **kwargs):
+        client = Client(self.server.address, **kwargs)
+        self.addCleanup(client.close)
+        return client
+
+    def test_calls_within_window_make_one_batch(self):
+        client = self.client(batch_window=0.05)
+        futures = [client.submit('subtract', i, 1) for i in range(5)]
+        client.notify('subtract', 0, 0)
+        failing = client.submit('does_not_exist')
+        self.assertEqual([future.result(5) for future in futures], [i - 1 for i in range(5)])
+        with self.assertRaises(RequestError):
+            failing.result(5)
+        self.assertEqual(len(self.manager.frames), 1)
+        self.assertTrue(self.manager.frames[0].startswith(b'['))
+
+    def test_full_batch_is_sent_at_once(self):
+        client = self.client(batch_window=10, batch_size=3)
+        futures = [client.submit('subtract', i, 1) for i in range(3)]
+        self.assertEqual([future.result(5) for future in futures], [-1, 0, 1])
+
+    def test_call_waits_for_window(self):
+        client = self.client(batch_window=0.01)
+        self.assertEqual(client.proxy.subtract(3, 1), 2)
+        self.assertEqual(len(self.manager.frames), 1)
+        self.assertFalse(self.manager.frames[0].startswith(b'['))
+
+    def test_flush_and_close(self):
+        client = self.client(batch_window=10)
+        future = client.submit('subtract', 3, 1)
+        client.flush()
+        self.assertEqual(future.result(5), 2)
+        client.notify('subtract', 3, 1)
+        client.close()
+        with self.assertRaises(ConnectionError):
+            client.submit('subtract', 3, 1)
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            Client(self.server.address, batch_window=0)
@@ -0,0 +1,165 @@
+""" Test JSON codecs."""
+from datetime import datetime, date
+import collections
+import json
+import unittest
+
+from jsonrpc import codecs
+from jsonrpc.codecs import CODECS, DefaultCodec, JSONCodec, OrjsonCodec, StdlibJSONCodec, apply_object_hook, \
+    detect_codec_class, get_codec
+from jsonrpc.manager import JSONRPCResponseManager
+from jsonrpc.utils import json_datetime_default, json_datetime_hook
+
+
+AVAILABLE_CODECS = [codec_class for codec_class in CODECS if codec_class.is_available()]
+
+
+class TestCodecs(unittest.TestCase):
+    """ Test every available codec behaves like stdlib json."""
+
+    def setUp(self):
+        self.obj = {"a": [1, 2.5, None, True, {"b": "строка"}], "c": {"d": {}}}
+
+    def test_round_trip(self):
+        for codec_class in AVAILABLE_CODECS:
+            with self.subTest(codec=codec_class.name):
+                codec = codec_class()
+                self.assertEqual(json.loads(codec.encode(self.obj)), self.obj)
+                self.assertEqual(codec.decode(json.dumps(self.obj)), self.obj)
+                self.assertEqual(codec.decode(json.dumps(self.obj).encode('utf-8')), self.obj)
+                self.assertEqual(codec.decode(memoryview(json.dumps(self.obj).encode('utf-8'))), self.obj)
+
+    def test_encode_bytes(self):
+        for codec_class in AVAILABLE_CODECS:
+            with self.subTest(codec=codec_class.name):
+                data = codec_class().encode_bytes(self.obj)
+                self.assertIsInstance(data, bytes)
+                self.assertIn("строка".encode('utf-8'), data)
+                self.assertEqual(json.loads(data.decode('utf-8')), self.obj)
+
+    def test_stdlib_encode_bytes_surrogates(self):
+        data = StdlibJSONCodec().encode_bytes(["\ud800"])
+        self.assertEqual(json.loads(data.decode('utf-8')), ["\ud800"])
+
+    def test_non_str_keys(self):
+        for codec_class in AVAILABLE_CODECS:
+            with self.subTest(codec=codec_class.name):
+                self.assertEqual(json.loads(codec_class().encode({1: 2})), {"1": 2})
+
+    def test_errors(self):
+        for codec_class in AVAILABLE_CODECS:
+            with self.subTest(codec=codec_class.name):
+                codec = codec_class()
+                with self.assertRaises(TypeError):
+                    codec.encode(datetime.now())
+                with self.assertRaises(ValueError):
+                    codec.decode('{"a": ')
+
+    def test_stdlib_fallback(self):
+        point = collections.namedtuple("Point", "x y")
+        obj = {"big": 2 ** 70, "point": point(1, 2)}
+        for codec_class in [OrjsonCodec, StdlibJSONCodec]:
+            if not codec_class.is_available():
+                continue
+            with self.subTest(codec=codec_class.name):
+                codec = codec_class(default=json_datetime_default)
+                self.assertEqual(json.loads(codec.encode(obj)), {"big": 2 ** 70, "point": [1, 2]})
+                self.assertEqual(json.loads(codec.encode_bytes([date(2014, 7, 1), 2 ** 70]))[1], 2 ** 70)
+                with self.assertRaises(TypeError):
+                    codec.encode([object(), 2 ** 70])
+
+    def test_stdlib_decode_fallback(self):
+        cases = [
+            (b'[123456789012345678901234567890, -18446744073709551617, 1.5]',
+             [123456789012345678901234567890, -18446744073709551617, 1.5]),
+            ('{"a": [9223372036854775808]}', {"a": [9223372036854775808]}),
+            (b'[Infinity, -Infinity, 1e400]', [float("inf"), float("-inf"), float("inf")]),
+            (memoryview(b'{"date": {"__date__": [2014, 7, 1]}, "big": 12345678901234567890}'),
+             {"date": date(2014, 7, 1), "big": 12345678901234567890}),
+        ]
+        for codec_class in [OrjsonCodec, StdlibJSONCodec]:
+            if not codec_class.is_available():
+                continue
+            codec = codec_class(object_hook=json_datetime_hook)
+            for data, expected in cases:
+                with self.subTest(codec=codec_class.name, data=data):
+                    self.assertEqual(codec.decode(data), expected)
+            with self.subTest(codec=codec_class.name, data="NaN"):
+                value, = codec.decode(b'[NaN]')
+                self.assertNotEqual(value, value)
+            with self.assertRaises(ValueError):
+                codec.decode(b'[1,, 12345678901234567890]')
+
+    def test_hooks(self):
+        obj = {"date": date(2014, 7, 1), "nested": [{"datetime": datetime(2014, 7, 1, 12, 30)}]}
+        for codec_class in AVAILABLE_CODECS:
+            with self.subTest(codec=codec_class.name):
+                codec = codec_class(default=json_datetime_default, object_hook=json_datetime_hook)
+                self.assertEqual(codec.decode(codec.encode(obj)), obj)
+
+    def test_apply_object_hook_order(self):
+        seen = []
+
+        def hook(dictionary):
+            seen.append(dict(dictionary))
+            return len(dictionary)
+
+        string = '{"a": {"b": {}}, "c": [{"d": 1, "e": 2}]}'
+        expected_seen = []
+        expected = json.loads(string, object_hook=lambda d: expected_seen.append(dict(d)) or len(d))
+        self.assertEqual(apply_object_hook(json.loads(string), hook), expected)
+        self.assertEqual(seen, expected_seen)
+
+
+class TestCodecSelection(unittest.TestCase):
+
+    def test_detect(self):
+        self.assertIs(detect_codec_class((StdlibJSONCodec,)), StdlibJSONCodec)
+        self.assertIs(detect_codec_class(()), StdlibJSONCodec)
+        self.assertIs(DefaultCodec, AVAILABLE_CODECS[0])
+
+    def test_get_codec(self):
+        codec = StdlibJSONCodec()
+        self.assertIs(get_codec(codec, default=json_datetime_default), codec)
+        self.assertIsInstance(get_codec(), DefaultCodec)
+        codec = get_codec(StdlibJSONCodec, default=json_datetime_default, object_hook=json_datetime_hook)
+        self.assertIsInstance(codec, StdlibJSONCodec)
+        self.assertIs(codec.default, json_datetime_default)
+        self.assertIs(codec.object_hook, json_datetime_hook)
+
+    def test_get_codec_cache_is_bounded(self):
+        codec = get_codec(StdlibJSONCodec, object_hook=json_datetime_hook)
+        for _ in range(codecs._CODEC_CACHE_LIMIT * 2):
+            self.assertIs(get_codec(StdlibJSONCodec, object_hook=json_datetime_hook), codec)
+            get_codec(StdlibJSONCodec, object_hook=lambda obj: obj)
+        self.assertEqual(len(codecs._codec_cache), codecs._CODEC_CACHE_LIMIT)
+
+    def test_base_codec(self):
+        with self.assertRaises(NotImplementedError):
+            JSONCodec().encode({})
+        with self.assertRaises(NotImplementedError):
+            JSONCodec().decode("{}")
+
+    def test_manager_big_int(self):
+        response = JSONRPCResponseManager().handle(
+            '{"jsonrpc": "2.0", "method": "echo", "params": [123456789012345678901234567890], "id": 1}',
+            {"echo": lambda x: x}
+        )
+        self.assertEqual(response.result, 123456789012345678901234567890)
+
+    def test_manager_codec(self):
+        dispatcher = {"next_day": lambda d: d.replace(day=d.day + 1)}
+        request = json.dumps({
+            "jsonrpc": "2.0", "method": "next_day", "params": [date(2014, 7, 1)], "id": 1
+        }, default=json_datetime_default)
+        for codec_class in AVAILABLE_CODECS:
+            with self.subTest(codec=codec_class.name):
+                manager = JSONRPCResponseManager(
+                    serialize_hook=json_datetime_default,
+                    deserialize_hook=json_datetime_hook,
+                    codec=codec_class
+                )
+                self.assertIsInstance(manager.codec, codec_class)
+                response = manager.handle(request, dispatcher)
+                self.assertIsInstance(response.codec, codec_class)
+                self.assertEqual(json.loads(response.json)["result"], {"__date__": [2014, 7, 2]})
@@ -1,9 +1,13 @@
 """ Test utility functionality."""
 from datetime import datetime, date, time, timedelta
+from decimal import Decimal
+from uuid import UUID
 import json
 import unittest
 
-from jsonrpc.utils import json_datetime_hook, FixedOffset, json_datetime_default
+from jsonrpc.codecs import StdlibJSONCodec
+from jsonrpc.manager import JSONRPCResponseManager
+from jsonrpc.utils import json_datetime_hook, FixedOffset, json_datetime_default, TYPES, DATETIME_TYPES
 
 
 class TestDatetimeEncoderDecoder(unittest.TestCase):
@@ -71,3 +75,76 @@ class TestDatetimeEncoderDecoder(unittest.TestCase):
         string = json.dumps(obj, default=json_datetime_default)
 
         self.assertEqual(obj, json.loads(string, object_hook=json_datetime_hook))
+
+    def test_negative_tzshift(self):
+        obj = datetime(2014, 7, 1, 12, 30).replace(tzinfo=FixedOffset(-3600))
+        string = json.dumps(obj, default=json_datetime_default)
+        self.assertEqual(json.loads(string)['__tzshift__'], -3600)
+        self.assertEqual(obj, json.loads(string, object_hook=json_datetime_hook))
+
+
+class TestTypeRegistry(unittest.TestCase):
+
+    def roundtrip(self, obj, registry=TYPES):
+        return json.loads(json.dumps(obj, default=registry.default), object_hook=registry.object_hook)
+
+    def test_builtin_types(self):
+        values = [
+            date(2014, 7, 1),
+            datetime(2014, 7, 1, 12, 30, 15, 100),
+            time(12, 30, tzinfo=FixedOffset(3600)),
+            Decimal("1.10"),
+            UUID("7d3db200-9111-41df-80ec-9d75ecdcff5b"),
+            b"\x00\xffbytes",
+            {1, 2, 3},
+        ]
+        for value in values:
+            with self.subTest(value=value):
+                self.assertEqual(self.roundtrip({"value": value}), {"value": value})
+
+    def test_wire_format(self):
+        self.assertEqual(TYPES.default(date(2014, 7, 1)), {"__date__": [2014, 7, 1]})
+        self.assertEqual(TYPES.default(Decimal("1.10")), {"__decimal__": "1.10"})
+        self.assertEqual(TYPES.default(bytearray(b"ab")), {"__bytes__": "YWI="})
+        self.assertEqual(TYPES.default(frozenset([1])), {"__set__": [1]})
+
+    def test_untagged(self):
+        obj = {"__date__": [2014, 7, 1], "a": 1, "b": 2}
+        self.assertIs(TYPES.object_hook(obj), obj)
+        obj = {"__weird__": True, "a": 1}
+        self.assertIs(TYPES.object_hook(obj), obj)
+
+    def test_datetime_only(self):
+        with self.assertRaises(TypeError):
+            json.dumps(Decimal("1"), default=DATETIME_TYPES.default)
+        self.assertEqual(json_datetime_hook({"__decimal__": "1"}), {"__decimal__": "1"})
+
+    def test_subclass(self):
+        class Point:
+            def __init__(self, x, y):
+                self.x, self.y = x, y
+
+            def __eq__(self, other):
+                return (self.x, self.y) == (other.x, other.y)
+
+        class Meters(Decimal):
+            pass
+
+        registry = TYPES.copy()
+        registry.register("__point__", Point, lambda o: {"__point__": [o.x, o.y]},
+                          lambda d: Point(*d["__point__"]))
+        self.assertEqual(self.roundtrip([Point(1, 2)], registry), [Point(1, 2)])
+        self.assertEqual(self.roundtrip(Meters("2.5"), registry), Decimal("2.5"))
+        with self.assertRaises(TypeError):
+            TYPES.default(Point(1, 2))
+        with self.assertRaises(TypeError):
+            registry.default(object())
+
+    def test_invalid_decimal(self):
+        with self.assertRaises(ValueError):
+            TYPES.object_hook({"__decimal__": "abc"})
+        manager = JSONRPCResponseManager(codec=StdlibJSONCodec(default=TYPES.default, object_hook=TYPES.object_hook))
+        response = manager.handle(
+            '{"jsonrpc": "2.0", "method": "echo", "params": [{"__decimal__": "abc"}], "id": 1}', {"echo": lambda x: x}
+        )
+        self.assertEqual(response.error["code"], -32700)
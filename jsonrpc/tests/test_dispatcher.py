@@ -1,5 +1,7 @@
+from jsonrpc.cache import CachePolicy
 from jsonrpc.dispatcher import Dispatcher
 import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 
 class TestDispatcher(unittest.TestCase):
@@ -87,3 +89,156 @@ class TestDispatcher(unittest.TestCase):
     def test_dispatcher_representation(self):
 
         self.assertEqual('{}', repr(self.d))
+
+    def test_add_method_with_arguments_as_decorator(self):
+
+        @self.d.add_method(name="sum_two")
+        def add(x, y):
+            return x + y
+
+        self.assertIn("sum_two", self.d)
+        self.assertEqual(add(1, 1), 2)
+
+    def test_add_method_executor(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.d.add_method(len, executor=executor)
+        self.d.add_method(sum)
+        self.assertIs(self.d.get_executor("len"), executor)
+        self.assertIsNone(self.d.get_executor("sum"))
+        self.assertIsNone(self.d.get_executor("does_not_exist"))
+        executor.shutdown()
+
+    def test_add_method_process_executor(self):
+        self.d.add_method(len, executor="process")
+        try:
+            self.assertIsInstance(self.d.get_executor("len"), ProcessPoolExecutor)
+            self.assertIs(self.d.get_executor("len"), self.d.get_executor("len"))
+        finally:
+            self.d.shutdown()
+
+    def test_add_method_invalid_executor(self):
+        with self.assertRaises(ValueError):
+            self.d.add_method(len, executor="gpu")
+
+    def test_add_method_lazy_params(self):
+        self.assertFalse(self.d.has_lazy_params)
+        self.d.add_method(len, lazy_params=True)
+        self.assertTrue(self.d.get_options("len")["lazy_params"])
+
+        root = Dispatcher()
+        root.mount("ns", self.d)
+        self.assertTrue(root.has_lazy_params)
+        self.d["len"] = len
+        self.assertFalse(self.d.has_lazy_params)
+        self.assertFalse(root.has_lazy_params)
+
+    def test_add_method_lazy_params_with_cache(self):
+        with self.assertRaises(ValueError):
+            self.d.add_method(len, lazy_params=True, cache=CachePolicy())
+
+    def test_replace_method_drops_executor(self):
+        self.d.add_method(len, executor="process")
+        self.d["len"] = len
+        self.assertIsNone(self.d.get_executor("len"))
+        del self.d["len"]
+        self.assertNotIn("len", self.d.method_options)
+
+    def test_signature_binder(self):
+        def method(a, b=1, *, c, d=2):
+            pass
+
+        self.d.add_method(method)
+        binder = self.d.method_options["method"]["binder"]
+        self.assertTrue(binder.accepts((1,), {"c": 3}))
+        self.assertTrue(binder.accepts((), {"a": 1, "b": 2, "c": 3, "d": 4}))
+        self.assertFalse(binder.accepts((1,), {}))
+        self.assertFalse(binder.accepts((1, 2, 3), {"c": 3}))
+        self.assertFalse(binder.accepts((1,), {"a": 1, "c": 3}))
+        self.assertFalse(binder.accepts((1,), {"c": 3, "e": 5}))
+
+    def test_signature_binder_variadic(self):
+        def method(a, /, *args, **kwargs):
+            pass
+
+        self.d["method"] = method
+        binder = self.d.method_options["method"]["binder"]
+        self.assertTrue(binder.accepts((1, 2, 3), {"a": 1, "x": 2}))
+        self.assertFalse(binder.accepts((), {"a": 1}))
+
+    def test_signature_binder_kept_with_options(self):
+        self.d.add_method(lambda x: x, name="echo", cache=CachePolicy())
+        self.assertIn("binder", self.d.method_options["echo"])
+        self.assertIsNotNone(self.d.get_cache("echo"))
+
+
+class TestDispatcherMount(unittest.TestCase):
+
+    def setUp(self):
+        self.root = Dispatcher()
+        self.billing = Dispatcher()
+        self.invoice = Dispatcher()
+        self.invoice["get"] = lambda x: x
+        self.billing.mount("invoice", self.invoice)
+        self.root.mount("billing", self.billing)
+
+    def test_nested_lookup(self):
+        self.assertEqual(self.root["billing.invoice.get"](1), 1)
+        self.assertEqual(self.billing["invoice.get"](1), 1)
+        self.assertEqual(list(self.root), ["billing.invoice.get"])
+        self.assertEqual(len(self.root), 1)
+
+    def test_mutation_of_mounted_dispatcher(self):
+        self.invoice.add_method(len, executor="process")
+        self.assertIn("billing.invoice.len", self.root)
+        self.assertIs(self.root.get_executor("billing.invoice.len"), self.invoice.process_pool)
+        self.assertIn("binder", self.root.get_options("billing.invoice.get"))
+
+        del self.invoice["get"]
+        self.assertNotIn("billing.invoice.get", self.root)
+        self.root.shutdown()
+        self.assertIsNone(self.invoice._process_pool)
+
+    def test_delete_through_parent(self):
+        del self.root["billing.invoice.get"]
+        self.assertNotIn("get", self.invoice)
+
+    def test_own_method_takes_precedence(self):
+        def own(x):
+            return -x
+
+        self.root["billing.invoice.get"] = own
+        self.assertIs(self.root["billing.invoice.get"], own)
+        del self.root["billing.invoice.get"]
+        self.assertEqual(self.root["billing.invoice.get"](1), 1)
+
+    def test_unmount(self):
+        self.assertIs(self.root.unmount("billing"), self.billing)
+        self.assertEqual(len(self.root), 0)
+        self.billing["refund"] = len
+        self.assertNotIn("billing.refund", self.root)
+
+    def test_mount_errors(self):
+        with self.assertRaises(ValueError):
+            self.root.mount("billing", Dispatcher())
+        with self.assertRaises(ValueError):
+            self.invoice.mount("root", self.root)
+        with self.assertRaises(ValueError):
+            self.root.mount("self", self.root)
+
+    def test_mount_equal_dispatchers(self):
+        # empty dispatchers are equal mappings, but different dispatchers
+        child = Dispatcher()
+        child.mount("c", Dispatcher())
+        parent = Dispatcher()
+        parent.mount("child", child)
+        self.assertIn("child", parent.mounts)
+
+    def test_unmount_from_equal_parent(self):
+        child = Dispatcher()
+        first, second = Dispatcher(), Dispatcher()
+        first.mount("x", child)
+        second.mount("x", child)
+        second.unmount("x")
+        child["g"] = len
+        self.assertIs(first["x.g"], len)
+        self.assertNotIn("x.g", second)
@@ -78,7 +78,7 @@ class TestJSONRPCExamples(unittest.TestCase):
         response = self.manager.handle(req, self.dispatcher)
         self.assertTrue(isjsonequal(
             response.json,
-            '{"jsonrpc": "2.0", "error": {"code": -32601, "message": "Method not found"}, "id": null}'
+            '{"jsonrpc": "2.0", "error": {"code": -32601, "message": "Method not found"}, "id": "1"}'
         ))
 
     def test_rpc_call_with_invalid_json(self):
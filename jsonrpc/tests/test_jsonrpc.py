@@ -1,11 +1,17 @@
+import io
 import json
+import os
+import pickle
+import tempfile
 import unittest
 from copy import deepcopy
 
 from jsonrpc.exceptions import JSONRPCInvalidRequestException, JSONRPCParseException, JSONRPCMultipleRequestException, \
     JSONRPCException
+from jsonrpc.errors import JSONRPCParseError, JSONRPCServerError
 from jsonrpc.request import JSONRPCSingleRequest, JSONRPCBatchRequest
-from jsonrpc.response import JSONRPCSingleResponse, JSONRPCBatchResponse
+from jsonrpc.msgpack import MessagePackCodec, unpackb
+from jsonrpc.response import JSONRPCSingleResponse, JSONRPCBatchResponse, RawJSON, RawJSONFile
 from jsonrpc.tests.test_examples import isjsonequal
 
 
@@ -615,6 +621,95 @@ class TestJSONRPCSingleResponse(unittest.TestCase):
         })
 
 
+class TestJSONRPCSingleResponseEncoding(unittest.TestCase):
+    """ Test template based serialization of JSONRPCSingleResponse."""
+
+    def test_result_is_encoded_once(self):
+        request = JSONRPCSingleRequest({"method": "echo", "params": ["ы"], "jsonrpc": "2.0", "id": "ид"})
+        response = JSONRPCSingleResponse({"value": "ы"}, request=request)
+        encoded = response.json_bytes
+        self.assertIs(response.json_bytes, encoded)
+        self.assertEqual(json.loads(encoded.decode("utf-8")), response.container)
+        self.assertEqual(json.loads(response.json), response.container)
+
+    def test_null_id(self):
+        request = JSONRPCSingleRequest({"method": "echo", "jsonrpc": "2.0"})
+        response = JSONRPCSingleResponse([1, 2], request=request)
+        self.assertEqual(json.loads(response.json), {"jsonrpc": "2.0", "id": None, "result": [1, 2]})
+
+    def test_standard_error(self):
+        first = JSONRPCParseError().as_response()
+        second = JSONRPCParseError().as_response()
+        self.assertEqual(first.json_bytes, second.json_bytes)
+        self.assertEqual(json.loads(first.json), first.container)
+
+    def test_error_keeps_request_id(self):
+        request = JSONRPCSingleRequest({"method": "echo", "jsonrpc": "2.0", "id": "1"})
+        response = JSONRPCParseError().as_response(request=request)
+        self.assertEqual(response.id, "1")
+        self.assertEqual(json.loads(response.json)["id"], "1")
+
+    def test_error_with_data(self):
+        response = JSONRPCServerError(data={"type": "ValueError"}).as_response()
+        self.assertEqual(json.loads(response.json), response.container)
+
+
+class TestRawJSON(unittest.TestCase):
+    """ Test pre-encoded results."""
+
+    def setUp(self):
+        self.request = JSONRPCSingleRequest({"method": "echo", "jsonrpc": "2.0", "id": 7})
+        fd, self.path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(fd, "wb") as f:
+            f.write(b'{"items": [' + b",".join(b"%d" % i for i in range(1000)) + b']}')
+        self.addCleanup(os.remove, self.path)
+
+    def test_single(self):
+        response = JSONRPCSingleResponse(RawJSON('{"cached": "ы"}'), request=self.request)
+        self.assertEqual(response.json_bytes, '{"jsonrpc":"2.0","id":7,"result":{"cached": "ы"}}'.encode("utf-8"))
+        self.assertEqual(response.container["result"], {"cached": "ы"})
+        self.assertFalse(response.streamed)
+        self.assertEqual(list(response.iter_json_bytes()), [response.json_bytes])
+
+    def test_batch(self):
+        batch = JSONRPCBatchResponse([
+            JSONRPCSingleResponse(RawJSON(b"[1, 2]"), request=self.request),
+            JSONRPCSingleResponse({"plain": True}, request=self.request),
+            JSONRPCParseError().as_response(),
+        ])
+        self.assertIn(b'"result":[1, 2]', batch.json_bytes)
+        self.assertEqual(json.loads(batch.json), [response.container for response in batch])
+        self.assertEqual(json.loads(b"".join(batch.iter_json_bytes())), json.loads(batch.json_bytes))
+
+    def test_file(self):
+        raw = RawJSONFile(self.path, chunk_size=100)
+        response = JSONRPCSingleResponse(raw, request=self.request)
+        self.assertTrue(response.streamed)
+        chunks = list(response.iter_json_bytes())
+        self.assertGreater(len(chunks), 10)
+        self.assertEqual(b"".join(chunks), response.json_bytes)
+        self.assertEqual(response.json_size, len(response.json_bytes))
+        self.assertEqual(json.loads(response.json)["result"]["items"][-1], 999)
+
+        batch = JSONRPCBatchResponse([response, JSONRPCParseError().as_response()])
+        self.assertTrue(batch.streamed)
+        body = b"".join(batch.iter_json_bytes())
+        self.assertEqual(batch.json_size, len(body))
+        self.assertEqual(json.loads(body), json.loads(batch.json_bytes))
+
+    def test_binary_codec(self):
+        for raw in (RawJSON(b'{"a": [1]}'), RawJSONFile(self.path)):
+            response = JSONRPCSingleResponse(raw, request=self.request, codec=MessagePackCodec)
+            self.assertFalse(response.streamed)
+            self.assertEqual(unpackb(response.json_bytes)["result"], json.loads(raw.data))
+            batch = JSONRPCBatchResponse([response], codec=MessagePackCodec)
+            self.assertEqual(unpackb(batch.json_bytes)[0]["result"], json.loads(raw.data))
+
+    def test_pickle(self):
+        self.assertEqual(pickle.loads(pickle.dumps(RawJSON(b"[1]"))).data, b"[1]")
+        self.assertEqual(pickle.loads(pickle.dumps(RawJSONFile(self.path))).size, os.path.getsize(self.path))
+
+
 class TestJSONRPCBatchResponse(unittest.TestCase):
     """ Test JSONRPCBatchResponse functionality."""
 
@@ -670,3 +765,89 @@ class TestJSONRPCBatchResponse(unittest.TestCase):
 
         for response in responses:
             self.assertIsInstance(response, JSONRPCSingleResponse)
+
+
+class TestJSONRPCBatchResponseStreaming(unittest.TestCase):
+    """ Test incremental serialization of JSONRPCBatchResponse."""
+
+    def setUp(self):
+        self.requests = [
+            JSONRPCSingleRequest({"method": "echo", "params": [i], "jsonrpc": "2.0", "id": i})
+            for i in range(3)
+        ]
+        self.responses = [JSONRPCSingleResponse(request.params[0], request=request) for request in self.requests]
+        self.expected = [{"result": i, "id": i, "jsonrpc": "2.0"} for i in range(3)]
+
+    def test_iter_json(self):
+        response = JSONRPCBatchResponse(self.responses)
+        chunks = list(response.iter_json())
+        self.assertEqual(chunks[0], "[")
+        self.assertEqual(chunks[-1], "]")
+        self.assertEqual(json.loads("".join(chunks)), self.expected)
+        self.assertEqual(json.loads(b"".join(response.iter_json_bytes()).decode()), self.expected)
+
+    def test_write_to(self):
+        response = JSONRPCBatchResponse(self.responses)
+        text, binary = io.StringIO(), io.BytesIO()
+        self.assertEqual(response.write_to(text), len(text.getvalue()))
+        self.assertEqual(response.write_to(binary), len(binary.getvalue()))
+        self.assertEqual(json.loads(text.getvalue()), self.expected)
+        self.assertEqual(json.loads(binary.getvalue().decode()), self.expected)
+
+    def test_generator_is_consumed_lazily(self):
+        produced = []
+
+        def generate():
+            for response in self.responses:
+                produced.append(response)
+                yield response
+
+        response = JSONRPCBatchResponse(generate())
+        chunks = response.iter_json()
+        head = [next(chunks), next(chunks)]
+        self.assertEqual(head[0], "[")
+        self.assertEqual(json.loads(head[1]), self.expected[0])
+        self.assertEqual(len(produced), 1)
+        self.assertEqual(json.loads("".join(head + list(chunks))), self.expected)
+        self.assertEqual(len(produced), 3)
+        # items are kept, so batch could be serialized again
+        self.assertEqual(len(response), 3)
+        self.assertEqual(json.loads(response.json), self.expected)
+
+    def test_empty_generator(self):
+        response = JSONRPCBatchResponse(iter([]))
+        self.assertEqual(list(response.iter_json()), [])
+        self.assertEqual(len(response), 0)
+
+    def test_generator_validation(self):
+        response = JSONRPCBatchResponse(iter([1]))
+        with self.assertRaises(TypeError):
+            list(response.iter_json())
+
+    def test_lazy_batch_process(self):
+        calls = []
+
+        def echo(x):
+            calls.append(x)
+            return x
+
+        batch = JSONRPCBatchRequest(self.requests + [
+            JSONRPCSingleRequest({"method": "echo", "params": [3], "jsonrpc": "2.0"})
+        ])
+        response = batch.process({"echo": echo}, lazy=True)
+        self.assertIsInstance(response, JSONRPCBatchResponse)
+        self.assertEqual(calls, [])
+        self.assertEqual(json.loads("".join(response.iter_json())), self.expected)
+        self.assertEqual(calls, [0, 1, 2, 3])
+
+    def test_lazy_batch_process_notifications(self):
+        batch = JSONRPCBatchRequest([
+            JSONRPCSingleRequest({"method": "echo", "params": [1], "jsonrpc": "2.0"})
+        ])
+        self.assertIsNone(batch.process({"echo": lambda x: x}))
+        response = batch.process({"echo": lambda x: x}, lazy=True)
+        self.assertEqual(response.json, "")
+        self.assertEqual(response.json_bytes, b"")
+        self.assertEqual("".join(response.iter_json()), "")
+        self.assertEqual(response.json_size, 0)
+        self.assertEqual(len(response), 0)
@@ -0,0 +1,182 @@
+""" Test lazy params decoding."""
+import asyncio
+import json
+import pickle
+import unittest
+
+from jsonrpc.codecs import StdlibJSONCodec
+from jsonrpc.dispatcher import Dispatcher
+from jsonrpc.exceptions import JSONRPCParseException
+from jsonrpc.lazy import LazyParams, split_params
+from jsonrpc.manager import AsyncJSONRPCResponseManager, JSONRPCResponseManager
+from jsonrpc.response import RawJSON
+
+
+class RecordingCodec(StdlibJSONCodec):
+    """ Codec remembering every decoded document. """
+
+    def __init__(self, default=None, object_hook=None):
+        super().__init__(default=default, object_hook=object_hook)
+        self.decoded = []
+
+    def decode(self, data):
+        self.decoded.append(bytes(data))
+        return super().decode(data)
+
+
+class TestSplitParams(unittest.TestCase):
+
+    def test_layouts(self):
+        cases = [
+            (b'{"jsonrpc": "2.0", "method": "m", "params": [1, [2]], "id": 1}', b'[1, [2]]'),
+            (b' {"params":{"a":"}"},"jsonrpc":"2.0","method":"m"} ', b'{"a":"}"}'),
+            (b'{"id": "a\\"b\\\\", "method": "m", "params": [], "jsonrpc": "2.0"}', b'[]'),
+            (b'{\n  "method": "m",\n  "params": ["\\""],\n  "id": null\n}\n', b'["\\""]'),
+        ]
+        for data, params in cases:
+            with self.subTest(data=data):
+                envelope, raw = split_params(data)
+                self.assertEqual(raw, params)
+                expected = json.loads(data)
+                del expected["params"]
+                self.assertEqual(json.loads(envelope), expected)
+
+    def test_unsupported_layouts(self):
+        cases = [
+            b'[{"jsonrpc": "2.0", "method": "m", "params": [1]}]',
+            b'{"jsonrpc": "2.0", "method": "m", "id": 1}',
+            b'{"jsonrpc": "2.0", "method": "m", "params": 1}',
+            b'{"jsonrpc": "2.0", "method": ["m"], "params": [1]}',
+            b'{"jsonrpc": "2.0", "method": "m", "params": [1], "id": 1',
+            b'{"jsonrpc": "2.0", "method": "m", "params": [1] "id": 1}',
+            b'{"jsonrpc": "2.0", "method": "m", "params": [1], "id": [2]}',
+            b'{"jsonrpc": "2.0", "method": "m", "params": {"a": 1}, "extra": {"a": 1}, "id": 1}',
+            b'{"jsonrpc": "2.0", "method": "m", "params": [1], "extra": {"a": "]"}}',
+            b'{}',
+            b'',
+        ]
+        for data in cases:
+            with self.subTest(data=data):
+                self.assertIsNone(split_params(data))
+
+
+class TestLazyParams(unittest.TestCase):
+
+    def test_decoded_on_access(self):
+        codec = RecordingCodec()
+        params = LazyParams(b'[1, 2]', codec)
+        self.assertEqual(params.size, 6)
+        self.assertEqual(repr(params), "LazyParams(<6 bytes>)")
+        self.assertEqual(codec.decoded, [])
+        self.assertEqual(params.raw, b'[1, 2]')
+        self.assertEqual(params.value, [1, 2])
+        self.assertEqual(codec.decoded, [b'[1, 2]'])
+
+    def test_invalid(self):
+        params = LazyParams(b'[1, 2], "x": [3]', RecordingCodec())
+        with self.assertRaises(JSONRPCParseException):
+            params.value
+        with self.assertRaises(JSONRPCParseException):
+            params.raw
+
+    def test_from_value(self):
+        params = LazyParams.from_value({"a": 1}, StdlibJSONCodec())
+        self.assertEqual(params.value, {"a": 1})
+        self.assertEqual(json.loads(params.raw), {"a": 1})
+        self.assertEqual(params.size, len(params.raw))
+
+    def test_pickle(self):
+        for params in (LazyParams(b'[1, 2]', StdlibJSONCodec()), LazyParams.from_value([1, 2], StdlibJSONCodec())):
+            with self.subTest(params=params):
+                self.assertEqual(pickle.loads(pickle.dumps(params)).value, [1, 2])
+
+
+class TestLazyManager(unittest.TestCase):
+
+    def setUp(self):
+        self.codec = RecordingCodec()
+        self.manager = JSONRPCResponseManager(codec=self.codec)
+        self.manager.lazy_params_min_size = 0
+        self.dispatcher = Dispatcher()
+        self.dispatcher.add_method(lambda params: params.size, name="size", lazy_params=True)
+        self.dispatcher.add_method(lambda params: RawJSON(params.raw), name="echo", lazy_params=True)
+        self.dispatcher.add_method(lambda params: sum(params.value), name="sum", lazy_params=True)
+        self.dispatcher.add_method(lambda a, b: a - b, name="sub")
+
+    def handle(self, request):
+        return json.loads(self.manager.handle(request, self.dispatcher).json)
+
+    def test_params_not_decoded(self):
+        response = self.handle(b'{"jsonrpc": "2.0", "method": "size", "params": [1, 2, 3], "id": 1}')
+        self.assertEqual(response, {"jsonrpc": "2.0", "id": 1, "result": 9})
+        self.assertEqual(self.codec.decoded, [b'{"jsonrpc": "2.0","method": "size","id": 1}'])
+
+    def test_method_not_found_before_params(self):
+        response = self.handle(b'{"jsonrpc": "2.0", "method": "nope", "params": [1,, "x"], "id": 1}')
+        self.assertEqual(response["error"]["code"], -32601)
+        self.assertEqual(response["id"], 1)
+        self.assertEqual(len(self.codec.decoded), 1)
+
+    def test_decoded_params(self):
+        response = self.handle('{"jsonrpc": "2.0", "method": "sum", "params": [1, 2, 3], "id": "é"}')
+        self.assertEqual(response, {"jsonrpc": "2.0", "id": "é", "result": 6})
+
+    def test_raw_params(self):
+        response = self.handle(b'{"jsonrpc": "2.0", "method": "echo", "params": {"a": [1, "]"]}, "id": 1}')
+        self.assertEqual(response["result"], {"a": [1, "]"]})
+
+    def test_invalid_params(self):
+        for method in ("echo", "sum"):
+            with self.subTest(method=method):
+                response = self.handle(
+                    b'{"jsonrpc": "2.0", "method": "' + method.encode() + b'", "params": [1,, 2], "id": 1}'
+                )
+                self.assertEqual(response["error"]["code"], -32700)
+                self.assertEqual(response["id"], 1)
+
+    def test_non_scalar_member_after_params(self):
+        eager = JSONRPCResponseManager()
+        requests = [
+            b'{"jsonrpc": "2.0", "method": "size", "params": [1], "id": [2]}',
+            b'{"jsonrpc": "2.0", "method": "size", "params": {"a": 1}, "extra": {"a": 1}, "id": 1}',
+        ]
+        for request in requests:
+            with self.subTest(request=request):
+                response = self.handle(request)
+                self.assertEqual(response["error"]["code"], -32600)
+                self.assertEqual(response, json.loads(eager.handle(request, self.dispatcher).json))
+
+    def test_eager_method(self):
+        response = self.handle(b'{"jsonrpc": "2.0", "method": "sub", "params": {"a": 3, "b": 1}, "id": 1}')
+        self.assertEqual(response["result"], 2)
+        response = self.handle(b'{"jsonrpc": "2.0", "method": "sub", "params": [1], "id": 1}')
+        self.assertEqual(response["error"]["code"], -32602)
+
+    def test_invalid_request(self):
+        response = self.handle(b'{"jsonrpc": "1.0", "method": "size", "params": [1], "id": 1}')
+        self.assertEqual(response["error"]["code"], -32600)
+        response = self.handle(b'{"jsonrpc": "2.0", "method": "size", "params": 1, "id": 1}')
+        self.assertEqual(response["error"]["code"], -32600)
+
+    def test_batch(self):
+        response = self.handle(b'[{"jsonrpc": "2.0", "method": "sum", "params": [1, 2], "id": 1},'
+                               b' {"jsonrpc": "2.0", "method": "size", "params": [1, 2], "id": 2}]')
+        self.assertEqual([item["result"] for item in response], [3, 6])
+
+    def test_notification(self):
+        self.assertIsNone(self.manager.handle(b'{"jsonrpc": "2.0", "method": "size", "params": [1]}',
+                                              self.dispatcher))
+
+    def test_small_request(self):
+        manager = JSONRPCResponseManager(codec=self.codec)
+        response = manager.handle(b'{"jsonrpc": "2.0", "method": "size", "params": [1, 2], "id": 1}', self.dispatcher)
+        self.assertEqual(response.result, 6)
+        self.assertEqual(len(self.codec.decoded), 1)
+
+    def test_async(self):
+        manager = AsyncJSONRPCResponseManager(codec=self.codec)
+        manager.lazy_params_min_size = 0
+        response = asyncio.run(manager.handle_async(
+            b'{"jsonrpc": "2.0", "method": "size", "params": [1], "id": 1}', self.dispatcher
+        ))
+        self.assertEqual(response.result, 3)
@@ -1,7 +1,13 @@
+import json
+import os
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 from mock import MagicMock
 
+from jsonrpc.dispatcher import Dispatcher
 from jsonrpc.manager import JSONRPCResponseManager
 from jsonrpc.request import JSONRPCBatchRequest, JSONRPCSingleRequest
 from jsonrpc.response import JSONRPCBatchResponse, JSONRPCSingleResponse
@@ -107,3 +113,190 @@ class TestJSONRPCResponseManager(unittest.TestCase):
         request = JSONRPCSingleRequest({'jsonrpc': '2.0', 'method': 'error'})
         response = self.manager.handle(request.json, self.dispatcher)
         self.assertEqual(response, None)
+
+    def test_bytes_request(self):
+        req = '{"jsonrpc": "2.0", "method": "echo", "params": ["ёлка"], "id": 1}'.encode('utf-8')
+        for request in (req, bytearray(req), memoryview(req)):
+            response = self.manager.handle(request, self.dispatcher)
+            self.assertIsInstance(response, JSONRPCSingleResponse)
+            self.assertEqual(response.result, "ёлка")
+
+    def test_handle_bytes(self):
+        req = '{"jsonrpc": "2.0", "method": "echo", "params": ["ёлка"], "id": 1}'.encode('utf-8')
+        response = self.manager.handle_bytes(req, self.dispatcher)
+        self.assertIsInstance(response, bytes)
+        self.assertIn("ёлка".encode('utf-8'), response)
+        self.assertEqual(json.loads(response.decode('utf-8')), {"jsonrpc": "2.0", "result": "ёлка", "id": 1})
+
+    def test_handle_bytes_batch(self):
+        request = JSONRPCBatchRequest([
+            {'jsonrpc': '2.0', 'method': 'echo', 'params': [1], 'id': 1},
+            {'jsonrpc': '2.0', 'method': 'does_not_exist', 'id': 2},
+        ])
+        response = json.loads(self.manager.handle_bytes(request.json.encode('utf-8'), self.dispatcher).decode())
+        self.assertEqual([item["id"] for item in response], [1, 2])
+        self.assertEqual(response[1]["error"]["code"], -32601)
+
+    def test_handle_bytes_notification(self):
+        req = b'{"jsonrpc": "2.0", "method": "long_time_method"}'
+        self.assertIsNone(self.manager.handle_bytes(req, self.dispatcher))
+
+    def test_handle_bytes_parse_error(self):
+        response = json.loads(self.manager.handle_bytes(b'\xff\xfe{', self.dispatcher).decode())
+        self.assertEqual(response["error"]["code"], -32700)
+
+
+class TestJSONRPCResponseManagerSignature(unittest.TestCase):
+    def setUp(self):
+        self.called = MagicMock()
+
+        def add(a, b):
+            self.called()
+            return a + b
+
+        def broken():
+            return len(1)
+
+        self.dispatcher = Dispatcher()
+        self.dispatcher.add_method(add)
+        self.dispatcher.add_method(broken)
+        self.manager = JSONRPCResponseManager()
+
+    def test_invalid_params_rejected_before_call(self):
+        for params in ([1], [1, 2, 3], {"a": 1, "c": 2}):
+            request = JSONRPCSingleRequest({'jsonrpc': '2.0', 'method': 'add', 'params': params, 'id': 0})
+            response = self.manager.handle(request.json, self.dispatcher)
+            self.assertEqual(response.error["code"], -32602)
+        self.assertFalse(self.called.called)
+
+    def test_valid_params(self):
+        request = JSONRPCSingleRequest({'jsonrpc': '2.0', 'method': 'add', 'params': {"a": 1, "b": 2}, 'id': 0})
+        response = self.manager.handle(request.json, self.dispatcher)
+        self.assertEqual(response.result, 3)
+
+    def test_type_error_inside_method_is_server_error(self):
+        request = JSONRPCSingleRequest({'jsonrpc': '2.0', 'method': 'broken', 'id': 0})
+        response = self.manager.handle(request.json, self.dispatcher)
+        self.assertEqual(response.error["code"], -32000)
+        self.assertEqual(response.error["data"]["type"], "TypeError")
+
+
+class TestJSONRPCResponseManagerMount(unittest.TestCase):
+    def test_mounted_method(self):
+        billing = Dispatcher()
+        billing.add_method(lambda a, b: a + b, name="add")
+        dispatcher = Dispatcher()
+        dispatcher.mount("billing", billing)
+        manager = JSONRPCResponseManager()
+
+        request = JSONRPCSingleRequest({'jsonrpc': '2.0', 'method': 'billing.add', 'params': [1, 2], 'id': 0})
+        self.assertEqual(manager.handle(request.json, dispatcher).result, 3)
+        request = JSONRPCSingleRequest({'jsonrpc': '2.0', 'method': 'billing.add', 'params': [1], 'id': 0})
+        self.assertEqual(manager.handle(request.json, dispatcher).error["code"], -32602)
+        request = JSONRPCSingleRequest({'jsonrpc': '2.0', 'method': 'add', 'params': [1, 2], 'id': 0})
+        self.assertEqual(manager.handle(request.json, dispatcher).error["code"], -32601)
+
+
+class TestJSONRPCResponseManagerExecutor(unittest.TestCase):
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+        def sleep_echo(x, delay=0.05):
+            with self.lock:
+                self.running += 1
+                self.max_running = max(self.max_running, self.running)
+            time.sleep(delay)
+            with self.lock:
+                self.running -= 1
+            return x
+
+        self.notification_method = MagicMock()
+        self.dispatcher = {
+            "sleep_echo": sleep_echo,
+            "notification_method": self.notification_method,
+        }
+        self.executor = ThreadPoolExecutor(max_workers=16)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_batch_runs_in_parallel_and_keeps_order(self):
+        manager = JSONRPCResponseManager(executor=self.executor)
+        request = JSONRPCBatchRequest([
+            {'jsonrpc': '2.0', 'method': 'sleep_echo', 'params': [i, 0.1 - i * 0.005], 'id': i}
+            for i in range(10)
+        ])
+        start = time.monotonic()
+        response = manager.handle(request.json, self.dispatcher)
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertIsInstance(response, JSONRPCBatchResponse)
+        self.assertEqual([r.result for r in response], list(range(10)))
+
+    def test_max_batch_workers(self):
+        manager = JSONRPCResponseManager(executor=self.executor, max_batch_workers=3)
+        request = JSONRPCBatchRequest([
+            {'jsonrpc': '2.0', 'method': 'sleep_echo', 'params': [i, 0.02], 'id': i}
+            for i in range(12)
+        ])
+        response = manager.handle(request.json, self.dispatcher)
+        self.assertEqual([r.result for r in response], list(range(12)))
+        self.assertLessEqual(self.max_running, 3)
+
+    def test_notifications_are_dropped(self):
+        manager = JSONRPCResponseManager(executor=self.executor)
+        request = JSONRPCBatchRequest([
+            {'jsonrpc': '2.0', 'method': 'notification_method'},
+            {'jsonrpc': '2.0', 'method': 'sleep_echo', 'params': [1], 'id': 1},
+            {'jsonrpc': '2.0', 'method': 'does_not_exist'},
+        ])
+        response = manager.handle(request.json, self.dispatcher)
+        self.assertEqual([r.id for r in response], [1])
+        self.notification_method.assert_called_once_with()
+
+        request = JSONRPCBatchRequest([{'jsonrpc': '2.0', 'method': 'notification_method'}])
+        self.assertIsNone(manager.handle(request.json, self.dispatcher))
+
+
+def cpu_bound_pid(x):
+    return x * 2, os.getpid()
+
+
+def cpu_bound_error(x):
+    raise ValueError("bad value {0}".format(x))
+
+
+class TestJSONRPCResponseManagerProcessPool(unittest.TestCase):
+    def setUp(self):
+        self.dispatcher = Dispatcher(process_workers=2)
+        self.dispatcher.add_method(cpu_bound_pid, executor="process")
+        self.dispatcher.add_method(cpu_bound_error, executor="process")
+        self.dispatcher.add_method(lambda: 1, name="lambda", executor="process")
+        self.manager = JSONRPCResponseManager()
+
+    def tearDown(self):
+        self.dispatcher.shutdown()
+
+    def test_method_runs_in_another_process(self):
+        request = JSONRPCSingleRequest({'jsonrpc': '2.0', 'method': 'cpu_bound_pid', 'params': [21], 'id': 0})
+        response = self.manager.handle(request.json, self.dispatcher)
+        value, pid = response.result
+        self.assertEqual(value, 42)
+        self.assertNotEqual(pid, os.getpid())
+
+    def test_server_error(self):
+        request = JSONRPCSingleRequest({'jsonrpc': '2.0', 'method': 'cpu_bound_error', 'params': [1], 'id': 0})
+        response = self.manager.handle(request.json, self.dispatcher)
+        self.assertEqual(response.error["code"], -32000)
+        self.assertEqual(response.error["data"], {"type": "ValueError", "message": "bad value 1"})
+
+    def test_invalid_params(self):
+        request = JSONRPCSingleRequest({'jsonrpc': '2.0', 'method': 'cpu_bound_pid', 'params': [1, 2], 'id': 0})
+        response = self.manager.handle(request.json, self.dispatcher)
+        self.assertEqual(response.error["code"], -32602)
+
+    def test_unpicklable_method(self):
+        request = JSONRPCSingleRequest({'jsonrpc': '2.0', 'method': 'lambda', 'id': 0})
+        response = self.manager.handle(request.json, self.dispatcher)
+        self.assertEqual(response.error["code"], -32000)
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import unittest
+
+from jsonrpc.dispatcher import Dispatcher
+from jsonrpc.manager import AsyncJSONRPCResponseManager
+from jsonrpc.request import JSONRPCBatchRequest, JSONRPCSingleRequest
+from jsonrpc.response import JSONRPCBatchResponse, JSONRPCSingleResponse
+from jsonrpc.tests.test_manager import cpu_bound_pid
+
+
+class TestAsyncJSONRPCResponseManager(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        async def sleep_echo(x, delay=0.05):
+            await asyncio.sleep(delay)
+            return x
+
+        async def error():
+            raise Exception("error_explanation")
+
+        self.dispatcher = {
+            "add": sum,
+            "sleep_echo": sleep_echo,
+            "error": error,
+            "echo": lambda x: x,
+        }
+        self.manager = AsyncJSONRPCResponseManager()
+
+    async def test_coroutine_method_is_awaited(self):
+        req = '{"jsonrpc": "2.0", "method": "sleep_echo", "params": ["foo"], "id": 1}'
+        response = await self.manager.handle_async(req, self.dispatcher)
+        self.assertIsInstance(response, JSONRPCSingleResponse)
+        self.assertEqual(response.result, "foo")
+
+    async def test_plain_method(self):
+        req = '{"jsonrpc": "2.0", "method": "echo", "params": ["foo"], "id": 1}'
+        response = await self.manager.handle_async(req, self.dispatcher)
+        self.assertEqual(response.result, "foo")
+
+    async def test_offload_sync(self):
+        self.dispatcher["thread"] = threading.get_ident
+        req = '[{"jsonrpc": "2.0", "method": "thread", "id": 1}, {"jsonrpc": "2.0", "method": "sleep_echo", "params": [1], "id": 2}]'
+        response = await self.manager.handle_async(req, self.dispatcher)
+        self.assertEqual(response[0].result, threading.get_ident())
+        manager = AsyncJSONRPCResponseManager(offload_sync=True)
+        response = await manager.handle_async(req, self.dispatcher)
+        self.assertNotEqual(response[0].result, threading.get_ident())
+        self.assertEqual(response[1].result, 1)
+
+    async def test_offload_sync_returning_coroutine(self):
+        sleep_echo = self.dispatcher["sleep_echo"]
+
+        def wrapper(x):
+            return sleep_echo(x, delay=0)
+
+        self.dispatcher["wrapper"] = wrapper
+        manager = AsyncJSONRPCResponseManager(offload_sync=True)
+        response = await manager.handle_async(
+            '{"jsonrpc": "2.0", "method": "wrapper", "params": [1], "id": 1}', self.dispatcher
+        )
+        self.assertEqual(response.result, 1)
+        self.assertEqual(json.loads(response.json)["result"], 1)
+
+    async def test_batch_runs_concurrently_and_keeps_order(self):
+        request = JSONRPCBatchRequest([
+            {'jsonrpc': '2.0', 'method': 'sleep_echo', 'params': [i, 0.1 - i * 0.002], 'id': i}
+            for i in range(50)
+        ])
+        start = time.monotonic()
+        response = await self.manager.handle_async(request.json, self.dispatcher)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertIsInstance(response, JSONRPCBatchResponse)
+        self.assertEqual([r.result for r in response], list(range(50)))
+        self.assertEqual([r.id for r in response], list(range(50)))
+
+    async def test_batch_drops_notifications(self):
+        request = JSONRPCBatchRequest([
+            {'jsonrpc': '2.0', 'method': 'sleep_echo', 'params': [1]},
+            {'jsonrpc': '2.0', 'method': 'sleep_echo', 'params': [2], 'id': 2},
+        ])
+        response = await self.manager.handle_async(request.json, self.dispatcher)
+        self.assertEqual([r.result for r in response], [2])
+
+    async def test_notification_only_batch(self):
+        request = JSONRPCBatchRequest([{'jsonrpc': '2.0', 'method': 'sleep_echo', 'params': [1]}])
+        response = await self.manager.handle_async(request.json, self.dispatcher)
+        self.assertIsNone(response)
+
+    async def test_method_not_found(self):
+        request = JSONRPCSingleRequest({'jsonrpc': '2.0', 'method': 'does_not_exist', 'id': 0})
+        response = await self.manager.handle_async(request.json, self.dispatcher)
+        self.assertEqual(response.error["code"], -32601)
+
+    async def test_invalid_params(self):
+        request = JSONRPCSingleRequest({'jsonrpc': '2.0', 'method': 'sleep_echo', 'params': {"y": 0}, 'id': 0})
+        response = await self.manager.handle_async(request.json, self.dispatcher)
+        self.assertEqual(response.error["code"], -32602)
+
+    async def test_server_error(self):
+        request = JSONRPCSingleRequest({'jsonrpc': '2.0', 'method': 'error', 'id': 0})
+        response = await self.manager.handle_async(request.json, self.dispatcher)
+        self.assertEqual(response.error["code"], -32000)
+        self.assertEqual(response.error["data"], {
+            "type": "Exception",
+            "message": 'error_explanation',
+        })
+
+    async def test_parse_error(self):
+        response = await self.manager.handle_async('{"jsonrpc": "2.0", "method": "foobar', self.dispatcher)
+        self.assertEqual(response.error["code"], -32700)
+
+    async def test_invalid_request(self):
+        response = await self.manager.handle_async('1', self.dispatcher)
+        self.assertEqual(response.error["code"], -32600)
+
+    async def test_handle_bytes_async(self):
+        req = b'{"jsonrpc": "2.0", "method": "sleep_echo", "params": ["foo"], "id": 1}'
+        response = await self.manager.handle_bytes_async(req, self.dispatcher)
+        self.assertEqual(json.loads(response.decode()), {"jsonrpc": "2.0", "result": "foo", "id": 1})
+        req = b'{"jsonrpc": "2.0", "method": "sleep_echo", "params": ["foo"]}'
+        self.assertIsNone(await self.manager.handle_bytes_async(req, self.dispatcher))
+
+
+class TestAsyncJSONRPCResponseManagerProcessPool(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.dispatcher = Dispatcher(process_workers=1)
+        self.dispatcher.add_method(cpu_bound_pid, executor="process")
+        self.manager = AsyncJSONRPCResponseManager()
+
+    def tearDown(self):
+        self.dispatcher.shutdown()
+
+    async def test_method_runs_in_another_process(self):
+        request = JSONRPCSingleRequest({'jsonrpc': '2.0', 'method': 'cpu_bound_pid', 'params': [21], 'id': 0})
+        response = await self.manager.handle_async(request.json, self.dispatcher)
+        value, pid = response.result
+        self.assertEqual(value, 42)
+        self.assertNotEqual(pid, os.getpid())
@@ -0,0 +1,119 @@
+""" Test MessagePack codec."""
+import io
+import json
+import unittest
+from datetime import date
+
+from jsonrpc.manager import JSONRPCResponseManager
+from jsonrpc.msgpack import MessagePackCodec, is_msgpack, packb, unpackb
+from jsonrpc.response import JSONRPCBatchResponse, JSONRPCError
+from jsonrpc.utils import TYPES
+
+
+class TestMessagePack(unittest.TestCase):
+
+    def test_spec_encoding(self):
+        cases = [
+            (None, "c0"), (False, "c2"), (True, "c3"),
+            (0, "00"), (127, "7f"), (-1, "ff"), (-32, "e0"), (-33, "d0df"),
+            (128, "cc80"), (256, "cd0100"), (65536, "ce00010000"), (2 ** 32, "cf0000000100000000"),
+            (-129, "d1ff7f"), (-32769, "d2ffff7fff"), (-2 ** 31 - 1, "d3ffffffff7fffffff"),
+            (1.5, "ca3fc00000"), (0.1, "cb3fb999999999999a"), (1e300, "cb7e37e43c8800759c"),
+            ("", "a0"), ("a", "a161"), ("x" * 32, "d920" + "78" * 32), ("x" * 256, "da0100" + "78" * 256),
+            (b"\x01", "c40101"), ([], "90"), ([1, 2], "920102"), ({"a": 1}, "81a16101"),
+            (list(range(16)), "dc0010" + "".join("{0:02x}".format(i) for i in range(16))),
+        ]
+        for obj, expected in cases:
+            with self.subTest(obj=obj):
+                self.assertEqual(packb(obj).hex(), expected)
+                self.assertEqual(unpackb(bytes.fromhex(expected)), obj)
+
+    def test_decode_float64_and_tuple(self):
+        self.assertEqual(unpackb(bytes.fromhex("cb3ff8000000000000")), 1.5)
+        self.assertEqual(unpackb(packb((1, "a"))), [1, "a"])
+
+    def test_roundtrip(self):
+        obj = {"id": "x" * 300, "values": [0.25] * 70000, "nested": {str(i): [i, -i] for i in range(20)},
+               "bytes": bytes(range(256)) * 300, "text": "ы"}
+        self.assertEqual(unpackb(memoryview(packb(obj))), obj)
+
+    def test_invalid(self):
+        for data in (b"", b"\x92\x01", b"\xa2a", b"\xc1", b"\x01\x02", b"\x81\x91\x01\x01", b"\xa1\xff"):
+            with self.subTest(data=data):
+                with self.assertRaises(ValueError):
+                    unpackb(data)
+        with self.assertRaises(ValueError):
+            unpackb("text")
+        with self.assertRaises(TypeError):
+            packb(object())
+        with self.assertRaises(TypeError):
+            packb(2 ** 64)
+
+    def test_hooks(self):
+        codec = MessagePackCodec(default=TYPES.default, object_hook=TYPES.object_hook)
+        obj = [date(2014, 7, 1), {"set": {1, 2}}]
+        self.assertEqual(codec.decode(codec.encode_bytes(obj)), obj)
+
+    def test_is_msgpack(self):
+        self.assertTrue(is_msgpack(packb({"a": 1})))
+        self.assertTrue(is_msgpack(packb([{"a": 1}] * 20)))
+        self.assertFalse(is_msgpack(b'{"a": 1}'))
+        self.assertFalse(is_msgpack(b' [1]'))
+        self.assertFalse(is_msgpack(b''))
+
+
+class TestManager(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = JSONRPCResponseManager(codec=MessagePackCodec)
+        self.dispatcher = {"echo": lambda x: x}
+
+    def call(self, params, request_id=1):
+        return {"jsonrpc": "2.0", "method": "echo", "params": params, "id": request_id}
+
+    def test_single(self):
+        response = self.manager.handle_bytes(packb(self.call([b"\x00\xff"])), self.dispatcher)
+        self.assertEqual(unpackb(response), {"jsonrpc": "2.0", "id": 1, "result": b"\x00\xff"})
+
+    def test_batch_and_errors(self):
+        request = [self.call([1], "a"), self.call([], "b"), {"jsonrpc": "2.0", "method": "echo", "params": [2]}]
+        response = unpackb(self.manager.handle_bytes(packb(request), self.dispatcher))
+        self.assertEqual([item["id"] for item in response], ["a", "b"])
+        self.assertEqual(response[0]["result"], 1)
+        self.assertEqual(response[1]["error"]["code"], -32602)
+
+    def test_parse_error(self):
+        response = unpackb(self.manager.handle_bytes(b'{"jsonrpc": "2.0"}', self.dispatcher))
+        self.assertEqual(response["error"]["code"], -32700)
+        self.assertIsNone(response["id"])
+
+    def test_json_is_bytes(self):
+        responses = [
+            self.manager.handle(packb(self.call([1])), self.dispatcher),
+            self.manager.handle(packb(self.call([])), self.dispatcher),
+            self.manager.handle(packb([self.call([1], 1), self.call([2], 2)]), self.dispatcher),
+            JSONRPCError(-32000, "Error", codec=MessagePackCodec),
+        ]
+        for response in responses:
+            with self.subTest(response=response):
+                self.assertIsInstance(response.json, bytes)
+                self.assertEqual(unpackb(response.json), unpackb(response.json_bytes))
+        self.assertEqual(JSONRPCBatchResponse(iter([]), codec=MessagePackCodec).json, b"")
+
+    def test_stream(self):
+        request = packb([self.call([1], 1), self.call([2], 2)])
+        response = self.manager.handle_stream(io.BytesIO(request), self.dispatcher, chunk_size=4)
+        self.assertEqual(b"".join(response.iter_json_bytes()), response.json_bytes)
+        self.assertEqual([item["result"] for item in unpackb(response.json_bytes)], [1, 2])
+
+    def test_with_codec(self):
+        manager = JSONRPCResponseManager(serialize_hook=TYPES.default, deserialize_hook=TYPES.object_hook)
+        binary = manager.with_codec(MessagePackCodec)
+        self.assertIsInstance(binary.codec, MessagePackCodec)
+        self.assertEqual(binary.serialize_hook, TYPES.default)
+        self.assertEqual(binary.deserialize_hook, TYPES.object_hook)
+        self.assertNotIsInstance(manager.codec, MessagePackCodec)
+        response = binary.handle_bytes(packb(self.call([date(2014, 7, 1)]), TYPES.default), self.dispatcher)
+        self.assertEqual(unpackb(response, TYPES.object_hook)["result"], date(2014, 7, 1))
+        response = manager.handle_bytes(json.dumps(self.call([1])).encode(), self.dispatcher)
+        self.assertEqual(json.loads(response)["result"], 1)
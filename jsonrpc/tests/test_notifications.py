@@ -0,0 +1,123 @@
+""" Test background execution of notifications."""
+import json
+import threading
+import time
+import unittest
+
+from jsonrpc.manager import JSONRPCResponseManager
+from jsonrpc.notifications import NotificationQueue
+from jsonrpc.request import JSONRPCSingleRequest
+
+
+def notification(method, *params):
+    return JSONRPCSingleRequest({'jsonrpc': '2.0', 'method': method, 'params': list(params)})
+
+
+class TestNotificationQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.gate = threading.Event()
+        self.calls = []
+
+        def wait(value):
+            self.gate.wait(5)
+            self.calls.append(value)
+
+        def fail():
+            raise ValueError
+
+        self.dispatcher = {"wait": wait, "fail": fail}
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            NotificationQueue(workers=0)
+        with self.assertRaises(ValueError):
+            NotificationQueue(maxsize=0)
+        with self.assertRaises(ValueError):
+            NotificationQueue(overflow="ignore")
+
+    def test_counters(self):
+        queue = NotificationQueue(workers=2)
+        self.gate.set()
+        queue.submit(notification("wait", 1), self.dispatcher)
+        queue.submit(notification("fail"), self.dispatcher)
+        queue.submit(notification("does_not_exist"), self.dispatcher)
+        self.assertTrue(queue.join(5))
+        queue.close()
+        self.assertEqual(self.calls, [1])
+        self.assertEqual(queue.stats(), {'queued': 3, 'dropped': 0, 'failed': 2, 'pending': 0})
+        with self.assertRaises(RuntimeError):
+            queue.submit(notification("wait", 1), self.dispatcher)
+
+    def _fill(self, overflow):
+        queue = NotificationQueue(maxsize=1, overflow=overflow)
+        queue.submit(notification("wait", 0), self.dispatcher)
+        # wait for the worker to take the first one, so the next one stays in the queue
+        while len(queue):
+            time.sleep(0.001)
+        queue.submit(notification("wait", 1), self.dispatcher)
+        return queue
+
+    def test_reject(self):
+        queue = self._fill("reject")
+        self.assertFalse(queue.submit(notification("wait", 2), self.dispatcher))
+        self.gate.set()
+        queue.close()
+        self.assertEqual(self.calls, [0, 1])
+        self.assertEqual(queue.stats()['dropped'], 1)
+
+    def test_drop_oldest(self):
+        queue = self._fill("drop_oldest")
+        self.assertTrue(queue.submit(notification("wait", 2), self.dispatcher))
+        self.gate.set()
+        queue.close()
+        self.assertEqual(self.calls, [0, 2])
+        self.assertEqual(queue.stats()['dropped'], 1)
+
+    def test_block(self):
+        queue = self._fill("block")
+        thread = threading.Thread(target=queue.submit, args=(notification("wait", 2), self.dispatcher))
+        thread.start()
+        thread.join(0.05)
+        self.assertTrue(thread.is_alive())
+        self.gate.set()
+        thread.join(5)
+        queue.close()
+        self.assertEqual(self.calls, [0, 1, 2])
+        self.assertEqual(queue.stats()['dropped'], 0)
+
+
+class TestManagerNotifications(unittest.TestCase):
+
+    def setUp(self):
+        self.gate = threading.Event()
+        self.queue = NotificationQueue()
+        self.manager = JSONRPCResponseManager(notifications=self.queue)
+        self.dispatcher = {"wait": lambda: self.gate.wait(5), "echo": lambda x: x}
+
+    def tearDown(self):
+        self.gate.set()
+        self.queue.close()
+
+    def test_batch_does_not_wait_for_notifications(self):
+        body = json.dumps([
+            {"jsonrpc": "2.0", "method": "wait"},
+            {"jsonrpc": "2.0", "method": "echo", "params": [1], "id": 1},
+            {"jsonrpc": "2.0", "method": "wait"},
+        ])
+        response = self.manager.handle(body, self.dispatcher)
+        self.assertEqual([item.result for item in response], [1])
+        self.assertEqual(self.queue.stats()['queued'], 2)
+        self.gate.set()
+        self.assertTrue(self.queue.join(5))
+
+    def test_single_notification(self):
+        response = self.manager.handle('{"jsonrpc": "2.0", "method": "wait"}', self.dispatcher)
+        self.assertIsNone(response)
+        self.assertEqual(self.queue.stats()['queued'], 1)
+
+    def test_stream(self):
+        body = b'[{"jsonrpc": "2.0", "method": "wait"}, {"jsonrpc": "2.0", "method": "echo", "params": [1], "id": 1}]'
+        response = self.manager.handle_stream([body], self.dispatcher)
+        self.assertEqual([item.result for item in response], [1])
+        self.assertEqual(self.queue.stats()['queued'], 1)
@@ -0,0 +1,80 @@
+""" Test prefork server."""
+import os
+import signal
+import subprocess
+import sys
+import time
+import unittest
+
+from jsonrpc.client import Client
+from jsonrpc.serve import PreforkServer, load_dispatcher
+
+dispatcher = {"pid": os.getpid}
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestLoadDispatcher(unittest.TestCase):
+
+    def test_load(self):
+        self.assertIs(load_dispatcher("jsonrpc.tests.test_serve:dispatcher"), dispatcher)
+        self.assertIs(load_dispatcher("jsonrpc.serve:PreforkServer.run"), PreforkServer.run)
+
+    def test_malformed(self):
+        with self.assertRaises(ValueError):
+            load_dispatcher("jsonrpc.tests.test_serve")
+        with self.assertRaises(AttributeError):
+            load_dispatcher("jsonrpc.tests.test_serve:missing")
+
+    def test_workers(self):
+        with self.assertRaises(ValueError):
+            PreforkServer(dispatcher, workers=0)
+        self.assertEqual(PreforkServer(dispatcher).workers, os.cpu_count() or 1)
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "fork is not available")
+class TestPreforkServer(unittest.TestCase):
+
+    def setUp(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "jsonrpc.serve", "jsonrpc.tests.test_serve:dispatcher", "-P", "0", "-w", "2"],
+            cwd=ROOT, stdout=subprocess.PIPE, text=True,
+        )
+        self.addCleanup(self.process.stdout.close)
+        self.addCleanup(self.stop)
+        line = self.process.stdout.readline()
+        self.address = ("127.0.0.1", int(line.split(":")[-1].split()[0]))
+
+    def stop(self):
+        if self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+    def pid(self):
+        with Client(self.address, timeout=5) as client:
+            return client.call("pid")
+
+    def wait_for_pids(self, count, exclude=()):
+        pids = set()
+        deadline = time.monotonic() + 10
+        while len(pids) < count and time.monotonic() < deadline:
+            try:
+                pid = self.pid()
+            except ConnectionError:
+                time.sleep(0.05)
+                continue
+            if pid not in exclude:
+                pids.add(pid)
+        return pids
+
+    def test_workers_share_port_and_restart(self):
+        pids = self.wait_for_pids(2)
+        self.assertEqual(len(pids), 2)
+        self.assertNotIn(self.process.pid, pids)
+
+        killed = pids.pop()
+        os.kill(killed, signal.SIGKILL)
+        self.assertEqual(len(self.wait_for_pids(1, exclude=pids | {killed})), 1)
+
+        self.process.send_signal(signal.SIGTERM)
+        self.assertEqual(self.process.wait(10), 0)
@@ -0,0 +1,104 @@
+""" Test request processing statistics."""
+import unittest
+
+from jsonrpc.manager import JSONRPCResponseManager, AsyncJSONRPCResponseManager
+from jsonrpc.request import JSONRPCBatchRequest
+from jsonrpc.stats import Histogram, StatsCollector, UNKNOWN_METHOD
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_observe(self):
+        histogram = Histogram(buckets=(0.1, 1, 10))
+        for value in (0.05, 0.1, 0.5, 5, 50):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [2, 1, 1, 1])
+        self.assertEqual(histogram.count, 5)
+        self.assertAlmostEqual(histogram.sum, 55.65)
+
+    def test_percentile(self):
+        histogram = Histogram(buckets=(0.1, 1, 10))
+        self.assertIsNone(histogram.percentile(0.5))
+        for _ in range(98):
+            histogram.observe(0.01)
+        histogram.observe(5)
+        histogram.observe(100)
+        self.assertEqual(histogram.percentile(0.5), 0.1)
+        self.assertEqual(histogram.percentile(0.99), 10)
+        self.assertEqual(histogram.percentile(1), float('inf'))
+
+
+class TestStatsCollector(unittest.TestCase):
+
+    def test_record(self):
+        collector = StatsCollector(buckets=(1, 2))
+        collector.record("add", 0.5)
+        collector.record("add", 1.5, error=True)
+        collector.record("add", 3, notification=True)
+        stats = collector.stats()["add"]
+        self.assertEqual((stats["calls"], stats["errors"], stats["notifications"]), (3, 1, 1))
+        self.assertEqual(stats["latency"]["buckets"], [(1, 1), (2, 1), (float('inf'), 1)])
+        collector.reset()
+        self.assertEqual(collector.stats(), {})
+
+    def test_render_prometheus(self):
+        collector = StatsCollector(buckets=(0.5, 1))
+        collector.record('say"hi"', 0.25)
+        collector.record('say"hi"', 0.75, error=True)
+        text = collector.render_prometheus()
+        self.assertIn('# TYPE jsonrpc_calls_total counter\n', text)
+        self.assertIn('jsonrpc_calls_total{method="say\\"hi\\""} 2\n', text)
+        self.assertIn('jsonrpc_errors_total{method="say\\"hi\\""} 1\n', text)
+        self.assertIn('jsonrpc_notifications_total{method="say\\"hi\\""} 0\n', text)
+        self.assertIn('# TYPE jsonrpc_call_duration_seconds histogram\n', text)
+        self.assertIn('jsonrpc_call_duration_seconds_bucket{method="say\\"hi\\"",le="0.5"} 1\n', text)
+        self.assertIn('jsonrpc_call_duration_seconds_bucket{method="say\\"hi\\"",le="1"} 2\n', text)
+        self.assertIn('jsonrpc_call_duration_seconds_bucket{method="say\\"hi\\"",le="+Inf"} 2\n', text)
+        self.assertIn('jsonrpc_call_duration_seconds_sum{method="say\\"hi\\""} 1.0\n', text)
+        self.assertIn('jsonrpc_call_duration_seconds_count{method="say\\"hi\\""} 2\n', text)
+
+
+class TestManagerStats(unittest.TestCase):
+
+    def setUp(self):
+        def error():
+            raise ValueError
+
+        self.dispatcher = {"echo": lambda x: x, "error": error}
+        self.stats = StatsCollector()
+        self.manager = JSONRPCResponseManager(stats=self.stats)
+
+    def counters(self):
+        return {
+            method: (stats["calls"], stats["errors"], stats["notifications"])
+            for method, stats in self.stats.stats().items()
+        }
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(JSONRPCResponseManager().stats)
+
+    def test_batch(self):
+        request = JSONRPCBatchRequest([
+            {"jsonrpc": "2.0", "method": "echo", "params": [1], "id": 1},
+            {"jsonrpc": "2.0", "method": "echo", "params": [1]},
+            {"jsonrpc": "2.0", "method": "echo", "params": [1, 2], "id": 2},
+            {"jsonrpc": "2.0", "method": "error", "id": 3},
+            {"jsonrpc": "2.0", "method": "does_not_exist", "id": 4},
+        ])
+        self.manager.handle(request.json, self.dispatcher)
+        self.assertEqual(self.counters(), {"echo": (3, 1, 1), "error": (1, 1, 0), UNKNOWN_METHOD: (1, 1, 0)})
+        self.assertEqual(self.stats.stats()["echo"]["latency"]["count"], 3)
+
+
+class TestAsyncManagerStats(unittest.IsolatedAsyncioTestCase):
+
+    async def test_single(self):
+        async def echo(x):
+            return x
+
+        stats = StatsCollector()
+        manager = AsyncJSONRPCResponseManager(stats=stats)
+        await manager.handle_async('{"jsonrpc": "2.0", "method": "echo", "params": [1], "id": 1}', {"echo": echo})
+        await manager.handle_async('{"jsonrpc": "2.0", "method": "echo", "id": 1}', {"echo": echo})
+        snapshot = stats.stats()["echo"]
+        self.assertEqual((snapshot["calls"], snapshot["errors"]), (2, 1))
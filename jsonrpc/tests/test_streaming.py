@@ -0,0 +1,185 @@
+""" Test incremental batch parsing."""
+import io
+import json
+import unittest
+
+from jsonrpc.codecs import StdlibJSONCodec
+from jsonrpc.exceptions import JSONRPCParseException
+from jsonrpc.manager import JSONRPCResponseManager
+from jsonrpc.request import JSONRPCSingleRequest
+from jsonrpc.response import JSONRPCBatchResponse, JSONRPCSingleResponse
+from jsonrpc.streaming import BatchReader, BatchStream, iter_chunks
+from jsonrpc.utils import TYPES
+
+
+def split(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestBatchReader(unittest.TestCase):
+    """ Test splitting of JSON array into elements."""
+
+    def read(self, data, size):
+        reader = BatchReader()
+        elements = []
+        for chunk in split(data, size):
+            elements.extend(reader.feed(chunk))
+        reader.close()
+        return elements
+
+    def test_elements(self):
+        data = b' [ {"a": "x,]}\\\\\\"{["}, [1, {"b": [2]}], 3 , "s"]\n'
+        expected = [b'{"a": "x,]}\\\\\\"{["}', b'[1, {"b": [2]}]', b'3', b'"s"']
+        for size in (1, 2, 3, 7, len(data)):
+            with self.subTest(size=size):
+                self.assertEqual(self.read(data, size), expected)
+
+    def test_elements_are_returned_when_complete(self):
+        reader = BatchReader()
+        self.assertEqual(reader.feed(b'[{"a": 1}, {"b"'), [b'{"a": 1}'])
+        self.assertEqual(reader.feed(b': 2}'), [])
+        self.assertEqual(reader.feed(b']'), [b'{"b": 2}'])
+        self.assertTrue(reader.finished)
+
+    def test_empty_array(self):
+        self.assertEqual(self.read(b'[ ]', 1), [])
+
+    def test_empty_element(self):
+        self.assertEqual(self.read(b'[1, ]', 1), [b'1', b''])
+
+    def test_not_batch(self):
+        reader = BatchReader()
+        self.assertEqual(reader.feed(b'  '), [])
+        self.assertIsNone(reader.is_batch)
+        reader.feed(b'{"a": [1]}')
+        self.assertFalse(reader.is_batch)
+        self.assertEqual(bytes(reader.buffer), b'  {"a": [1]}')
+
+    def test_not_closed(self):
+        reader = BatchReader()
+        reader.feed(b'[1, 2')
+        with self.assertRaises(JSONRPCParseException):
+            reader.close()
+
+    def test_extra_data(self):
+        with self.assertRaises(JSONRPCParseException):
+            BatchReader().feed(b'[1] 2')
+        reader = BatchReader()
+        reader.feed(b'[1]')
+        with self.assertRaises(JSONRPCParseException):
+            reader.feed(b'2')
+
+    def test_max_element_size(self):
+        reader = BatchReader(max_element_size=8)
+        reader.feed(b'[1, 2, ')
+        with self.assertRaises(JSONRPCParseException):
+            reader.feed(b'"0123456789')
+
+    def test_max_element_size_of_complete_elements(self):
+        for body in (b'[{"a":"' + b'x' * 2000 + b'"},{"b":1}]', b'[1, "' + b'x' * 2000 + b'"]'):
+            with self.subTest(body=body[:10]):
+                with self.assertRaises(JSONRPCParseException):
+                    BatchReader(max_element_size=50).feed(body)
+        self.assertEqual(BatchReader(max_element_size=3).feed(b'[  123  , 1]'), [b'123', b'1'])
+
+
+class TestBatchStream(unittest.TestCase):
+
+    def test_iter_chunks(self):
+        self.assertEqual(list(iter_chunks(io.BytesIO(b'abcde'), 2)), [b'ab', b'cd', b'e'])
+        self.assertEqual(list(iter_chunks(io.StringIO('ёж'), 1)), ['ё'.encode(), 'ж'.encode()])
+        self.assertEqual(list(iter_chunks([b'a', b'', b'b'])), [b'a', b'b'])
+
+    def test_items(self):
+        data = [
+            {"jsonrpc": "2.0", "method": "echo", "params": [1], "id": 1},
+            1,
+            {"jsonrpc": "1.0", "method": "echo"},
+        ]
+        body = json.dumps(data)[:-1] + ', {"broken": }]'
+        items = list(BatchStream(split(body.encode(), 5)))
+        self.assertIsInstance(items[0], JSONRPCSingleRequest)
+        self.assertEqual([item.error["code"] for item in items[1:]], [-32600, -32600, -32600])
+
+    def test_hook_errors(self):
+        codec = StdlibJSONCodec(object_hook=TYPES.object_hook)
+        body = b'[{"params": [{"__date__": [2014]}]}, {"jsonrpc": "2.0", "method": "echo", "id": 1}]'
+        items = list(BatchStream([body], codec=codec))
+        self.assertEqual(items[0].error["code"], -32600)
+        self.assertIsInstance(items[1], JSONRPCSingleRequest)
+
+    def test_truncated(self):
+        items = list(BatchStream([b'[{"jsonrpc": "2.0", "method": "echo", "id": 1}, {']))
+        self.assertIsInstance(items[0], JSONRPCSingleRequest)
+        self.assertEqual(items[1].error["code"], -32700)
+
+
+class TestHandleStream(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+
+        def echo(x):
+            self.calls.append(x)
+            return x
+
+        self.dispatcher = {"echo": echo}
+        self.manager = JSONRPCResponseManager()
+
+    def test_batch(self):
+        body = json.dumps([
+            {"jsonrpc": "2.0", "method": "echo", "params": [1], "id": 1},
+            {"jsonrpc": "2.0", "method": "echo", "params": [2]},
+            {"jsonrpc": "2.0", "method": 3, "id": 3},
+            {"jsonrpc": "2.0", "method": "does_not_exist", "id": 4},
+        ]).encode()
+        response = self.manager.handle_stream(io.BytesIO(body), self.dispatcher, chunk_size=16)
+        self.assertIsInstance(response, JSONRPCBatchResponse)
+        self.assertEqual(self.calls, [])
+        result = json.loads("".join(response.iter_json()))
+        self.assertEqual(self.calls, [1, 2])
+        self.assertEqual(result[0], {"jsonrpc": "2.0", "result": 1, "id": 1})
+        self.assertEqual([item.get("error", {}).get("code") for item in result], [None, -32600, -32601])
+
+    def test_dispatch_starts_before_body_is_read(self):
+        chunks_read = []
+
+        def chunks():
+            for i in range(3):
+                chunks_read.append(i)
+                yield ('[' if i == 0 else ', ').encode() + json.dumps(
+                    {"jsonrpc": "2.0", "method": "echo", "params": [i], "id": i}
+                ).encode()
+            chunks_read.append(3)
+            yield b']'
+
+        response = self.manager.handle_stream(chunks(), self.dispatcher)
+        first = next(iter(response))
+        self.assertEqual(first.result, 0)
+        self.assertLess(len(chunks_read), 4)
+        self.assertEqual([item.result for item in response], [0, 1, 2])
+
+    def test_single_request(self):
+        body = b'{"jsonrpc": "2.0", "method": "echo", "params": [1], "id": 1}'
+        response = self.manager.handle_stream(split(body, 3), self.dispatcher)
+        self.assertIsInstance(response, JSONRPCSingleResponse)
+        self.assertEqual(response.result, 1)
+
+    def test_empty_batch(self):
+        response = self.manager.handle_stream([b'[', b']'], self.dispatcher)
+        self.assertEqual(response.error["code"], -32600)
+
+    def test_parse_error(self):
+        self.assertEqual(self.manager.handle_stream([b''], self.dispatcher).error["code"], -32700)
+        self.assertEqual(self.manager.handle_stream([b'{"a'], self.dispatcher).error["code"], -32700)
+
+    def test_notifications_only(self):
+        body = b'[{"jsonrpc": "2.0", "method": "echo", "params": [1]}]'
+        response = self.manager.handle_stream([body], self.dispatcher)
+        self.assertEqual(list(response.iter_json()), [])
+        self.assertEqual(self.calls, [1])
+        self.assertEqual(len(response), 0)
+        self.assertEqual(response.json, "")
+        self.assertEqual(response.json_bytes, b"")
+        self.assertEqual(list(response.iter_json_bytes()), [])
+        self.assertEqual(response.json_size, 0)
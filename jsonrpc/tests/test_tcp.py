@@ -0,0 +1,222 @@
+""" Test asyncio TCP transport and framing."""
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from jsonrpc.framing import (
+    FrameDecoder, FrameError, LengthPrefixedFraming, NewlineFraming, NulFraming, get_framing, send_frame
+)
+from jsonrpc.response import RawJSONFile
+from jsonrpc.transports.tcp import TCPServer
+
+
+def call(method, params, request_id):
+    return json.dumps({"jsonrpc": "2.0", "method": method, "params": params, "id": request_id}).encode()
+
+
+class TestFraming(unittest.IsolatedAsyncioTestCase):
+
+    def reader(self, data):
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return reader
+
+    def test_get_framing(self):
+        self.assertIsInstance(get_framing("nul"), NulFraming)
+        framing = NewlineFraming()
+        self.assertIs(get_framing(framing), framing)
+        with self.assertRaises(ValueError):
+            get_framing("xml")
+
+    async def test_delimiter(self):
+        framing = NulFraming()
+        reader = self.reader(b"".join(framing.frame(b"one") + framing.frame(b"two")))
+        self.assertEqual(bytes(await framing.read_frame(reader)), b"one")
+        self.assertEqual(bytes(await framing.read_frame(reader)), b"two")
+        self.assertIsNone(await framing.read_frame(reader))
+
+    async def test_delimiter_broken(self):
+        with self.assertRaises(FrameError):
+            await NewlineFraming().read_frame(self.reader(b'{"id": 1'))
+        with self.assertRaises(FrameError):
+            await NewlineFraming().read_frame(self.reader(b'123456\n'), max_size=4)
+
+    async def test_length_prefixed(self):
+        framing = LengthPrefixedFraming()
+        reader = self.reader(b"".join(framing.frame(b"one") + framing.frame(b"")))
+        self.assertEqual(await framing.read_frame(reader), b"one")
+        self.assertEqual(await framing.read_frame(reader), b"")
+        self.assertIsNone(await framing.read_frame(reader))
+
+    async def test_length_prefixed_broken(self):
+        framing = LengthPrefixedFraming()
+        with self.assertRaises(FrameError):
+            await framing.read_frame(self.reader(b"".join(framing.frame(b"12345"))), max_size=4)
+        with self.assertRaises(FrameError):
+            await framing.read_frame(self.reader(b"".join(framing.frame(b"12345"))[:-1]))
+
+
+class TestFrameDecoder(unittest.TestCase):
+
+    def test_many_frames_per_read(self):
+        decoder = FrameDecoder("nul")
+        decoder.feed(b"one\x00two\x00thr")
+        self.assertEqual([bytes(frame) for frame in decoder], [b"one", b"two"])
+        decoder.feed(b"ee\x00")
+        self.assertEqual([bytes(frame) for frame in decoder], [b"three"])
+        self.assertEqual(len(decoder), 0)
+
+    def test_frames_are_views(self):
+        decoder = FrameDecoder("newline")
+        decoder.feed(b'{"id": 1}\n')
+        frame, = list(decoder)
+        self.assertIsInstance(frame, memoryview)
+        self.assertEqual(json.loads(frame.tobytes()), {"id": 1})
+
+    def test_buffer_grows_and_compacts(self):
+        framing = LengthPrefixedFraming()
+        decoder = FrameDecoder(framing, buffer_size=8)
+        payloads = [b"x" * size for size in (3, 20, 0, 100, 5)]
+        data = b"".join(part for payload in payloads for part in framing.frame(payload))
+        frames = []
+        for position in range(0, len(data), 7):
+            decoder.feed(data[position:position + 7])
+            frames.extend(bytes(frame) for frame in decoder)
+        self.assertEqual(frames, payloads)
+
+    def test_slow_frame_is_scanned_once(self):
+        searched = []
+
+        class RecordingFraming(NulFraming):
+            def find_frame(self, buffer, start, end, scanned=0):
+                found = super().find_frame(buffer, start, end, scanned)
+                searched.append((end if found is None else found[2]) - max(start, scanned))
+                return found
+
+        decoder = FrameDecoder(RecordingFraming(), buffer_size=8)
+        data = b"x" * 1000 + b"\x00" + b"y" * 100 + b"\x00"
+        frames = []
+        for position in range(0, len(data), 3):
+            decoder.feed(data[position:position + 3])
+            frames.extend(bytes(frame) for frame in decoder)
+        self.assertEqual(frames, [b"x" * 1000, b"y" * 100])
+        self.assertLessEqual(sum(searched), len(data))
+
+    def test_max_frame_size(self):
+        decoder = FrameDecoder("nul", max_frame_size=4)
+        decoder.feed(b"12345")
+        with self.assertRaises(FrameError):
+            list(decoder)
+        decoder = FrameDecoder("length", max_frame_size=4)
+        decoder.feed(b"".join(LengthPrefixedFraming().frame(b"12345"))[:6])
+        with self.assertRaises(FrameError):
+            list(decoder)
+
+    def test_socket(self):
+        left, right = socket.socketpair()
+        self.addCleanup(left.close)
+        self.addCleanup(right.close)
+        framing = NulFraming()
+        send_frame(left, framing, b"one")
+        send_frame(left, framing, b"two")
+        left.close()
+        decoder = FrameDecoder(framing)
+        frames = []
+        while decoder.recv_into(right):
+            frames.extend(bytes(frame) for frame in decoder)
+        self.assertEqual(frames, [b"one", b"two"])
+
+
+class TestTCPServer(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        async def sleep_echo(x, delay):
+            await asyncio.sleep(delay)
+            return x
+
+        fd, path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(fd, "wb") as f:
+            f.write(b'"' + b"x" * 10000 + b'"')
+        self.addCleanup(os.remove, path)
+        self.released = threading.Event()
+        self.addCleanup(self.released.set)
+        self.dispatcher = {
+            "echo": lambda x: x, "sleep_echo": sleep_echo, "file": lambda: RawJSONFile(path, chunk_size=1000),
+            "blocking": lambda: self.released.wait(5),
+        }
+
+    async def start(self, **kwargs):
+        server = TCPServer(self.dispatcher, **kwargs)
+        listener = await server.start("127.0.0.1", 0)
+        self.addAsyncCleanup(listener.wait_closed)
+        self.addCleanup(listener.close)
+        self.port = listener.sockets[0].getsockname()[1]
+        reader, writer = await self.connect()
+        return server, reader, writer
+
+    async def connect(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        self.addCleanup(writer.close)
+        return reader, writer
+
+    async def test_many_requests_per_connection(self):
+        for framing in (NulFraming(), NewlineFraming(), LengthPrefixedFraming()):
+            with self.subTest(framing=framing.name):
+                server, reader, writer = await self.start(framing=framing)
+                for i in range(3):
+                    writer.writelines(framing.frame(call("echo", [i], i)))
+                    response = json.loads(bytes(await framing.read_frame(reader)))
+                    self.assertEqual(response["result"], i)
+                self.assertEqual(len(server.connections), 1)
+
+    async def test_pipelining(self):
+        framing = NulFraming()
+        server, reader, writer = await self.start()
+        writer.writelines(framing.frame(call("sleep_echo", ["slow", 0.1], 1)))
+        writer.writelines(framing.frame(call("sleep_echo", ["fast", 0], 2)))
+        first = json.loads(bytes(await framing.read_frame(reader)))
+        second = json.loads(bytes(await framing.read_frame(reader)))
+        self.assertEqual([first["id"], second["id"]], [2, 1])
+
+    async def test_blocking_method_does_not_stall_other_connections(self):
+        framing = NulFraming()
+        server, reader, writer = await self.start()
+        writer.writelines(framing.frame(call("blocking", [], 1)))
+        other_reader, other_writer = await self.connect()
+        other_writer.writelines(framing.frame(call("echo", ["other"], 2)))
+        response = json.loads(bytes(await asyncio.wait_for(framing.read_frame(other_reader), 2)))
+        self.assertEqual(response["result"], "other")
+        self.released.set()
+        response = json.loads(bytes(await framing.read_frame(reader)))
+        self.assertEqual(response["result"], True)
+
+    async def test_notification_and_parse_error(self):
+        framing = NulFraming()
+        server, reader, writer = await self.start()
+        writer.writelines(framing.frame(b'{"jsonrpc": "2.0", "method": "echo", "params": [1]}'))
+        writer.writelines(framing.frame(b'{"jsonrpc": "2.0", "method"'))
+        response = json.loads(bytes(await framing.read_frame(reader)))
+        self.assertEqual(response["error"]["code"], -32700)
+
+    async def test_too_big_frame_closes_connection(self):
+        framing = NulFraming()
+        server, reader, writer = await self.start(max_frame_size=16)
+        writer.writelines(framing.frame(call("echo", ["x" * 32], 1)))
+        self.assertIsNone(await framing.read_frame(reader))
+
+    async def test_streamed_file(self):
+        for framing in (NulFraming(), LengthPrefixedFraming()):
+            with self.subTest(framing=framing.name):
+                server, reader, writer = await self.start(framing=framing)
+                writer.writelines(framing.frame(call("file", [], 1)))
+                for i in range(5):
+                    writer.writelines(framing.frame(call("echo", [i], i + 2)))
+                responses = [json.loads(bytes(await framing.read_frame(reader))) for _ in range(6)]
+                results = {response["id"]: response["result"] for response in responses}
+                self.assertEqual(results[1], "x" * 10000)
+                self.assertEqual([results[i + 2] for i in range(5)], list(range(5)))
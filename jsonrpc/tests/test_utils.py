@@ -2,6 +2,9 @@
 import unittest
 
 from jsonrpc.base import JSONSerializable
+from jsonrpc.errors import JSONRPCMethodNotFound, JSONRPCServerError
+from jsonrpc.request import JSONRPCSingleRequest, JSONRPCBatchRequest
+from jsonrpc.response import JSONRPCSingleResponse, JSONRPCBatchResponse
 
 
 class TestJSONSerializable(unittest.TestCase):
@@ -14,3 +17,32 @@ class TestJSONSerializable(unittest.TestCase):
         """ Test classmethods of inherited class."""
         self.assertEqual(self._class().serialize({}), "{}")
         self.assertEqual(self._class().deserialize("{}"), {})
+
+    def test_codec_is_shared(self):
+        self.assertIs(self._class().codec, self._class().codec)
+        self.assertIs(self._class(serialize_hook=str).codec, self._class(serialize_hook=str).codec)
+        self.assertIsNot(self._class(serialize_hook=str).codec, self._class().codec)
+
+    def test_hooks(self):
+        obj = self._class(serialize_hook=str, deserialize_hook=dict)
+        self.assertIs(obj.serialize_hook, str)
+        self.assertIs(obj.deserialize_hook, dict)
+
+
+class TestSlots(unittest.TestCase):
+    """ Request and response objects should not have instance dict."""
+
+    def test_no_instance_dict(self):
+        request = JSONRPCSingleRequest({"jsonrpc": "2.0", "method": "add", "params": [1, 2], "id": 1})
+        batch = JSONRPCBatchRequest([request])
+        response = JSONRPCSingleResponse(3, request=request)
+        objects = [
+            request, batch, response,
+            JSONRPCBatchResponse([response]),
+            JSONRPCServerError(data={"type": "Exception", "message": ""}),
+            JSONRPCMethodNotFound().as_response(),
+        ]
+        for obj in objects:
+            with self.subTest(cls=obj.__class__.__name__):
+                self.assertFalse(hasattr(obj, '__dict__'))
+                self.assertIs(obj.codec, request.codec)
@@ -0,0 +1,85 @@
+""" Test WSGI application."""
+import io
+import json
+import os
+import tempfile
+import types
+import unittest
+from wsgiref.util import setup_testing_defaults
+
+from jsonrpc.msgpack import packb, unpackb
+from jsonrpc.response import RawJSONFile
+from jsonrpc.wsgi import check_request, make_app
+
+
+class TestWSGIApplication(unittest.TestCase):
+
+    def setUp(self):
+        fd, path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b'{"large": "' + b'x' * 1000 + b'"}')
+        self.addCleanup(os.remove, path)
+        self.app = make_app({"echo": lambda x: x, "file": lambda: RawJSONFile(path, chunk_size=256)},
+                            max_content_length=64)
+
+    def request(self, body=b'', method='POST', content_length=None, content_type=None):
+        environ = {
+            'REQUEST_METHOD': method,
+            'wsgi.input': io.BytesIO(body),
+            'CONTENT_LENGTH': str(len(body)) if content_length is None else content_length,
+        }
+        if content_type is not None:
+            environ['CONTENT_TYPE'] = content_type
+        setup_testing_defaults(environ)
+        started = {}
+
+        def start_response(status, headers):
+            started['status'] = status
+            started['headers'] = dict(headers)
+
+        self.chunks = self.app(environ, start_response)
+        body = b''.join(self.chunks)
+        return started['status'], started['headers'], body
+
+    def test_call(self):
+        status, headers, body = self.request(b'{"jsonrpc": "2.0", "method": "echo", "params": ["\xd1\x8b"], "id": 1}')
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(headers['Content-Type'], 'application/json')
+        self.assertEqual(headers['Content-Length'], str(len(body)))
+        self.assertEqual(json.loads(body.decode('utf-8'))['result'], 'ы')
+
+    def test_msgpack(self):
+        request = packb({"jsonrpc": "2.0", "method": "echo", "params": [b"\x00"], "id": 1})
+        status, headers, body = self.request(request, content_type='application/msgpack; charset=binary')
+        self.assertEqual(headers['Content-Type'], 'application/msgpack')
+        self.assertEqual(unpackb(body)['result'], b"\x00")
+        status, headers, body = self.request(b'{"id": 1}', content_type='application/x-msgpack')
+        self.assertEqual(unpackb(body)['error']['code'], -32700)
+
+    def test_streamed_file(self):
+        status, headers, body = self.request(b'{"jsonrpc": "2.0", "method": "file", "id": 1}')
+        self.assertIsInstance(self.chunks, types.GeneratorType)
+        self.assertEqual(headers['Content-Length'], str(len(body)))
+        self.assertEqual(len(json.loads(body.decode('utf-8'))['result']['large']), 1000)
+
+    def test_notification(self):
+        status, headers, body = self.request(b'{"jsonrpc": "2.0", "method": "echo", "params": [1]}')
+        self.assertEqual(status, '204 No Content')
+        self.assertEqual(body, b'')
+
+    def test_parse_error(self):
+        status, headers, body = self.request(b'{"jsonrpc"')
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(json.loads(body.decode('utf-8'))['error']['code'], -32700)
+
+    def test_rejected_requests(self):
+        self.assertEqual(self.request(method='GET')[0], '405 Method Not Allowed')
+        self.assertEqual(self.request(method='GET')[1]['Allow'], 'POST')
+        self.assertEqual(self.request(b'x' * 65)[0], '413 Payload Too Large')
+        self.assertEqual(self.request(b'{}', content_length='')[0], '411 Length Required')
+        self.assertEqual(self.request(b'{}', content_length='abc')[0], '400 Bad Request')
+
+    def test_check_request(self):
+        self.assertEqual(check_request('POST', '10', 10), (None, 10))
+        self.assertEqual(check_request('POST', None, 10, length_required=False), (None, None))
+        self.assertEqual(check_request('POST', '-1', 10), (400, None))
@@ -0,0 +1 @@
+""" Transports serving dispatchers over the network. """
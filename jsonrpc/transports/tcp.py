@@ -0,0 +1,159 @@
+""" Asyncio TCP server.
+
+Connections are persistent: client could send any number of requests over one
+connection, without waiting for responses (requests are processed concurrently,
+responses are sent as soon as they are ready, match them by id).
+Idle connections cost no threads, only sockets and a small buffer.
+
+Usage::
+
+    from jsonrpc import dispatcher
+    from jsonrpc.transports.tcp import serve
+
+    serve(dispatcher, '127.0.0.1', 4000, framing='newline')
+"""
+import asyncio
+
+from jsonrpc.framing import DEFAULT_MAX_FRAME_SIZE, FrameError, get_framing
+from jsonrpc.manager import AsyncJSONRPCResponseManager
+from jsonrpc.msgpack import MessagePackCodec, is_msgpack
+
+
+class TCPServer:
+    """ JSON-RPC server for stream sockets.
+
+    :type dispatcher: Dispatcher or dict
+    :param manager: Manager to handle requests with. By default it is AsyncJSONRPCResponseManager,
+        which runs plain (not coroutine) methods in the default executor of the event loop,
+        so a blocking method does not stall other connections.
+    :type manager: None or jsonrpc.manager.AsyncJSONRPCResponseManager
+    :param framing: How messages are delimited, see :mod:`jsonrpc.framing`.
+        With binary framing ("length") MessagePack messages are accepted too,
+        they are answered in MessagePack, see :mod:`jsonrpc.msgpack`.
+    :type framing: str or jsonrpc.framing.Framing
+    :param max_frame_size: Maximum size of a single request in bytes.
+        Connection sending bigger one is closed.
+    :type max_frame_size: int
+    :param max_pending: Maximum number of requests of one connection processed at once.
+        Reading from connection is paused when it is reached.
+    :type max_pending: int
+    """
+
+    def __init__(self, dispatcher, manager=None, framing='nul', max_frame_size=DEFAULT_MAX_FRAME_SIZE,
+                 max_pending=64):
+        if max_pending <= 0:
+            raise ValueError("max_pending should be positive")
+        self.dispatcher = dispatcher
+        self.manager = manager if manager is not None else AsyncJSONRPCResponseManager(offload_sync=True)
+        self.framing = get_framing(framing)
+        self.max_frame_size = max_frame_size
+        self.max_pending = max_pending
+        self.connections = set()
+        self.binary_manager = None
+        if self.framing.binary:
+            self.binary_manager = self.manager.with_codec(MessagePackCodec)
+
+    async def start(self, host='127.0.0.1', port=4000, **kwargs):
+        """ Start listening.
+
+        :param kwargs: Passed to asyncio.start_server()
+        :rtype: asyncio.Server
+        """
+        return await asyncio.start_server(
+            self.handle_connection, host, port, limit=self.max_frame_size + 1, **kwargs
+        )
+
+    async def handle_connection(self, reader, writer):
+        """ Serve single connection until it is closed.
+
+        :type reader: asyncio.StreamReader
+        :type writer: asyncio.StreamWriter
+        """
+        pending = set()
+        semaphore = asyncio.Semaphore(self.max_pending)
+        # streamed response is written in parts, other responses should not get in between
+        lock = asyncio.Lock()
+        self.connections.add(writer)
+        try:
+            while True:
+                try:
+                    frame = await self.framing.read_frame(reader, self.max_frame_size)
+                except (FrameError, ConnectionError):
+                    break
+                if frame is None:
+                    break
+                await semaphore.acquire()
+                task = asyncio.ensure_future(self._respond(frame, writer, semaphore, lock))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            self.connections.discard(writer)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _respond(self, frame, writer, semaphore, lock):
+        try:
+            manager = self.manager
+            if self.binary_manager is not None and is_msgpack(frame):
+                manager = self.binary_manager
+            response = await manager.handle_async(frame, self.dispatcher)
+            if response is None or writer.is_closing():
+                return
+            if response.streamed:
+                async with lock:
+                    await self._write_stream(response, writer)
+            elif lock.locked():
+                data = response.json_bytes
+                async with lock:
+                    writer.writelines(self.framing.frame(data))
+                await writer.drain()
+            else:
+                writer.writelines(self.framing.frame(response.json_bytes))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        except Exception:
+            # response could not be made, client would wait for it forever
+            writer.close()
+            raise
+        finally:
+            semaphore.release()
+
+    async def _write_stream(self, response, writer):
+        loop = asyncio.get_running_loop()
+        buffers = self.framing.frame_stream(response.iter_json_bytes(), response.json_size)
+        while True:
+            # file-backed result is read in executor, not to block the loop
+            buffer = await loop.run_in_executor(None, next, buffers, None)
+            if buffer is None:
+                break
+            writer.write(buffer)
+            await writer.drain()
+
+
+def serve(dispatcher, host='127.0.0.1', port=4000, framing='nul', **kwargs):
+    """ Run TCP server until interrupted.
+
+    :type dispatcher: Dispatcher or dict
+    :type host: str
+    :type port: int
+    :param framing: How messages are delimited: "nul", "newline" or "length"
+    :type framing: str or jsonrpc.framing.Framing
+    :param kwargs: Passed to :class:`TCPServer`
+    """
+    server = TCPServer(dispatcher, framing=framing, **kwargs)
+
+    async def main():
+        listener = await server.start(host, port)
+        async with listener:
+            await listener.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -1,5 +1,8 @@
 """ Utility functions for package."""
+import base64
 from datetime import datetime, date, time, timedelta, tzinfo
+from decimal import Decimal, InvalidOperation
+from uuid import UUID
 
 
 class FixedOffset(tzinfo):
@@ -18,54 +21,185 @@ class FixedOffset(tzinfo):
         return timedelta(0)
 
 
-def json_datetime_default(o):
-    """Encoder for date/time/datetime objects.
-    Usage: json.dumps(object, default=json_datetime_default)
+class TypeRegistry:
+    """ Codecs of types JSON has no notation for.
 
-    :type o: datetime | date | time
-    :rtype: dict
-    :raises: TypeError
+    Object of registered type is encoded as JSON object with a reserved tag key,
+    e.g. {"__date__": [2014, 7, 1]}. Both directions are single dict lookups:
+    by type of object when encoding, by tag key when decoding. Objects with more
+    than :attr:`MAX_TAGGED_SIZE` keys are never tagged, so plain ones are returned
+    by length check alone.
+
+    Usage::
+
+        codec = get_codec(default=TYPES.default, object_hook=TYPES.object_hook)
+
+    Note that orjson serializes UUID natively, without calling default hook.
     """
 
-    if type(o) == date:
-        return {'__date__': [o.year, o.month, o.day]}
+    #: Maximum number of keys in tagged object: tag and one optional key, e.g. __tzshift__
+    MAX_TAGGED_SIZE = 2
+
+    def __init__(self):
+        self._encoders = {}
+        self._decoders = {}
+        self._resolved = {}
 
-    if isinstance(o, time):
-        res = {'__time__': [o.hour, o.minute, o.second, o.microsecond]}
-        if o.tzinfo is not None:
-            res['__tzshift__'] = o.utcoffset().seconds
-        return res
+    def register(self, tag, types, encode, decode):
+        """ Register codec.
 
-    if isinstance(o, datetime):
-        res = {'__datetime__': [o.year, o.month, o.day, o.hour, o.minute, o.second, o.microsecond]}
-        if o.tzinfo is not None:
-            res['__tzshift__'] = o.utcoffset().seconds
-        return res
+        :param tag: Reserved key, e.g. "__date__"
+        :type tag: str
+        :param types: Type or types encoded by the codec, their subclasses are encoded too,
+            unless they are registered themselves
+        :type types: type or tuple
+        :param encode: Function encoding object to tagged dict
+        :type encode: callable
+        :param decode: Function decoding tagged dict back
+        :type decode: callable
+        """
+        for cls in types if isinstance(types, tuple) else (types,):
+            self._encoders[cls] = encode
+        self._decoders[tag] = decode
+        self._resolved = dict(self._encoders)
 
-    raise TypeError
+    def copy(self):
+        """ Registry with the same codecs, could be extended separately.
+        :rtype: TypeRegistry
+        """
+        registry = self.__class__()
+        registry._encoders = dict(self._encoders)
+        registry._decoders = dict(self._decoders)
+        registry._resolved = dict(self._resolved)
+        return registry
 
+    def default(self, o):
+        """ JSON default hook.
+        Usage: json.dumps(object, default=registry.default)
 
-def json_datetime_hook(dictionary):
-    """JSON object_hook function for decoding date/time/datetime objects.
-    Usage: json.loads(object, object_hook=json_datetime_hook)
+        :rtype: dict
+        :raise TypeError: Type of o is not registered
+        """
+        try:
+            encode = self._resolved[o.__class__]
+        except KeyError:
+            encode = self._resolve(o.__class__)
+        return encode(o)
 
-    :type dictionary: dict
-    :rtype: datetime | date | time
-    """
+    def object_hook(self, dictionary):
+        """ JSON object_hook.
+        Usage: json.loads(string, object_hook=registry.object_hook)
+
+        :type dictionary: dict
+        :return: Decoded object or dictionary itself if it is not tagged
+        """
+        if len(dictionary) <= self.MAX_TAGGED_SIZE:
+            decoders = self._decoders
+            for key in dictionary:
+                if key in decoders:
+                    return decoders[key](dictionary)
+        return dictionary
+
+    def _resolve(self, cls):
+        for base in cls.__mro__[1:]:
+            encode = self._encoders.get(base)
+            if encode is not None:
+                self._resolved[cls] = encode
+                return encode
+        raise TypeError('Object of type {0} is not JSON serializable'.format(cls.__name__))
+
+
+def _with_tzshift(res, o):
+    offset = o.utcoffset()
+    if offset is not None:
+        res['__tzshift__'] = int(offset.total_seconds())
+    return res
+
+
+def _apply_tzshift(res, dictionary):
+    if '__tzshift__' in dictionary:
+        res = res.replace(tzinfo=FixedOffset(dictionary['__tzshift__']))
+    return res
+
+
+def encode_date(o):
+    return {'__date__': [o.year, o.month, o.day]}
+
+
+def decode_date(dictionary):
+    return date(*dictionary['__date__'])
+
+
+def encode_time(o):
+    return _with_tzshift({'__time__': [o.hour, o.minute, o.second, o.microsecond]}, o)
+
+
+def decode_time(dictionary):
+    return _apply_tzshift(time(*dictionary['__time__']), dictionary)
+
+
+def encode_datetime(o):
+    return _with_tzshift({'__datetime__': [o.year, o.month, o.day, o.hour, o.minute, o.second, o.microsecond]}, o)
+
+
+def decode_datetime(dictionary):
+    return _apply_tzshift(datetime(*dictionary['__datetime__']), dictionary)
+
+
+def encode_decimal(o):
+    return {'__decimal__': str(o)}
+
+
+def decode_decimal(dictionary):
+    try:
+        return Decimal(dictionary['__decimal__'])
+    except InvalidOperation:
+        # reported as parse error, like any other malformed value
+        raise ValueError("Invalid decimal: {0!r}".format(dictionary['__decimal__']))
+
+
+def encode_uuid(o):
+    return {'__uuid__': str(o)}
+
+
+def decode_uuid(dictionary):
+    return UUID(dictionary['__uuid__'])
+
+
+def encode_bytes(o):
+    return {'__bytes__': base64.b64encode(o).decode('ascii')}
+
+
+def decode_bytes(dictionary):
+    return base64.b64decode(dictionary['__bytes__'])
+
+
+def encode_set(o):
+    return {'__set__': list(o)}
+
+
+def decode_set(dictionary):
+    return set(dictionary['__set__'])
+
+
+#: Registry of date, time and datetime codecs
+DATETIME_TYPES = TypeRegistry()
+DATETIME_TYPES.register('__date__', date, encode_date, decode_date)
+DATETIME_TYPES.register('__time__', time, encode_time, decode_time)
+DATETIME_TYPES.register('__datetime__', datetime, encode_datetime, decode_datetime)
 
-    if '__date__' in dictionary:
-        return date(*dictionary['__date__'])
+#: Registry of all built-in codecs: date, time, datetime, Decimal, UUID, bytes and set
+TYPES = DATETIME_TYPES.copy()
+TYPES.register('__decimal__', Decimal, encode_decimal, decode_decimal)
+TYPES.register('__uuid__', UUID, encode_uuid, decode_uuid)
+TYPES.register('__bytes__', (bytes, bytearray, memoryview), encode_bytes, decode_bytes)
+TYPES.register('__set__', (set, frozenset), encode_set, decode_set)
 
-    if '__time__' in dictionary:
-        res = time(*dictionary['__time__'])
-        if '__tzshift__' in dictionary:
-            res = res.replace(tzinfo=FixedOffset(dictionary['__tzshift__']))
-        return res
 
-    if '__datetime__' in dictionary:
-        res = datetime(*dictionary['__datetime__'])
-        if '__tzshift__' in dictionary:
-            res = res.replace(tzinfo=FixedOffset(dictionary['__tzshift__']))
-        return res
+#: Encoder for date/time/datetime objects.
+#: Usage: json.dumps(object, default=json_datetime_default)
+json_datetime_default = DATETIME_TYPES.default
 
-    return dictionary
+#: JSON object_hook function for decoding date/time/datetime objects.
+#: Usage: json.loads(object, object_hook=json_datetime_hook)
+json_datetime_hook = DATETIME_TYPES.object_hook
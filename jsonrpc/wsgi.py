@@ -0,0 +1,142 @@
+""" WSGI application serving a dispatcher over HTTP.
+
+Usage::
+
+    from wsgiref.simple_server import make_server
+    from jsonrpc import dispatcher
+    from jsonrpc.wsgi import make_app
+
+    make_server('127.0.0.1', 4000, make_app(dispatcher)).serve_forever()
+
+Every path is handled the same way. Requests should be POSTed, body is passed
+to the manager as bytes. Responses to notifications have status 204 and no body,
+file-backed results (:class:`jsonrpc.response.RawJSONFile`) are streamed.
+Requests with Content-Type: application/msgpack are decoded and answered in
+MessagePack (see :mod:`jsonrpc.msgpack`), all others in JSON.
+"""
+from jsonrpc.manager import JSONRPCResponseManager
+from jsonrpc.msgpack import CONTENT_TYPE as MSGPACK_CONTENT_TYPE, MessagePackCodec
+
+#: Default limit of request body size in bytes
+DEFAULT_MAX_CONTENT_LENGTH = 16 * 1024 * 1024
+
+JSON_CONTENT_TYPE = 'application/json'
+
+#: Content types of MessagePack requests
+MSGPACK_CONTENT_TYPES = (MSGPACK_CONTENT_TYPE, 'application/x-msgpack')
+
+STATUSES = {
+    200: '200 OK',
+    204: '204 No Content',
+    400: '400 Bad Request',
+    405: '405 Method Not Allowed',
+    411: '411 Length Required',
+    413: '413 Payload Too Large',
+}
+
+
+def check_request(method, content_length, max_content_length, length_required=True):
+    """ Check HTTP request before reading its body.
+
+    :param method: HTTP method
+    :type method: str
+    :param content_length: Value of Content-Length header, None if it is missing
+    :type content_length: None or str or bytes
+    :type max_content_length: int
+    :param length_required: Whether request without Content-Length is rejected
+    :type length_required: bool
+    :return: HTTP error status or None if request is acceptable, and body length if it is known
+    :rtype: tuple
+    """
+    if method != 'POST':
+        return 405, None
+    if content_length is None:
+        return (411 if length_required else None), None
+    try:
+        length = int(content_length)
+    except ValueError:
+        return 400, None
+    if length < 0:
+        return 400, None
+    if length > max_content_length:
+        return 413, None
+    return None, length
+
+
+def content_managers(manager):
+    """ Managers of requests with non-default content types: MessagePack ones.
+
+    :type manager: jsonrpc.manager.JSONRPCResponseManager
+    :return: Manager by content type
+    :rtype: dict
+    """
+    return dict.fromkeys(MSGPACK_CONTENT_TYPES, manager.with_codec(MessagePackCodec))
+
+
+def select_manager(managers, content_type, default):
+    """ Manager for request of given content type.
+
+    :param managers: Manager by content type, see :func:`content_managers`
+    :type managers: dict
+    :param content_type: Value of Content-Type header, parameters are ignored
+    :type content_type: None or str
+    :param default: Manager of requests of other content types
+    :rtype: jsonrpc.manager.JSONRPCResponseManager
+    """
+    if not content_type:
+        return default
+    return managers.get(content_type.partition(';')[0].strip().lower(), default)
+
+
+def error_headers(status, body):
+    """ Headers of plain text error response.
+    :rtype: list of (name, value)
+    """
+    headers = [('Content-Type', 'text/plain'), ('Content-Length', str(len(body)))]
+    if status == 405:
+        headers.append(('Allow', 'POST'))
+    return headers
+
+
+def make_app(dispatcher, manager=None, max_content_length=DEFAULT_MAX_CONTENT_LENGTH):
+    """ Build WSGI application.
+
+    :type dispatcher: Dispatcher or dict
+    :param manager: Manager to handle requests with. JSONRPCResponseManager() by default.
+    :type manager: None or jsonrpc.manager.JSONRPCResponseManager
+    :param max_content_length: Maximum size of request body in bytes, bigger requests get 413
+    :type max_content_length: int
+    :rtype: callable
+    """
+    if manager is None:
+        manager = JSONRPCResponseManager()
+    managers = content_managers(manager)
+
+    def application(environ, start_response):
+        status, length = check_request(
+            environ['REQUEST_METHOD'], environ.get('CONTENT_LENGTH') or None, max_content_length
+        )
+        if status is not None:
+            body = STATUSES[status].encode('ascii')
+            start_response(STATUSES[status], error_headers(status, body))
+            return [body]
+
+        body = environ['wsgi.input'].read(length) if length else b''
+        request_manager = select_manager(managers, environ.get('CONTENT_TYPE'), manager)
+        response = request_manager.handle(body, dispatcher)
+        if response is None:
+            start_response(STATUSES[204], [])
+            return []
+        if response.streamed:
+            # file-backed result is sent chunk by chunk
+            start_response(STATUSES[200], [
+                ('Content-Type', request_manager.codec.content_type), ('Content-Length', str(response.json_size))
+            ])
+            return response.iter_json_bytes()
+        data = response.json_bytes
+        start_response(STATUSES[200], [
+            ('Content-Type', request_manager.codec.content_type), ('Content-Length', str(len(data)))
+        ])
+        return [data]
+
+    return application
@@ -14,8 +14,14 @@ setup(
     name="json-rpc-3",
     version=version,
     packages=find_packages(),
+    python_requires=">=3.8",
     test_suite="nose.collector",
     tests_require=["nose", "mock"],
+    extras_require={
+        "orjson": ["orjson"],
+        "rapidjson": ["python-rapidjson"],
+        "ujson": ["ujson>=5.2"],
+    },
     author='see AUTHORS',
     maintainer='Orhideous',
     maintainer_email='orhideous@gmail.com',
@@ -29,9 +35,10 @@ setup(
         "Natural Language :: English",
         "Operating System :: OS Independent",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.2",
-        "Programming Language :: Python :: 3.3",
-        "Programming Language :: Python :: 3.4",
+        "Programming Language :: Python :: 3.8",
+        "Programming Language :: Python :: 3.9",
+        "Programming Language :: Python :: 3.10",
+        "Programming Language :: Python :: 3.11",
         "Topic :: Software Development :: Libraries :: Python Modules",
     ],
     keywords=["json", "rpc", "json-rpc", "transport"],